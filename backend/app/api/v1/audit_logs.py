@@ -1,19 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import PermissionChecker
+from app.core.dependencies import PermissionChecker, resolve_company_scope
 from app.models.user import User
-from app.schemas.audit_log import AuditLogRead
-from app.services.audit import list_audit_logs
+from app.schemas.audit_log import AuditLogImages, AuditLogRead
+from app.services.audit import get_audit_log, list_audit_logs, rebuild_entity_images
+from app.services.audit_rollup import BUCKETS, GROUPS, audit_activity
 
 router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
 
 
 @router.get("", response_model=dict)
 async def list_audit_logs_endpoint(
+    company_id: int | None = Query(None),
     user_id: int | None = Query(None),
     action: str | None = Query(None),
     module: str | None = Query(None),
@@ -22,10 +24,11 @@ async def list_audit_logs_endpoint(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(PermissionChecker("admin.view")),
+    current_user: User = Depends(PermissionChecker("admin.view")),
 ):
     result = await list_audit_logs(
         db,
+        company_id=resolve_company_scope(current_user, company_id),
         user_id=user_id,
         action=action,
         module=module,
@@ -36,3 +39,45 @@ async def list_audit_logs_endpoint(
     )
     result["items"] = [AuditLogRead.model_validate(log) for log in result["items"]]
     return result
+
+
+@router.get("/analytics", response_model=dict)
+async def audit_analytics_endpoint(
+    company_id: int | None = Query(None),
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    bucket: str = Query("day", pattern=f"^({'|'.join(BUCKETS)})$"),
+    group_by: str | None = Query(None, pattern=f"^({'|'.join(GROUPS)})$"),
+    module: str | None = Query(None),
+    action: str | None = Query(None),
+    user_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    """Activity counts (events and failed PINs): daily rollups of the closed
+    days, live counts of the current ones."""
+    items = await audit_activity(
+        db,
+        company_id=resolve_company_scope(current_user, company_id),
+        date_from=date_from,
+        date_to=date_to,
+        bucket=bucket,
+        group_by=group_by,
+        module=module,
+        action=action,
+        user_id=user_id,
+    )
+    return {"bucket": bucket, "group_by": group_by, "items": items}
+
+
+@router.get("/{log_id}/images", response_model=AuditLogImages)
+async def audit_log_images_endpoint(
+    log_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    """Full before/after image of the entity, rebuilt from its audit history."""
+    log = await get_audit_log(db, log_id)
+    if resolve_company_scope(current_user, log.company_id) != log.company_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audit log not found")
+    return await rebuild_entity_images(db, log)
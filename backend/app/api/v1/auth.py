@@ -6,6 +6,7 @@ from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.schemas.auth import (
     LoginRequest,
+    PinOverrideResponse,
     PinVerifyRequest,
     PinVerifyResponse,
     RefreshRequest,
@@ -14,6 +15,7 @@ from app.schemas.auth import (
 from app.schemas.user import UserMe
 from app.services.auth import (
     authenticate_user,
+    authorize_pin_override,
     create_tokens,
     refresh_access_token,
     verify_user_pin,
@@ -69,3 +71,21 @@ async def verify_pin(
         db, current_user, body.pin, body.action, body.entity_type, body.entity_id
     )
     return PinVerifyResponse(verified=True, message="PIN verified successfully")
+
+
+@router.post("/pin-override", response_model=PinOverrideResponse)
+async def pin_override(
+    body: PinVerifyRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """A supervisor types their PIN to authorize the current user's action."""
+    supervisor = await authorize_pin_override(
+        db, current_user, body.pin, body.action, body.entity_type, body.entity_id
+    )
+    return PinOverrideResponse(
+        verified=True,
+        message="Action authorized",
+        authorized_by_user_id=supervisor.id,
+        authorized_by_email=supervisor.email,
+    )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.batch import BatchItemResult, BatchRequest
+from app.services.batch import run_batch
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+
+@router.post("", response_model=list[BatchItemResult])
+async def batch_endpoint(
+    data: BatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Several API calls in one round trip, authenticated once.
+
+    Each item is answered with its own status code and body; a failing
+    item does not affect the others. Consecutive GETs run concurrently,
+    other methods run in order, each in its own transaction.
+    """
+    return await run_batch(request, data.requests, current_user, db, data.shared_session)
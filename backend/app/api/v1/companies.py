@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import PermissionChecker
+from app.core.dependencies import PermissionChecker, resolve_company_scope
 from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyRead, CompanyUpdate
+from app.schemas.sequence import NumberSequenceRead, NumberSequenceUpdate
 from app.services.company import (
     create_company,
     get_company,
@@ -12,19 +13,35 @@ from app.services.company import (
     toggle_company_status,
     update_company,
 )
+from app.services.sequence import list_sequences, set_sequence_pattern
+from app.services.sync import list_changes
+from app.services.versioning import (
+    check_if_match,
+    collection_etag,
+    current_entity_etag,
+    etag_of,
+)
+from app.utils.etag import etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/companies", tags=["Companies"])
 
 
 @router.get("", response_model=dict)
 async def list_companies_endpoint(
+    request: Request,
+    response: Response,
     search: str | None = Query(None),
     is_active: bool | None = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("admin.view")),
 ):
+    etag = await collection_etag(db, ["companies"], None, request.url.query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     result = await list_companies(
         db, page=page, page_size=page_size, search=search, is_active=is_active
     )
@@ -42,13 +59,33 @@ async def create_company_endpoint(
     return CompanyRead.model_validate(company)
 
 
+@router.get("/changes", response_model=dict)
+async def company_changes_endpoint(
+    since: str | None = Query(None, description="Cursor returned by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    result = await list_changes(
+        db, "companies", resolve_company_scope(current_user, None), since, limit
+    )
+    result["items"] = [CompanyRead.model_validate(c) for c in result["items"]]
+    return result
+
+
 @router.get("/{company_id}", response_model=CompanyRead)
 async def get_company_endpoint(
     company_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("admin.view")),
 ):
+    etag = await current_entity_etag(db, "company", company_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     company = await get_company(db, company_id)
+    set_etag(response, etag_of("company", company))
     return CompanyRead.model_validate(company)
 
 
@@ -56,10 +93,14 @@ async def get_company_endpoint(
 async def update_company_endpoint(
     company_id: int,
     body: CompanyUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(PermissionChecker("admin.edit")),
 ):
+    await check_if_match(db, "company", company_id, if_match)
     company = await update_company(db, company_id, body, current_user=current_user)
+    set_etag(response, etag_of("company", company))
     return CompanyRead.model_validate(company)
 
 
@@ -71,3 +112,29 @@ async def toggle_company_status_endpoint(
 ):
     company = await toggle_company_status(db, company_id, current_user=current_user)
     return CompanyRead.model_validate(company)
+
+
+@router.get("/{company_id}/sequences", response_model=list[NumberSequenceRead])
+async def list_sequences_endpoint(
+    company_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    return await list_sequences(db, resolve_company_scope(current_user, company_id))
+
+
+@router.put("/{company_id}/sequences/{key}", response_model=NumberSequenceRead)
+async def set_sequence_pattern_endpoint(
+    company_id: int,
+    key: str,
+    body: NumberSequenceUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.edit")),
+):
+    return await set_sequence_pattern(
+        db,
+        resolve_company_scope(current_user, company_id),
+        key,
+        body.pattern,
+        current_user=current_user,
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user, resolve_company_scope
+from app.models.user import User
+from app.services.dashboard import get_dashboard_summary
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary", response_model=dict)
+async def dashboard_summary_endpoint(
+    company_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """KPIs of the sections the caller may view, for their company scope."""
+    return await get_dashboard_summary(
+        db, current_user, resolve_company_scope(current_user, company_id)
+    )
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import (
+    authenticate_token,
+    get_current_user,
+    resolve_company_scope,
+    user_has_permission,
+)
+from app.core.security import create_stream_ticket
+from app.models.user import User
+from app.services.notifications import EVENT_PERMISSIONS, hub
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+HEARTBEAT_SECONDS = 15
+
+
+async def _stream_user(
+    request: Request,
+    ticket: str | None = Query(None, description="From POST /events/ticket"),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Bearer header, or ?ticket= for EventSource, which cannot set headers.
+
+    Access tokens are never taken from the URL, where proxies and browser
+    history keep them: a ticket expires within seconds and opens a stream only.
+    """
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return await authenticate_token(db, token)
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await authenticate_token(db, ticket, token_type="stream")
+
+
+@router.post("/ticket", response_model=dict)
+async def create_stream_ticket_endpoint(current_user: User = Depends(get_current_user)):
+    """Ticket for `GET /events/stream?ticket=`, valid STREAM_TICKET_EXPIRE_SECONDS.
+
+    Fetch a new one for every (re)connection.
+    """
+    return {
+        "ticket": create_stream_ticket({"sub": str(current_user.id)}),
+        "expires_in": settings.STREAM_TICKET_EXPIRE_SECONDS,
+    }
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    company_id: int | None = Query(None),
+    types: str | None = Query(None, description="Comma-separated entity types"),
+    current_user: User = Depends(_stream_user),
+):
+    """Server-sent change events: `change` (entity_type, id, action, company_id)
+    and `reset` when events may have been lost and lists should be reloaded.
+    """
+    scope = resolve_company_scope(current_user, company_id)
+    entity_types = {
+        entity_type
+        for entity_type, permission in EVENT_PERMISSIONS.items()
+        if user_has_permission(current_user, permission)
+    }
+    if types:
+        requested = {t.strip() for t in types.split(",") if t.strip()}
+        unknown = requested - EVENT_PERMISSIONS.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown event types: {', '.join(sorted(unknown))}",
+            )
+        entity_types &= requested
+    if not entity_types:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No event type allowed")
+
+    subscriber = hub.subscribe(scope, entity_types)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                # Messages are shared between subscribers: never mutate them
+                data = {k: v for k, v in message.items() if k != "type"}
+                yield f"event: {message['type']}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user, resolve_company_scope, user_has_permission
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobRead
+from app.services.jobs import cancel_job, get_job, list_jobs
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def _check_job_access(job: Job, user: User, permission: str) -> None:
+    """Own jobs are always visible; others need `permission` in the job's company."""
+    if job.created_by_id == user.id:
+        return
+    if user_has_permission(user, permission) and (
+        (user.role and (user.role.is_superadmin or user.role.multi_company))
+        or job.company_id == user.company_id
+    ):
+        return
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+
+@router.get("", response_model=dict)
+async def list_jobs_endpoint(
+    company_id: int | None = Query(None),
+    status_filter: str | None = Query(None, alias="status"),
+    kind: str | None = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Jobs of the company for admins, the user's own jobs otherwise."""
+    created_by_id = None if user_has_permission(current_user, "admin.view") else current_user.id
+    result = await list_jobs(
+        db,
+        company_id=resolve_company_scope(current_user, company_id),
+        created_by_id=created_by_id,
+        status_filter=status_filter,
+        kind=kind,
+        page=page,
+        page_size=page_size,
+    )
+    result["items"] = [JobRead.model_validate(job) for job in result["items"]]
+    return result
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job_endpoint(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = await get_job(db, job_id)
+    _check_job_access(job, current_user, "admin.view")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobRead)
+async def cancel_job_endpoint(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_job_access(await get_job(db, job_id), current_user, "admin.edit")
+    return await cancel_job(db, job_id, current_user)
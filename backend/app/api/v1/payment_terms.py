@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import PermissionChecker, resolve_company_scope
+from app.models.user import User
+from app.schemas.payment_term import (
+    InstallmentRead,
+    PaymentTermCreate,
+    PaymentTermRead,
+    PaymentTermUpdate,
+    ScheduleBatchRequest,
+    ScheduleRequest,
+)
+from app.services.payment_term import (
+    create_payment_term,
+    delete_payment_term,
+    get_parsed_terms,
+    get_payment_term,
+    list_payment_terms,
+    update_payment_term,
+)
+from app.services.sync import list_changes
+from app.utils.payment_schedule import schedule, schedule_batch
+
+router = APIRouter(prefix="/payment-terms", tags=["Payment Terms"])
+
+
+@router.get("", response_model=dict)
+async def list_payment_terms_endpoint(
+    company_id: int | None = Query(None),
+    search: str | None = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    result = await list_payment_terms(
+        db,
+        company_id=resolve_company_scope(current_user, company_id),
+        search=search,
+        page=page,
+        page_size=page_size,
+    )
+    result["items"] = [PaymentTermRead.model_validate(pt) for pt in result["items"]]
+    return result
+
+
+@router.post("", response_model=PaymentTermRead, status_code=201)
+async def create_payment_term_endpoint(
+    data: PaymentTermCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.create")),
+):
+    resolve_company_scope(current_user, data.company_id)
+    return await create_payment_term(db, data, current_user)
+
+
+@router.get("/changes", response_model=dict)
+async def payment_term_changes_endpoint(
+    company_id: int = Query(...),
+    since: str | None = Query(None, description="Cursor returned by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    result = await list_changes(
+        db, "payment_terms", resolve_company_scope(current_user, company_id), since, limit
+    )
+    result["items"] = [PaymentTermRead.model_validate(pt) for pt in result["items"]]
+    return result
+
+
+@router.post("/schedule/batch", response_model=dict)
+async def schedule_batch_endpoint(
+    data: ScheduleBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    """Installments of many invoices in one call (aging reports, dunning runs).
+
+    Returns flat columns: invoice_index (position in the request),
+    due_dates and amounts, ordered by invoice.
+    """
+    terms = await get_parsed_terms(db, resolve_company_scope(current_user, data.company_id))
+    missing = set(data.term_ids) - terms.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown payment terms: {', '.join(map(str, sorted(missing)))}",
+        )
+    return schedule_batch(terms, data.term_ids, data.invoice_dates, data.amounts)
+
+
+@router.get("/{term_id}", response_model=PaymentTermRead)
+async def get_payment_term_endpoint(
+    term_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    term = await get_payment_term(db, term_id)
+    resolve_company_scope(current_user, term.company_id)
+    return term
+
+
+@router.patch("/{term_id}", response_model=PaymentTermRead)
+async def update_payment_term_endpoint(
+    term_id: int,
+    data: PaymentTermUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    resolve_company_scope(current_user, (await get_payment_term(db, term_id)).company_id)
+    return await update_payment_term(db, term_id, data, current_user)
+
+
+@router.delete("/{term_id}", status_code=204)
+async def delete_payment_term_endpoint(
+    term_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.delete")),
+):
+    resolve_company_scope(current_user, (await get_payment_term(db, term_id)).company_id)
+    await delete_payment_term(db, term_id, current_user)
+
+
+@router.post("/{term_id}/schedule", response_model=list[InstallmentRead])
+async def schedule_endpoint(
+    term_id: int,
+    data: ScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    term = await get_payment_term(db, term_id)
+    terms = await get_parsed_terms(db, resolve_company_scope(current_user, term.company_id))
+    return schedule(terms[term_id], data.invoice_date, data.amount)
@@ -1,31 +1,55 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import PermissionChecker
+from app.core.dependencies import PermissionChecker, resolve_company_scope
 from app.core.permissions import Action, Module
 from app.models.user import User
+from app.schemas.job import JobRead
 from app.schemas.role import RoleCreate, RoleRead, RoleUpdate
-from app.services.role import create_role, delete_role, get_role, list_roles, update_role
+from app.services.role import (
+    create_role,
+    delete_role,
+    get_role,
+    list_roles,
+    update_role,
+)
+from app.services.jobs import enqueue_job
+from app.services.sync import list_changes
+from app.services.versioning import (
+    check_if_match,
+    collection_etag,
+    current_entity_etag,
+    etag_of,
+)
+from app.utils.etag import etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
 
 @router.get("", response_model=dict)
 async def list_roles_endpoint(
+    request: Request,
+    response: Response,
     company_id: int | None = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(PermissionChecker("admin.view")),
+    current_user: User = Depends(PermissionChecker("admin.view")),
 ):
-    result = await list_roles(db, company_id=company_id, page=page, page_size=page_size)
-    items = []
-    for role in result["items"]:
-        data = RoleRead.model_validate(role)
-        data.user_count = getattr(role, "_user_count", 0)
-        items.append(data)
-    result["items"] = items
+    company_id = resolve_company_scope(current_user, company_id)
+    etag = await collection_etag(db, ["roles"], company_id, request.url.query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    result = await list_roles(
+        db,
+        company_id=company_id,
+        page=page,
+        page_size=page_size,
+    )
+    result["items"] = [RoleRead.model_validate(role) for role in result["items"]]
     return result
 
 
@@ -52,13 +76,43 @@ async def available_permissions(
     return {"permissions": perms}
 
 
+@router.post("/recount-users", response_model=JobRead, status_code=202)
+async def recount_users_endpoint(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.edit")),
+):
+    """Queues the recount of every role's denormalized user_count."""
+    return await enqueue_job(db, "role.recount_users", current_user=current_user)
+
+
+@router.get("/changes", response_model=dict)
+async def role_changes_endpoint(
+    company_id: int | None = Query(None),
+    since: str | None = Query(None, description="Cursor returned by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    result = await list_changes(
+        db, "roles", resolve_company_scope(current_user, company_id), since, limit
+    )
+    result["items"] = [RoleRead.model_validate(role) for role in result["items"]]
+    return result
+
+
 @router.get("/{role_id}", response_model=RoleRead)
 async def get_role_endpoint(
     role_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("admin.view")),
 ):
+    etag = await current_entity_etag(db, "role", role_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     role = await get_role(db, role_id)
+    set_etag(response, etag_of("role", role))
     return RoleRead.model_validate(role)
 
 
@@ -66,10 +120,14 @@ async def get_role_endpoint(
 async def update_role_endpoint(
     role_id: int,
     body: RoleUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(PermissionChecker("admin.edit")),
 ):
+    await check_if_match(db, "role", role_id, if_match)
     role = await update_role(db, role_id, body, current_user=current_user)
+    set_etag(response, etag_of("role", role))
     return RoleRead.model_validate(role)
 
 
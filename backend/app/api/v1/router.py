@@ -2,8 +2,14 @@ from fastapi import APIRouter
 
 from app.api.v1.audit_logs import router as audit_logs_router
 from app.api.v1.auth import router as auth_router
+from app.api.v1.batch import router as batch_router
 from app.api.v1.companies import router as companies_router
+from app.api.v1.dashboard import router as dashboard_router
+from app.api.v1.events import router as events_router
+from app.api.v1.jobs import router as jobs_router
+from app.api.v1.payment_terms import router as payment_terms_router
 from app.api.v1.roles import router as roles_router
+from app.api.v1.search import router as search_router
 from app.api.v1.third_parties import router as third_parties_router
 from app.api.v1.users import router as users_router
 
@@ -14,4 +20,10 @@ api_router.include_router(users_router)
 api_router.include_router(companies_router)
 api_router.include_router(roles_router)
 api_router.include_router(third_parties_router)
+api_router.include_router(payment_terms_router)
 api_router.include_router(audit_logs_router)
+api_router.include_router(dashboard_router)
+api_router.include_router(events_router)
+api_router.include_router(jobs_router)
+api_router.include_router(batch_router)
+api_router.include_router(search_router)
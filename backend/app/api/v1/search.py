@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user, resolve_company_scope
+from app.models.user import User
+from app.schemas.search import SearchResult
+from app.services.search import SEARCH_PERMISSIONS, search
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=list[SearchResult])
+async def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    company_id: int | None = Query(None),
+    types: str | None = Query(
+        None, description="Comma-separated: user,company,third_party,contact"
+    ),
+    include_inactive: bool = Query(False),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Header-bar search: ranked, typed results among what the caller may view."""
+    wanted = {t.strip() for t in types.split(",") if t.strip()} if types else None
+    unknown = (wanted or set()) - SEARCH_PERMISSIONS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown type: {', '.join(sorted(unknown))}",
+        )
+    return await search(
+        db,
+        current_user,
+        q,
+        resolve_company_scope(current_user, company_id),
+        types=wanted,
+        include_inactive=include_inactive,
+        limit=limit,
+    )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import PermissionChecker
+from app.core.dependencies import PermissionChecker, resolve_company_scope
 from app.models.user import User
+from app.schemas.job import JobRead
 from app.schemas.third_party import (
     AddressCreate,
     AddressRead,
@@ -11,47 +13,108 @@ from app.schemas.third_party import (
     ContactCreate,
     ContactRead,
     ContactUpdate,
+    DuplicateClusterRead,
+    MergeRequest,
+    ThirdPartyBulkUpdate,
     ThirdPartyCreate,
+    ThirdPartyListItem,
+    ThirdPartyLookup,
     ThirdPartyRead,
     ThirdPartyUpdate,
 )
 from app.services.third_party import (
+    LIST_INCLUDES,
     add_address,
     add_contact,
+    bulk_update_third_parties,
     create_third_party,
     delete_address,
     delete_contact,
     get_third_party,
     list_third_parties,
+    lookup_third_parties,
     update_address,
     update_contact,
     update_third_party,
 )
+from app.services.dedupe import (
+    dismiss_duplicate_cluster,
+    get_duplicate_cluster,
+    list_duplicate_clusters,
+    merge_third_parties,
+)
+from app.services.jobs import enqueue_job
+from app.services.snapshot import get_customer_snapshot, snapshot_path
+from app.services.sync import list_changes
+from app.services.versioning import (
+    check_if_match,
+    collection_etag,
+    current_entity_etag,
+    etag_of,
+)
+from app.utils.etag import etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/third-parties", tags=["Third Parties"])
 
 
 @router.get("", response_model=dict)
 async def list_third_parties_endpoint(
+    request: Request,
+    response: Response,
     company_id: int = Query(...),
     is_customer: bool | None = Query(None),
     is_supplier: bool | None = Query(None),
+    is_employee: bool | None = Query(None),
+    tags: str | None = Query(None, description="Comma-separated tags"),
+    tag_mode: str = Query("any", pattern="^(any|all)$"),
+    customer_payment_term_id: int | None = Query(None),
+    supplier_payment_term_id: int | None = Query(None),
     search: str | None = Query(None),
+    include: str | None = Query(None, description="Comma-separated: addresses,contacts"),
+    facets: bool = Query(False, description="Add counts by tag, role and payment term"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(PermissionChecker("third_party.view")),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
 ):
+    company_id = resolve_company_scope(current_user, company_id)
+    etag = await collection_etag(db, ["third_parties"], company_id, request.url.query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    includes = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = includes - LIST_INCLUDES.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
     result = await list_third_parties(
         db,
         company_id,
         is_customer=is_customer,
         is_supplier=is_supplier,
+        is_employee=is_employee,
+        tags=[tag.strip() for tag in tags.split(",") if tag.strip()] if tags else None,
+        tag_mode=tag_mode,
+        customer_payment_term_id=customer_payment_term_id,
+        supplier_payment_term_id=supplier_payment_term_id,
         search=search,
+        include=includes,
+        facets=facets,
         page=page,
         page_size=page_size,
     )
-    result["items"] = [ThirdPartyRead.model_validate(tp) for tp in result["items"]]
+    items = []
+    for tp in result["items"]:
+        item = ThirdPartyListItem.model_validate(tp).model_dump()
+        if "addresses" in includes:
+            item["addresses"] = [AddressRead.model_validate(a) for a in tp.addresses]
+        if "contacts" in includes:
+            item["contacts"] = [ContactRead.model_validate(c) for c in tp.contacts]
+        items.append(item)
+    result["items"] = items
     return result
 
 
@@ -65,13 +128,168 @@ async def create_third_party_endpoint(
     return ThirdPartyRead.model_validate(tp)
 
 
+@router.post("/bulk-update", response_model=dict)
+async def bulk_update_third_parties_endpoint(
+    body: ThirdPartyBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    """Patch the partners given by ids or matching a filter (status, tags, payment terms)."""
+    resolve_company_scope(current_user, body.company_id)
+    ids = await bulk_update_third_parties(db, body, current_user)
+    return {"updated": len(ids), "ids": ids}
+
+
+@router.post("/lookup", response_model=dict)
+async def lookup_third_parties_endpoint(
+    body: ThirdPartyLookup,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    """Identify customers by phone, email, VAT / tax id or customer code (exact, normalized).
+
+    `matches` tells which key found which partner (or which of its contacts).
+    """
+    resolve_company_scope(current_user, body.company_id)
+    result = await lookup_third_parties(db, body)
+    result["third_parties"] = [
+        ThirdPartyListItem.model_validate(tp) for tp in result["third_parties"]
+    ]
+    return result
+
+
+@router.get("/changes", response_model=dict)
+async def third_party_changes_endpoint(
+    company_id: int = Query(...),
+    since: str | None = Query(None, description="Cursor returned by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    result = await list_changes(
+        db, "third_parties", resolve_company_scope(current_user, company_id), since, limit
+    )
+    result["items"] = [ThirdPartyRead.model_validate(tp) for tp in result["items"]]
+    return result
+
+
+@router.get("/snapshot")
+async def customer_snapshot_endpoint(
+    company_id: int = Query(...),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    """Gzipped customer snapshot for POS boot; supports Range and If-None-Match.
+
+    Follow up with /third-parties/changes?since=<X-Sync-Cursor>.
+    """
+    meta = await get_customer_snapshot(db, resolve_company_scope(current_user, company_id))
+    headers = {
+        "ETag": meta.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Snapshot-Version": str(meta.version),
+        "X-Sync-Cursor": meta.cursor,
+    }
+    if etag_matches(if_none_match, meta.etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        snapshot_path(meta),
+        media_type="application/gzip",
+        filename=f"customers-{meta.company_id}-{meta.digest[:12]}.json.gz",
+        headers=headers,
+    )
+
+
+@router.post("/snapshot/rebuild", response_model=JobRead, status_code=202)
+async def rebuild_snapshot_endpoint(
+    company_id: int = Query(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    """Queues a snapshot build, e.g. right after a bulk import."""
+    return await enqueue_job(
+        db,
+        "snapshot.customers",
+        company_id=resolve_company_scope(current_user, company_id),
+        current_user=current_user,
+    )
+
+
+# --- Duplicates ---
+@router.post("/duplicates/scan", response_model=JobRead, status_code=202)
+async def scan_duplicates_endpoint(
+    company_id: int = Query(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    """Queues a duplicate detection run; its clusters replace the open ones."""
+    return await enqueue_job(
+        db,
+        "third_party.dedupe",
+        company_id=resolve_company_scope(current_user, company_id),
+        current_user=current_user,
+    )
+
+
+@router.get("/duplicates", response_model=dict)
+async def list_duplicates_endpoint(
+    company_id: int = Query(...),
+    status_filter: str | None = Query(
+        "open", alias="status", pattern="^(open|merged|dismissed)$"
+    ),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.view")),
+):
+    result = await list_duplicate_clusters(
+        db, resolve_company_scope(current_user, company_id), status_filter, page, page_size
+    )
+    result["items"] = [DuplicateClusterRead.model_validate(c) for c in result["items"]]
+    return result
+
+
+@router.post("/duplicates/{cluster_id}/dismiss", response_model=DuplicateClusterRead)
+async def dismiss_duplicates_endpoint(
+    cluster_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    cluster = await get_duplicate_cluster(db, cluster_id)
+    resolve_company_scope(current_user, cluster.company_id)
+    cluster = await dismiss_duplicate_cluster(db, cluster_id, current_user)
+    return DuplicateClusterRead.model_validate(cluster)
+
+
+@router.post("/merge", response_model=dict)
+async def merge_third_parties_endpoint(
+    body: MergeRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("third_party.edit")),
+):
+    """Merge sources into targets: their addresses, contacts and references move over."""
+    resolve_company_scope(current_user, body.company_id)
+    target_ids = await merge_third_parties(db, body, current_user)
+    return {
+        "merged": sum(len(item.source_ids) for item in body.merges),
+        "target_ids": target_ids,
+    }
+
+
 @router.get("/{tp_id}", response_model=ThirdPartyRead)
 async def get_third_party_endpoint(
     tp_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("third_party.view")),
 ):
+    etag = await current_entity_etag(db, "third_party", tp_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     tp = await get_third_party(db, tp_id)
+    set_etag(response, etag_of("third_party", tp))
     return ThirdPartyRead.model_validate(tp)
 
 
@@ -79,10 +297,14 @@ async def get_third_party_endpoint(
 async def update_third_party_endpoint(
     tp_id: int,
     body: ThirdPartyUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("third_party.edit")),
 ):
+    await check_if_match(db, "third_party", tp_id, if_match)
     tp = await update_third_party(db, tp_id, body)
+    set_etag(response, etag_of("third_party", tp))
     return ThirdPartyRead.model_validate(tp)
 
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import PermissionChecker, get_current_user
+from app.core.dependencies import PermissionChecker, get_current_user, resolve_company_scope
 from app.models.user import User
 from app.schemas.user import (
+    UserBulkUpdate,
     UserChangePassword,
     UserCreate,
     UserRead,
@@ -14,6 +15,7 @@ from app.schemas.user import (
 )
 from app.services.user import (
     admin_reset_password,
+    bulk_update_users,
     change_password,
     create_user,
     get_user,
@@ -22,21 +24,38 @@ from app.services.user import (
     toggle_user_status,
     update_user,
 )
+from app.services.sync import list_changes
+from app.services.versioning import (
+    check_if_match,
+    collection_etag,
+    current_entity_etag,
+    etag_of,
+)
+from app.utils.etag import etag_matches, not_modified, set_etag
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("", response_model=dict)
 async def list_users_endpoint(
+    request: Request,
+    response: Response,
     company_id: int | None = Query(None),
     role_id: int | None = Query(None),
     is_active: bool | None = Query(None),
     search: str | None = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(PermissionChecker("admin.view")),
+    current_user: User = Depends(PermissionChecker("admin.view")),
 ):
+    company_id = resolve_company_scope(current_user, company_id)
+    # Users embed their role
+    etag = await collection_etag(db, ["users", "roles"], company_id, request.url.query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     result = await list_users(
         db,
         company_id=company_id,
@@ -60,13 +79,47 @@ async def create_user_endpoint(
     return UserRead.model_validate(user)
 
 
+@router.post("/bulk-update", response_model=dict)
+async def bulk_update_users_endpoint(
+    body: UserBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.edit")),
+):
+    """Patch the users given by ids or matching a filter; never the caller."""
+    ids = await bulk_update_users(
+        db, body, resolve_company_scope(current_user, body.company_id), current_user
+    )
+    return {"updated": len(ids), "ids": ids}
+
+
+@router.get("/changes", response_model=dict)
+async def user_changes_endpoint(
+    company_id: int | None = Query(None),
+    since: str | None = Query(None, description="Cursor returned by the previous call"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(PermissionChecker("admin.view")),
+):
+    result = await list_changes(
+        db, "users", resolve_company_scope(current_user, company_id), since, limit
+    )
+    result["items"] = [UserRead.model_validate(u) for u in result["items"]]
+    return result
+
+
 @router.get("/{user_id}", response_model=UserRead)
 async def get_user_endpoint(
     user_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(PermissionChecker("admin.view")),
 ):
+    etag = await current_entity_etag(db, "user", user_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     user = await get_user(db, user_id)
+    set_etag(response, etag_of("user", user))
     return UserRead.model_validate(user)
 
 
@@ -74,10 +127,14 @@ async def get_user_endpoint(
 async def update_user_endpoint(
     user_id: int,
     body: UserUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(PermissionChecker("admin.edit")),
 ):
+    await check_if_match(db, "user", user_id, if_match)
     user = await update_user(db, user_id, body, current_user=current_user)
+    set_etag(response, etag_of("user", user))
     return UserRead.model_validate(user)
 
 
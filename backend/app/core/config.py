@@ -16,7 +16,13 @@ for candidate in [_backend_dir / ".env", _root_dir / ".env"]:
         break
 
 
+DEFAULT_PIN_LOOKUP_KEY = "change-me"
+
+
 class Settings(BaseSettings):
+    # Development mode: tolerates placeholder secrets
+    DEBUG: bool = False
+
     # Database
     POSTGRES_USER: str = "erp_user"
     POSTGRES_PASSWORD: str = "erp_password_change_me"
@@ -43,6 +49,17 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_BACKEND: str = "jose"
+    # PEM keys for asymmetric algorithms (RS256, ES256...); SECRET_KEY otherwise
+    JWT_PRIVATE_KEY: str | None = None
+    JWT_PUBLIC_KEY: str | None = None
+    TOKEN_CACHE_SIZE: int = 10000
+    # Tickets that open an event stream (EventSource passes them in the URL)
+    STREAM_TICKET_EXPIRE_SECONDS: int = 30
+
+    # PIN lookup (keyed digest used to find a PIN's owner before bcrypt);
+    # changing it invalidates the stored digests, so PINs must be set again
+    PIN_LOOKUP_KEY: str = DEFAULT_PIN_LOOKUP_KEY
 
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = [
@@ -54,9 +71,71 @@ class Settings(BaseSettings):
     FIRST_SUPERADMIN_EMAIL: str = "admin@erp.local"
     FIRST_SUPERADMIN_PASSWORD: str = "admin123"
 
+    # Numbering: codes reserved per worker in one round trip
+    SEQUENCE_BLOCK_SIZE: int = 20
+
+    # Background jobs (python -m app.worker)
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_MAX_RUNNING_PER_COMPANY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: int = 5
+    JOB_HEARTBEAT_SECONDS: int = 15
+    # Running jobs without a heartbeat for this long are requeued
+    JOB_STALE_AFTER_SECONDS: int = 300
+    JOB_RETRY_BASE_SECONDS: int = 10
+
+    # Audit rollups: a day is rolled up this long after it ends (UTC), once
+    # transactions open at midnight are committed; until then it is counted live
+    AUDIT_ROLLUP_DELAY_SECONDS: int = 3600
+
+    # Dashboard summary cache (also dropped on any write of the tenant)
+    DASHBOARD_CACHE_SECONDS: int = 30
+
+    # /batch: sub-requests per call, and reads run at once (each on its
+    # own pooled connection unless the session is shared)
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Bulk updates: rows per statement and transaction
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_IDS: int = 10000
+
+    # Invoices per POST /payment-terms/schedule/batch
+    SCHEDULE_BATCH_MAX_INVOICES: int = 10000
+
+    # Calling code of national phone numbers (no "+" or "00") in the E.164
+    # lookup columns; baked into the generated columns when tables are created
+    PHONE_COUNTRY_CODE: str = "33"
+    LOOKUP_MAX_KEYS: int = 500
+
+    # Duplicate partner detection (see app.utils.dedupe)
+    DEDUPE_THRESHOLD: float = 0.75
+    DEDUPE_MAX_BLOCK: int = 50
+
+    # POS customer snapshots: a directory shared by the API and job workers
+    # (built by either, served by the API), e.g. a common volume
+    SNAPSHOT_DIR: str = "/tmp/erp-snapshots"
+
+    # Idempotency-Key on POST: responses are replayed for TTL; a first
+    # execution holds the key for at most LOCK, duplicates wait up to WAIT
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: int = 30
+
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    REDIS_TIMEOUT_SECONDS: float = 0.5
+    # After a failure, Redis is left alone (Postgres fallback) this long
+    REDIS_RETRY_SECONDS: int = 30
+
+    def check_secrets(self) -> None:
+        """Refuse to serve with the placeholder PIN lookup key, unless DEBUG.
+
+        With a known key, the digests stored next to the PIN hashes can be
+        brute-forced offline in no time (PINs have a few digits).
+        """
+        if not self.DEBUG and self.PIN_LOOKUP_KEY == DEFAULT_PIN_LOOKUP_KEY:
+            raise RuntimeError("PIN_LOOKUP_KEY must be set to a random secret (or DEBUG enabled)")
 
     model_config = SettingsConfigDict(
         env_file=str(_env_file) if _env_file else None,
@@ -1,5 +1,7 @@
 from collections.abc import AsyncGenerator
 
+import asyncpg
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
@@ -18,7 +20,27 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def connect_raw() -> asyncpg.Connection:
+    """Dedicated connection outside the pool, e.g. for LISTEN."""
+    return await asyncpg.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database=settings.POSTGRES_DB,
+    )
+
+
+# Scope key under which /batch lends its read-only session to sub-requests
+BATCH_SESSION_KEY = "erp.batch_session"
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    shared = request.scope.get(BATCH_SESSION_KEY)
+    if shared is not None:
+        # Owned, and rolled back on failure, by the batch request
+        yield shared
+        return
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy import select
@@ -12,11 +12,12 @@ from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Scope key under which /batch hands the principal it resolved to sub-requests
+BATCH_USER_KEY = "erp.batch_user"
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+
+async def authenticate_token(db: AsyncSession, token: str, token_type: str = "access") -> User:
+    """Active user a valid token of `token_type` was issued to, or 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,7 +25,7 @@ async def get_current_user(
     )
     try:
         payload = decode_token(token)
-        if payload.get("type") != "access":
+        if payload.get("type") != token_type:
             raise credentials_exception
         user_id: str | None = payload.get("sub")
         if user_id is None:
@@ -45,6 +46,18 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    batch_user = request.scope.get(BATCH_USER_KEY)
+    if batch_user is not None:
+        # Already authenticated by the batch request: attach, no query
+        return await db.merge(batch_user, load=False)
+    return await authenticate_token(db, token)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -53,6 +66,15 @@ async def get_current_active_user(
     return current_user
 
 
+def user_has_permission(user: User, permission: str) -> bool:
+    if user.role and user.role.is_superadmin:
+        return True
+    user_permissions: list[str] = []
+    if user.role and user.role.permissions:
+        user_permissions = user.role.permissions
+    return has_permission(user_permissions, permission)
+
+
 class PermissionChecker:
     """Dependency that checks a user has a specific permission."""
 
@@ -60,14 +82,7 @@ class PermissionChecker:
         self.required_permission = required_permission
 
     async def __call__(self, current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role and current_user.role.is_superadmin:
-            return current_user
-
-        user_permissions: list[str] = []
-        if current_user.role and current_user.role.permissions:
-            user_permissions = current_user.role.permissions
-
-        if not has_permission(user_permissions, self.required_permission):
+        if not user_has_permission(current_user, self.required_permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission required: {self.required_permission}",
@@ -95,3 +110,21 @@ class CompanyAccessChecker:
                 detail="Access denied to this company",
             )
         return current_user
+
+
+def resolve_company_scope(current_user: User, company_id: int | None) -> int | None:
+    """Company a list query must be restricted to.
+
+    Superadmins and multi-company roles may ask for any company, or none for
+    all of them; everyone else is pinned to their own company.
+    """
+    if current_user.role and (
+        current_user.role.is_superadmin or current_user.role.multi_company
+    ):
+        return company_id
+    if company_id is not None and company_id != current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this company",
+        )
+    return current_user.company_id
@@ -0,0 +1,12 @@
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+# Connections are opened lazily: importing this never needs Redis to be up
+redis_client = Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    decode_responses=True,
+    socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+    socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+)
@@ -1,3 +1,9 @@
+import hashlib
+import hmac
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -23,13 +29,112 @@ def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
     return bcrypt.checkpw(plain_pin.encode("utf-8"), hashed_pin.encode("utf-8"))
 
 
+def pin_lookup_digest(pin: str) -> str:
+    """Keyed digest of a PIN, stored next to the bcrypt hash.
+
+    Lets a typed PIN be matched to its owner with an index probe; the bcrypt
+    hash remains the authority and is still checked afterwards.
+    """
+    return hmac.new(
+        settings.PIN_LOOKUP_KEY.encode("utf-8"), pin.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+class JWTBackend(ABC):
+    """Signs and verifies JWTs.
+
+    Implementations must raise `jose.JWTError` on any invalid token so callers
+    keep a single error type whatever library is used underneath.
+    """
+
+    @abstractmethod
+    def encode(self, claims: dict) -> str: ...
+
+    @abstractmethod
+    def decode(self, token: str) -> dict: ...
+
+
+class JoseBackend(JWTBackend):
+    """python-jose backend, HMAC (SECRET_KEY) or asymmetric (PEM key pair)."""
+
+    def __init__(self) -> None:
+        self.algorithm = settings.ALGORITHM
+        if settings.JWT_PRIVATE_KEY:
+            self.signing_key = settings.JWT_PRIVATE_KEY
+            self.verify_key = settings.JWT_PUBLIC_KEY or settings.JWT_PRIVATE_KEY
+        else:
+            self.signing_key = self.verify_key = settings.SECRET_KEY
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.verify_key, algorithms=[self.algorithm])
+
+
+_jwt_backends: dict[str, Callable[[], JWTBackend]] = {"jose": JoseBackend}
+_jwt_backend: JWTBackend | None = None
+
+
+def register_jwt_backend(name: str, factory: Callable[[], JWTBackend]) -> None:
+    """Make a backend selectable through the JWT_BACKEND setting."""
+    _jwt_backends[name] = factory
+
+
+def get_jwt_backend() -> JWTBackend:
+    global _jwt_backend
+    if _jwt_backend is None:
+        _jwt_backend = _jwt_backends[settings.JWT_BACKEND]()
+    return _jwt_backend
+
+
+class TokenCache:
+    """Bounded LRU of verified token payloads, valid until the token's exp."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, exp = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or self.maxsize <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (dict(payload), float(exp))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return get_jwt_backend().encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
@@ -38,8 +143,20 @@ def create_refresh_token(data: dict) -> str:
         days=settings.REFRESH_TOKEN_EXPIRE_DAYS
     )
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return get_jwt_backend().encode(to_encode)
+
+
+def create_stream_ticket(data: dict) -> str:
+    """Short-lived token good for opening an event stream, and nothing else."""
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.STREAM_TICKET_EXPIRE_SECONDS)
+    to_encode.update({"exp": expire, "type": "stream"})
+    return get_jwt_backend().encode(to_encode)
 
 
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = get_jwt_backend().decode(token)
+        token_cache.put(token, payload)
+    return payload
@@ -15,6 +15,9 @@ from app.models.base import Base
 from app.models.company import Company
 from app.models.role import Role
 from app.models.user import User
+from app.core.redis import redis_client
+from app.services.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.services.notifications import hub
 
 logger = logging.getLogger(__name__)
 
@@ -85,18 +88,23 @@ async def seed_defaults() -> None:
             role_id=role_map["super_admin"].id,
         )
         db.add(admin)
+        role_map["super_admin"].user_count += 1
         await db.commit()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: ensure DB exists, create tables, seed
+    # Startup: check secrets, ensure DB exists, create tables, seed
+    settings.check_secrets()
     await ensure_database_exists()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     await seed_defaults()
+    hub.start()
     yield
     # Shutdown
+    await hub.stop()
+    await redis_client.aclose()
     await engine.dispose()
 
 
@@ -107,12 +115,15 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Added before CORS so that replayed responses get fresh CORS headers
+app.add_middleware(IdempotencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Snapshot-Version", "X-Sync-Cursor", REPLAYED_HEADER],
 )
 
 app.include_router(api_router)
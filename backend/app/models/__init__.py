@@ -5,6 +5,13 @@ from app.models.user import User
 from app.models.third_party import ThirdParty, Address, Contact
 from app.models.payment_term import PaymentTerm
 from app.models.audit_log import AuditLog
+from app.models.number_sequence import NumberSequence
+from app.models.tombstone import Tombstone
+from app.models.job import Job
+from app.models.audit_rollup import AuditRollup, AuditRollupWatermark
+from app.models.idempotency_key import IdempotencyKey
+from app.models.duplicate_cluster import DuplicateCluster
+from app.models.search_document import SearchDocument
 
 __all__ = [
     "Base",
@@ -16,4 +23,12 @@ __all__ = [
     "Contact",
     "PaymentTerm",
     "AuditLog",
+    "NumberSequence",
+    "Tombstone",
+    "Job",
+    "AuditRollup",
+    "AuditRollupWatermark",
+    "IdempotencyKey",
+    "DuplicateCluster",
+    "SearchDocument",
 ]
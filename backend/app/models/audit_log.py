@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -36,10 +36,26 @@ class AuditLog(Base):
     authorized_by_email: Mapped[str | None] = mapped_column(String(255))
     pin_verified: Mapped[bool | None] = mapped_column(default=None)
 
-    # Data snapshot (before/after)
+    # Data snapshot: updates store only {field: [old, new]} of changed fields
+    # in `changes`; one-sided snapshots (create, delete) stay in old/new_values.
+    # Values are encoded by app.utils.audit_delta.
     old_values: Mapped[dict | None] = mapped_column(JSONB, default=None)
     new_values: Mapped[dict | None] = mapped_column(JSONB, default=None)
+    changes: Mapped[dict | None] = mapped_column(JSONB, default=None)
 
     timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
     )
+
+
+Index(
+    "ix_audit_logs_company_timestamp",
+    AuditLog.company_id,
+    AuditLog.timestamp.desc(),
+)
+Index(
+    "ix_audit_logs_user_timestamp",
+    AuditLog.user_id,
+    AuditLog.timestamp.desc(),
+)
+Index("ix_audit_logs_entity", AuditLog.entity_type, AuditLog.entity_id)
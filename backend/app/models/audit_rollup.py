@@ -0,0 +1,41 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class AuditRollup(Base):
+    """Daily audit event counts per company, module, action and user.
+
+    Filled per closed day by the job worker (app.services.audit_rollup), so
+    activity charts only read the current days from audit_logs.
+    company_id/user_id 0 stand for events without a company or user.
+    """
+
+    __tablename__ = "audit_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "company_id", "module", "action", "user_id"),
+        Index("ix_audit_rollups_company_day", "company_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)  # UTC
+    company_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    module: Mapped[str] = mapped_column(String(50), nullable=False)
+    action: Mapped[str] = mapped_column(String(100), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pin_failed_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class AuditRollupWatermark(Base):
+    """Last UTC day folded into audit_rollups (a single row).
+
+    Later days are counted live from audit_logs, even if rows for them
+    exist in audit_rollups.
+    """
+
+    __tablename__ = "audit_rollup_watermark"
+
+    rolled_up_through: Mapped[date] = mapped_column(Date, nullable=False)
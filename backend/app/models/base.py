@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Integer, func
+from sqlalchemy import BigInteger, DateTime, Integer, Text, cast, func, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -19,3 +19,19 @@ class Base(DeclarativeBase):
         onupdate=func.now(),
         nullable=False,
     )
+
+
+class WriteTracked:
+    """Stamps rows with the id of the transaction that last wrote them.
+
+    Unlike updated_at (the transaction start time), comparing it with the
+    in-progress transactions of a snapshot tells whether a later commit can
+    still change what a reader saw; see services.versioning.
+    """
+
+    xact_id: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+        onupdate=cast(cast(func.pg_current_xact_id(), Text), BigInteger),
+        nullable=False,
+    )
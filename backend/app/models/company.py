@@ -1,10 +1,10 @@
 from sqlalchemy import Boolean, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, WriteTracked
 
 
-class Company(Base):
+class Company(WriteTracked, Base):
     __tablename__ = "companies"
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DuplicateCluster(Base):
+    """Partners found to be likely duplicates of each other by a dedupe run.
+
+    Status: open -> merged | dismissed. A new run of a company replaces its
+    open clusters.
+    """
+
+    __tablename__ = "duplicate_clusters"
+    __table_args__ = (Index("ix_duplicate_clusters_company_status", "company_id", "status"),)
+
+    company_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
+    )
+    job_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("jobs.id", ondelete="SET NULL")
+    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="open")
+    score: Mapped[float] = mapped_column(Float, nullable=False)  # best pair
+    member_ids: Mapped[list[int]] = mapped_column(JSONB, nullable=False)
+    # [[id, id, score, reasons], ...] of the pairs above the threshold
+    pairs: Mapped[list] = mapped_column(JSONB, nullable=False)
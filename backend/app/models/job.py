@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Job(Base):
+    """Background job, claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED.
+
+    Status: queued -> running -> succeeded | failed | cancelled. A failed
+    attempt goes back to queued with a later run_after until max_attempts.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order of runnable jobs; small as finished jobs leave it
+        Index(
+            "ix_jobs_queued",
+            "run_after",
+            "id",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("ix_jobs_company_status", "company_id", "status"),
+    )
+
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+    result: Mapped[dict | None] = mapped_column(JSONB)
+    error: Mapped[str | None] = mapped_column(Text)
+
+    progress: Mapped[int] = mapped_column(Integer, default=0)  # 0-100
+    progress_message: Mapped[str | None] = mapped_column(String(255))
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    worker_id: Mapped[str | None] = mapped_column(String(100))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    company_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("companies.id", ondelete="CASCADE")
+    )
+    created_by_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL")
+    )
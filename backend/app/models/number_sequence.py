@@ -0,0 +1,23 @@
+from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class NumberSequence(Base):
+    """Per-company counter behind generated codes (partners, documents).
+
+    `pattern` uses {YYYY}/{YY} for the year and {seq:05} for the padded
+    counter. Patterns containing the year restart at 1 when `period` changes.
+    """
+
+    __tablename__ = "number_sequences"
+    __table_args__ = (UniqueConstraint("company_id", "key"),)
+
+    company_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
+    )
+    key: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g. third_party.code
+    pattern: Mapped[str] = mapped_column(String(100), nullable=False)
+    period: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+    next_value: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
@@ -2,10 +2,10 @@ from sqlalchemy import ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, WriteTracked
 
 
-class PaymentTerm(Base):
+class PaymentTerm(WriteTracked, Base):
     """Payment terms (e.g. 30 days net, 50% upfront + 50% at delivery)."""
 
     __tablename__ = "payment_terms"
@@ -20,7 +20,7 @@ class PaymentTerm(Base):
     lines: Mapped[list[dict]] = mapped_column(JSONB, default=list)
 
     company_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True
     )
 
     company: Mapped["Company"] = relationship("Company", back_populates="payment_terms")  # noqa: F821
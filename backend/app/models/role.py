@@ -2,16 +2,16 @@ from sqlalchemy import Boolean, ForeignKey, Integer, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, WriteTracked
 
 
-class Role(Base):
+class Role(WriteTracked, Base):
     __tablename__ = "roles"
 
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     label: Mapped[str] = mapped_column(String(100), nullable=False)
     company_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("companies.id", ondelete="CASCADE")
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), index=True
     )
     is_superadmin: Mapped[bool] = mapped_column(Boolean, default=False)
     multi_company: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -20,6 +20,10 @@ class Role(Base):
     # Permissions stored as JSON array: ["pos.view", "stock.*", ...]
     permissions: Mapped[list[str]] = mapped_column(JSONB, default=list)
 
+    # Denormalized number of users holding this role, maintained by the user
+    # service (see services.role.adjust_role_user_count / recount_role_users)
+    user_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # Relationships
     company: Mapped["Company | None"] = relationship("Company", back_populates="roles")  # noqa: F821
     users: Mapped[list["User"]] = relationship("User", back_populates="role")  # noqa: F821
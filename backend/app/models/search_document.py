@@ -0,0 +1,194 @@
+"""One searchable document per user, partner, contact and company.
+
+Documents are maintained by row triggers on the source tables, so every
+writer (ORM, core statements, cascades) keeps them current. The triggers
+are (re)installed after each `create_all`; a newly created table is filled
+from the existing rows.
+"""
+
+from sqlalchemy import DDL, Boolean, Computed, Index, Integer, String, Text, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+from app.utils.normalize import digits_sql, search_text_sql
+
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        Index("ix_search_documents_entity", "entity_type", "entity_id", unique=True),
+        Index("ix_search_documents_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_search_documents_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_search_documents_parent",
+            "parent_id",
+            postgresql_where=text("parent_id IS NOT NULL"),
+        ),
+    )
+
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Tenant (a company's own document carries its id); null for global users
+    company_id: Mapped[int | None] = mapped_column(Integer)
+    # Partner of a contact
+    parent_id: Mapped[int | None] = mapped_column(Integer)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    subtitle: Mapped[str | None] = mapped_column(String(255))
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Lower-case, accent-free text of the searchable fields
+    search_text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('simple'::regconfig, search_text)", persisted=True)
+    )
+
+
+def _text(*fields: str) -> str:
+    return search_text_sql(f"concat_ws(' ', {', '.join(fields)})")
+
+
+# entity type -> source table, trigger columns and document values, the
+# latter as SQL over the source row `r`
+SOURCES = {
+    "user": {
+        "table": "users",
+        "columns": ("first_name", "last_name", "email", "phone", "is_active", "company_id"),
+        "company_id": "r.company_id",
+        "parent_id": "NULL::integer",
+        "title": "r.first_name || ' ' || r.last_name",
+        "subtitle": "r.email",
+        "search_text": _text(
+            "r.first_name", "r.last_name", "r.email", "r.phone", digits_sql("r.phone")
+        ),
+        "is_active": "r.is_active",
+    },
+    "third_party": {
+        "table": "third_parties",
+        "columns": (
+            "name", "legal_name", "code", "customer_code", "supplier_code", "email",
+            "phone", "mobile", "vat_number", "tax_id", "is_active", "company_id",
+        ),
+        "company_id": "r.company_id",
+        "parent_id": "NULL::integer",
+        "title": "r.name",
+        "subtitle": "r.code",
+        "search_text": _text(
+            "r.name", "r.legal_name", "r.code", "r.customer_code", "r.supplier_code",
+            "r.email", "r.phone", digits_sql("r.phone"), "r.mobile", digits_sql("r.mobile"),
+            "r.vat_number", "r.tax_id",
+        ),
+        "is_active": "r.is_active",
+    },
+    "contact": {
+        "table": "contacts",
+        "columns": (
+            "first_name", "last_name", "job_title", "email", "phone", "mobile", "third_party_id",
+        ),
+        # Tenant, subtitle and status come from the partner
+        "company_id": "p.company_id",
+        "parent_id": "r.third_party_id",
+        "title": "r.first_name || ' ' || r.last_name",
+        "subtitle": "p.name",
+        "search_text": _text(
+            "r.first_name", "r.last_name", "r.job_title", "r.email",
+            "r.phone", digits_sql("r.phone"), "r.mobile", digits_sql("r.mobile"),
+        ),
+        "is_active": "p.is_active",
+        "join": "JOIN third_parties p ON p.id = r.third_party_id",
+    },
+    "company": {
+        "table": "companies",
+        "columns": ("name", "legal_name", "tax_id", "vat_number", "city", "email", "is_active"),
+        "company_id": "r.id",
+        "parent_id": "NULL::integer",
+        "title": "r.name",
+        "subtitle": "r.city",
+        "search_text": _text(
+            "r.name", "r.legal_name", "r.tax_id", "r.vat_number", "r.city", "r.email"
+        ),
+        "is_active": "r.is_active",
+    },
+}
+
+DOCUMENT_COLUMNS = (
+    "entity_type, entity_id, company_id, parent_id, title, subtitle, search_text, is_active"
+)
+
+
+def _documents_select(entity_type: str, source: dict, relation: str) -> str:
+    """SELECT of the documents of the rows of `relation` (a table, or NEW)."""
+    return (
+        f"SELECT '{entity_type}', r.id, {source['company_id']}, {source['parent_id']}, "
+        f"left({source['title']}, 255), left({source['subtitle']}, 255), "
+        f"{source['search_text']}, {source['is_active']} "
+        f"FROM {relation} AS r {source.get('join', '')}"
+    )
+
+
+def _trigger_function(entity_type: str, source: dict) -> str:
+    extra = ""
+    if entity_type == "third_party":
+        # Contacts show their partner's name, tenant and status
+        extra = """
+    IF TG_OP = 'UPDATE' THEN
+        UPDATE search_documents
+        SET company_id = NEW.company_id, subtitle = left(NEW.name, 255),
+            is_active = NEW.is_active, updated_at = now()
+        WHERE entity_type = 'contact' AND parent_id = NEW.id
+          AND (company_id, subtitle, is_active)
+              IS DISTINCT FROM (NEW.company_id, left(NEW.name, 255), NEW.is_active);
+    END IF;"""
+    return f"""
+CREATE OR REPLACE FUNCTION search_index_{entity_type}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM search_documents
+        WHERE entity_type = '{entity_type}' AND entity_id = OLD.id;
+        RETURN NULL;
+    END IF;
+    INSERT INTO search_documents ({DOCUMENT_COLUMNS})
+    {_documents_select(entity_type, source, "(SELECT NEW.*)")}
+    ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+        company_id = EXCLUDED.company_id, parent_id = EXCLUDED.parent_id,
+        title = EXCLUDED.title, subtitle = EXCLUDED.subtitle,
+        search_text = EXCLUDED.search_text, is_active = EXCLUDED.is_active,
+        updated_at = now();{extra}
+    RETURN NULL;
+END $$"""
+
+
+def _trigger(entity_type: str, source: dict) -> str:
+    return (
+        f"CREATE OR REPLACE TRIGGER search_index AFTER INSERT OR DELETE OR UPDATE OF "
+        f"{', '.join(source['columns'])} ON {source['table']} "
+        f"FOR EACH ROW EXECUTE FUNCTION search_index_{entity_type}()"
+    )
+
+
+def _backfill(entity_type: str, source: dict) -> str:
+    return (
+        f"INSERT INTO search_documents ({DOCUMENT_COLUMNS}) "
+        f"{_documents_select(entity_type, source, source['table'])} "
+        f"ON CONFLICT (entity_type, entity_id) DO NOTHING"
+    )
+
+
+event.listen(
+    SearchDocument.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_search_triggers(target, connection, tables=(), **kw) -> None:
+    created = SearchDocument.__table__ in tables
+    for entity_type, source in SOURCES.items():
+        connection.exec_driver_sql(_trigger_function(entity_type, source))
+        connection.exec_driver_sql(_trigger(entity_type, source))
+        if created:
+            connection.exec_driver_sql(_backfill(entity_type, source))
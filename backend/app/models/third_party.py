@@ -1,11 +1,31 @@
-from sqlalchemy import Boolean, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-
-from app.models.base import Base
-
-
-class ThirdParty(Base):
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy import func, select
+from sqlalchemy.orm import Mapped, column_property, deferred, mapped_column, relationship
+
+from app.core.config import settings
+from app.models.base import Base, WriteTracked
+from app.utils.normalize import e164_sql, email_sql, keys_sql, tax_id_sql
+
+# Normalized copies of the identifiers typed at the till, maintained by
+# PostgreSQL whichever way a row is written
+PHONE_KEYS_SQL = keys_sql(
+    e164_sql("phone", settings.PHONE_COUNTRY_CODE),
+    e164_sql("mobile", settings.PHONE_COUNTRY_CODE),
+)
+
+
+class ThirdParty(WriteTracked, Base):
     """Unified model for Client / Supplier / Employee.
 
     A third party can wear multiple hats (e.g. client AND supplier)
@@ -13,17 +33,59 @@ class ThirdParty(Base):
     """
 
     __tablename__ = "third_parties"
+    __table_args__ = (
+        # Codes are unique per company; named as PostgreSQL names them by
+        # default, so conflicts can be told apart by constraint
+        UniqueConstraint("company_id", "code", name="third_parties_company_id_code_key"),
+        UniqueConstraint(
+            "company_id", "customer_code", name="third_parties_company_id_customer_code_key"
+        ),
+        UniqueConstraint(
+            "company_id", "supplier_code", name="third_parties_company_id_supplier_code_key"
+        ),
+        # Tenant list ordered by name; inactive partners are never listed
+        Index(
+            "ix_third_parties_company_name_active",
+            "company_id",
+            "name",
+            postgresql_where=text("is_active"),
+        ),
+        # Collection version (max(xact_id), count) and delta sync cursor
+        Index("ix_third_parties_company_xact", "company_id", "xact_id", "id"),
+        # Tag filters: containment (@>) only, hence the smaller path_ops
+        Index(
+            "ix_third_parties_tags",
+            "tags",
+            postgresql_using="gin",
+            postgresql_ops={"tags": "jsonb_path_ops"},
+        ),
+        # Exact lookups (POS customer identification)
+        Index("ix_third_parties_company_email_key", "company_id", "email_key"),
+        Index("ix_third_parties_phone_keys", "phone_keys", postgresql_using="gin"),
+        Index("ix_third_parties_tax_keys", "tax_keys", postgresql_using="gin"),
+        # "Term in use?" when a payment term is deleted
+        Index(
+            "ix_third_parties_customer_payment_term",
+            "customer_payment_term_id",
+            postgresql_where=text("customer_payment_term_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_third_parties_supplier_payment_term",
+            "supplier_payment_term_id",
+            postgresql_where=text("supplier_payment_term_id IS NOT NULL"),
+        ),
+    )
 
     # Identity
-    code: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
-    name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    code: Mapped[str] = mapped_column(String(50), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
     legal_name: Mapped[str | None] = mapped_column(String(255))
     tax_id: Mapped[str | None] = mapped_column(String(50))
     vat_number: Mapped[str | None] = mapped_column(String(50))
 
     # Roles (multi-hat)
-    is_customer: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
-    is_supplier: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    is_customer: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_supplier: Mapped[bool] = mapped_column(Boolean, default=False)
     is_employee: Mapped[bool] = mapped_column(Boolean, default=False)
 
     # Customer-specific fields
@@ -50,6 +112,19 @@ class ThirdParty(Base):
     tags: Mapped[list[str] | None] = mapped_column(JSONB, default=list)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Lookup keys (generated, see app.utils.normalize)
+    email_key: Mapped[str | None] = mapped_column(
+        Text, Computed(email_sql("email"), persisted=True), deferred=True
+    )
+    phone_keys: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), Computed(PHONE_KEYS_SQL, persisted=True), deferred=True
+    )
+    tax_keys: Mapped[list[str]] = mapped_column(
+        ARRAY(Text),
+        Computed(keys_sql(tax_id_sql("vat_number"), tax_id_sql("tax_id")), persisted=True),
+        deferred=True,
+    )
+
     # Tenant
     company_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False
@@ -75,7 +150,7 @@ class Address(Base):
     __tablename__ = "addresses"
 
     third_party_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("third_parties.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("third_parties.id", ondelete="CASCADE"), nullable=False, index=True
     )
     label: Mapped[str] = mapped_column(String(100), default="Principal")
     address_line1: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -94,9 +169,13 @@ class Address(Base):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_email_key", "email_key"),
+        Index("ix_contacts_phone_keys", "phone_keys", postgresql_using="gin"),
+    )
 
     third_party_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("third_parties.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("third_parties.id", ondelete="CASCADE"), nullable=False, index=True
     )
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -107,7 +186,34 @@ class Contact(Base):
     is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
     notes: Mapped[str | None] = mapped_column(Text)
 
+    # Lookup keys (generated, see app.utils.normalize)
+    email_key: Mapped[str | None] = mapped_column(
+        Text, Computed(email_sql("email"), persisted=True), deferred=True
+    )
+    phone_keys: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), Computed(PHONE_KEYS_SQL, persisted=True), deferred=True
+    )
+
     # Relationships
     third_party: Mapped["ThirdParty"] = relationship(
         "ThirdParty", back_populates="contacts"
     )
+
+
+# Child counts for list rows, only loaded when undeferred
+ThirdParty.address_count = deferred(
+    column_property(
+        select(func.count(Address.id))
+        .where(Address.third_party_id == ThirdParty.id)
+        .correlate_except(Address)
+        .scalar_subquery()
+    )
+)
+ThirdParty.contact_count = deferred(
+    column_property(
+        select(func.count(Contact.id))
+        .where(Contact.third_party_id == ThirdParty.id)
+        .correlate_except(Contact)
+        .scalar_subquery()
+    )
+)
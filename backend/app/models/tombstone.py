@@ -0,0 +1,18 @@
+from sqlalchemy import Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, WriteTracked
+
+
+class Tombstone(WriteTracked, Base):
+    """Trace of a hard-deleted row, so delta-sync clients can drop it."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_company_xact", "company_id", "xact_id", "id"),
+    )
+
+    entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # No FK: tombstones outlive their company scope on purpose
+    company_id: Mapped[int | None] = mapped_column(Integer)
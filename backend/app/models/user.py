@@ -1,11 +1,17 @@
-from sqlalchemy import Boolean, ForeignKey, Integer, String
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import Base
+from app.models.base import Base, WriteTracked
 
 
-class User(Base):
+class User(WriteTracked, Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_company_last_name", "company_id", "last_name"),
+        Index("ix_users_company_pin_lookup", "company_id", "pin_lookup"),
+        # Collection version (max(xact_id), count) and delta sync cursor
+        Index("ix_users_company_xact", "company_id", "xact_id", "id"),
+    )
 
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -15,6 +21,8 @@ class User(Base):
 
     # PIN for POS sensitive actions (hashed)
     hashed_pin: Mapped[str | None] = mapped_column(String(255))
+    # HMAC of the PIN, used to identify a supervisor from a typed PIN
+    pin_lookup: Mapped[str | None] = mapped_column(String(64))
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
@@ -23,7 +31,7 @@ class User(Base):
         Integer, ForeignKey("companies.id", ondelete="SET NULL")
     )
     role_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("roles.id", ondelete="SET NULL")
+        Integer, ForeignKey("roles.id", ondelete="SET NULL"), index=True
     )
 
     # Relationships
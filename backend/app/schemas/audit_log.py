@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+from app.utils.audit_delta import expand
 
 
 class AuditLogRead(BaseModel):
@@ -22,3 +24,21 @@ class AuditLogRead(BaseModel):
     timestamp: datetime
 
     model_config = {"from_attributes": True}
+
+    @model_validator(mode="before")
+    @classmethod
+    def expand_changes(cls, data):
+        """Present stored deltas as old_values/new_values of the changed fields."""
+        if isinstance(data, dict) or not hasattr(data, "changes"):
+            return data
+        values = {field: getattr(data, field) for field in cls.model_fields}
+        values["old_values"], values["new_values"] = expand(
+            data.changes, data.old_values, data.new_values
+        )
+        return values
+
+
+class AuditLogImages(BaseModel):
+    before: dict | None
+    after: dict | None
+    complete: bool  # False when the entity's creation entry is missing
@@ -26,3 +26,8 @@ class PinVerifyRequest(BaseModel):
 class PinVerifyResponse(BaseModel):
     verified: bool
     message: str
+
+
+class PinOverrideResponse(PinVerifyResponse):
+    authorized_by_user_id: int
+    authorized_by_email: str
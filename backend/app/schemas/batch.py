@@ -0,0 +1,41 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+
+class BatchItem(BaseModel):
+    id: str | None = None  # echoed back, to match results to requests
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str  # relative to /api/v1, query string included: "/roles?page_size=100"
+    headers: dict[str, str] = {}
+    body: Any = None
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, v: str) -> str:
+        if not v.startswith("/") or v.startswith("//"):
+            raise ValueError("Path must be relative to /api/v1 and start with '/'")
+        return v
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchItem] = Field(min_length=1)
+    # Run the reads one after another on the batch's own read-only session
+    # (one connection) instead of concurrently on a connection each
+    shared_session: bool = False
+
+    @field_validator("requests")
+    @classmethod
+    def validate_size(cls, v: list[BatchItem]) -> list[BatchItem]:
+        if len(v) > settings.BATCH_MAX_REQUESTS:
+            raise ValueError(f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+        return v
+
+
+class BatchItemResult(BaseModel):
+    id: str | None = None
+    status: int
+    headers: dict[str, str] = {}
+    body: Any = None
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: str  # "queued" | "running" | "succeeded" | "failed" | "cancelled"
+    payload: dict
+    result: dict | None = None
+    error: str | None = None
+    progress: int
+    progress_message: str | None = None
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    cancel_requested: bool
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    company_id: int | None = None
+    created_by_id: int | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,12 +1,34 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.config import settings
 
 
 class PaymentTermLineSchema(BaseModel):
     percentage: float
-    days: int
-    type: str  # "immediate" | "net" | "end_of_month"
+    days: int = 0
+    type: Literal["immediate", "net", "end_of_month"]
+
+    @field_validator("percentage")
+    @classmethod
+    def validate_percentage(cls, v: float) -> float:
+        if not 0 < v <= 100 or round(v, 2) != v:
+            raise ValueError("Percentage must be in (0, 100] with at most 2 decimals")
+        return v
+
+    @field_validator("days")
+    @classmethod
+    def validate_days(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError("Days cannot be negative")
+        return v
+
+
+def _check_total(lines: list[PaymentTermLineSchema] | None) -> None:
+    if lines and round(sum(line.percentage for line in lines), 2) != 100:
+        raise ValueError("Line percentages must add up to 100")
 
 
 class PaymentTermBase(BaseModel):
@@ -19,6 +41,11 @@ class PaymentTermBase(BaseModel):
 class PaymentTermCreate(PaymentTermBase):
     company_id: int
 
+    @model_validator(mode="after")
+    def validate_lines(self):
+        _check_total(self.lines)
+        return self
+
 
 class PaymentTermUpdate(BaseModel):
     name: str | None = None
@@ -26,6 +53,11 @@ class PaymentTermUpdate(BaseModel):
     description: str | None = None
     lines: list[PaymentTermLineSchema] | None = None
 
+    @model_validator(mode="after")
+    def validate_lines(self):
+        _check_total(self.lines)
+        return self
+
 
 class PaymentTermRead(PaymentTermBase):
     id: int
@@ -34,3 +66,30 @@ class PaymentTermRead(PaymentTermBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ScheduleRequest(BaseModel):
+    invoice_date: date
+    amount: float
+
+
+class InstallmentRead(BaseModel):
+    due_date: date
+    amount: float
+    percentage: float
+    type: str
+
+
+class ScheduleBatchRequest(BaseModel):
+    """Column-oriented batch: the i-th invoice is (term_ids[i], invoice_dates[i], amounts[i])."""
+
+    company_id: int
+    term_ids: list[int] = Field(max_length=settings.SCHEDULE_BATCH_MAX_INVOICES)
+    invoice_dates: list[date]
+    amounts: list[float]
+
+    @model_validator(mode="after")
+    def validate_columns(self):
+        if not len(self.term_ids) == len(self.invoice_dates) == len(self.amounts):
+            raise ValueError("term_ids, invoice_dates and amounts must have the same length")
+        return self
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    type: Literal["user", "company", "third_party", "contact"]
+    id: int
+    title: str
+    subtitle: str | None
+    company_id: int | None
+    parent_id: int | None  # partner of a contact
+    is_active: bool
+    rank: float
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class NumberSequenceRead(BaseModel):
+    key: str
+    pattern: str
+    period: str
+    next_value: int
+
+
+class NumberSequenceUpdate(BaseModel):
+    pattern: str = Field(max_length=100)  # e.g. "CLI-{YYYY}-{seq:05}"
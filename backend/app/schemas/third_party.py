@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.config import settings
 
 
 # --- Address ---
@@ -95,6 +98,7 @@ class ThirdPartyBase(BaseModel):
 
 
 class ThirdPartyCreate(ThirdPartyBase):
+    code: str | None = None  # allocated from the company sequence when omitted
     company_id: int
     customer_payment_term_id: int | None = None
     supplier_payment_term_id: int | None = None
@@ -124,6 +128,56 @@ class ThirdPartyUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class ThirdPartyBulkFilter(BaseModel):
+    is_customer: bool | None = None
+    is_supplier: bool | None = None
+    is_employee: bool | None = None
+    is_active: bool | None = None
+    tags: list[str] | None = None
+    tag_mode: Literal["any", "all"] = "any"
+    search: str | None = None
+
+
+class ThirdPartyBulkPatch(BaseModel):
+    is_active: bool | None = None
+    customer_payment_term_id: int | None = None
+    supplier_payment_term_id: int | None = None
+    tags: list[str] | None = None  # replaces the tags
+    add_tags: list[str] | None = None
+    remove_tags: list[str] | None = None
+
+    @field_validator("is_active", "tags")
+    @classmethod
+    def validate_not_null(cls, v):
+        # Omit the field to leave it as is: the columns are not nullable
+        if v is None:
+            raise ValueError("Cannot be null")
+        return v
+
+    @model_validator(mode="after")
+    def check_tags(self) -> "ThirdPartyBulkPatch":
+        if self.tags is not None and (self.add_tags or self.remove_tags):
+            raise ValueError("Use either tags or add_tags/remove_tags")
+        return self
+
+
+class ThirdPartyBulkUpdate(BaseModel):
+    """Partners of `company_id` to patch, by ids or by filter."""
+
+    company_id: int
+    ids: list[int] | None = Field(None, max_length=settings.BULK_MAX_IDS)
+    filter: ThirdPartyBulkFilter | None = None
+    patch: ThirdPartyBulkPatch
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "ThirdPartyBulkUpdate":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give either ids or filter")
+        if not self.patch.model_fields_set:
+            raise ValueError("Patch is empty")
+        return self
+
+
 class ThirdPartyRead(ThirdPartyBase):
     id: int
     company_id: int
@@ -136,3 +190,62 @@ class ThirdPartyRead(ThirdPartyBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ThirdPartyListItem(ThirdPartyBase):
+    """List row: children are counted, and only embedded on request."""
+
+    id: int
+    company_id: int
+    is_active: bool
+    customer_payment_term_id: int | None
+    supplier_payment_term_id: int | None
+    address_count: int = 0
+    contact_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+# --- Lookup ---
+class ThirdPartyLookup(BaseModel):
+    """Keys typed or scanned at the till, matched exactly once normalized."""
+
+    company_id: int
+    phones: list[str] = Field([], max_length=settings.LOOKUP_MAX_KEYS)
+    emails: list[str] = Field([], max_length=settings.LOOKUP_MAX_KEYS)
+    tax_ids: list[str] = Field([], max_length=settings.LOOKUP_MAX_KEYS)  # VAT or tax id
+    customer_codes: list[str] = Field([], max_length=settings.LOOKUP_MAX_KEYS)
+    include_inactive: bool = False
+
+
+class LookupMatch(BaseModel):
+    type: Literal["phone", "email", "tax_id", "customer_code"]
+    key: str  # as given
+    third_party_id: int
+    contact_id: int | None = None  # set when the key is a contact's
+
+
+# --- Duplicates ---
+class DuplicateClusterRead(BaseModel):
+    id: int
+    company_id: int
+    job_id: int | None
+    status: str  # "open" | "merged" | "dismissed"
+    score: float
+    member_ids: list[int]
+    pairs: list
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class MergeItem(BaseModel):
+    target_id: int  # kept
+    source_ids: list[int] = Field(min_length=1)  # merged into the target, then deleted
+
+
+class MergeRequest(BaseModel):
+    company_id: int
+    merges: list[MergeItem] = Field(min_length=1, max_length=1000)
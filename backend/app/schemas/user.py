@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.config import settings
 
 from app.schemas.role import RoleRead
 
@@ -57,6 +59,42 @@ class UserResetPassword(BaseModel):
     new_password: str
 
 
+class UserBulkFilter(BaseModel):
+    role_id: int | None = None
+    is_active: bool | None = None
+    search: str | None = None
+
+
+class UserBulkPatch(BaseModel):
+    is_active: bool | None = None
+    role_id: int | None = None  # explicit null removes the role
+
+    @field_validator("is_active")
+    @classmethod
+    def validate_not_null(cls, v: bool | None) -> bool:
+        # Omit the field to leave it as is: the column is not nullable
+        if v is None:
+            raise ValueError("Cannot be null")
+        return v
+
+
+class UserBulkUpdate(BaseModel):
+    """Users to patch, by ids or by filter, within `company_id`."""
+
+    company_id: int | None = None
+    ids: list[int] | None = Field(None, max_length=settings.BULK_MAX_IDS)
+    filter: UserBulkFilter | None = None
+    patch: UserBulkPatch
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "UserBulkUpdate":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give either ids or filter")
+        if not self.patch.model_fields_set:
+            raise ValueError("Patch is empty")
+        return self
+
+
 class UserRead(UserBase):
     id: int
     is_active: bool
@@ -1,10 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy import select
+from fastapi import HTTPException, status
+from sqlalchemy import and_, cast, func, literal, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.utils.audit_delta import compute_delta, encode_value, expand
 from app.utils.pagination import paginate
 
 
@@ -23,6 +26,10 @@ async def log_action(
     authorized_by: User | None = None,
     pin_verified: bool | None = None,
 ) -> AuditLog:
+    changes = None
+    if old_values is not None and new_values is not None:
+        changes = compute_delta(old_values, new_values)
+        old_values = new_values = None
     log = AuditLog(
         user_id=user.id,
         user_email=user.email,
@@ -33,8 +40,9 @@ async def log_action(
         description=description,
         company_id=user.company_id,
         ip_address=ip_address,
-        old_values=old_values,
-        new_values=new_values,
+        old_values=encode_value(old_values),
+        new_values=encode_value(new_values),
+        changes=changes,
         authorized_by_user_id=authorized_by.id if authorized_by else None,
         authorized_by_email=authorized_by.email if authorized_by else None,
         pin_verified=pin_verified,
@@ -46,6 +54,7 @@ async def log_action(
 async def list_audit_logs(
     db: AsyncSession,
     *,
+    company_id: int | None = None,
     user_id: int | None = None,
     action: str | None = None,
     module: str | None = None,
@@ -55,6 +64,8 @@ async def list_audit_logs(
     page_size: int = 20,
 ) -> dict:
     query = select(AuditLog).order_by(AuditLog.timestamp.desc())
+    if company_id is not None:
+        query = query.where(AuditLog.company_id == company_id)
     if user_id is not None:
         query = query.where(AuditLog.user_id == user_id)
     if action is not None:
@@ -66,3 +77,80 @@ async def list_audit_logs(
     if date_to is not None:
         query = query.where(AuditLog.timestamp <= date_to)
     return await paginate(db, query, page, page_size)
+
+
+async def get_audit_log(db: AsyncSession, log_id: int) -> AuditLog:
+    result = await db.execute(select(AuditLog).where(AuditLog.id == log_id))
+    log = result.scalar_one_or_none()
+    if not log:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audit log not found")
+    return log
+
+
+def _bulk_values(entry_new: dict, entity_id: int) -> dict | None:
+    """Values a bulk_update entry gave `entity_id`; None if not recorded."""
+    if "values" not in entry_new:
+        return None
+    return {
+        field: value
+        for field, groups in entry_new["values"].items()
+        for value, ranges in groups
+        if any(first <= entity_id <= last for first, last in ranges)
+    }
+
+
+async def rebuild_entity_images(db: AsyncSession, log: AuditLog) -> dict:
+    """Full before/after image of the entity around one audit entry.
+
+    Deltas only keep changed fields; the unchanged ones are recovered by
+    replaying the entity's earlier entries, from its creation snapshot on,
+    including the bulk updates whose id ranges cover it. `complete` tells
+    whether that creation snapshot was found and every entry could be
+    replayed.
+    """
+    old, new = expand(log.changes, log.old_values, log.new_values)
+    if log.entity_type is None or log.entity_id is None:
+        return {"before": old, "after": new, "complete": False}
+    # Bulk entries whose [first, last] id ranges contain the entity (strict:
+    # lax mode would unwrap the pairs)
+    covered = func.jsonb_path_exists(
+        AuditLog.new_values,
+        cast("strict $.ids[*] ? (@[0] <= $id && @[1] >= $id)", JSONPATH),
+        literal({"id": log.entity_id}, JSONB),
+    )
+    history = await db.execute(
+        select(AuditLog)
+        .where(
+            AuditLog.entity_type == log.entity_type,
+            or_(
+                AuditLog.entity_id == log.entity_id,
+                and_(
+                    AuditLog.entity_id.is_(None),
+                    AuditLog.action == "bulk_update",
+                    covered,
+                ),
+            ),
+            tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(log.timestamp, log.id),
+        )
+        .order_by(AuditLog.timestamp, AuditLog.id)
+    )
+    state: dict = {}
+    complete = False
+    replayable = True
+    for entry in history.scalars():
+        _, entry_new = expand(entry.changes, entry.old_values, entry.new_values)
+        if entry.entity_id is None:
+            values = _bulk_values(entry_new, log.entity_id)
+            if values is None:
+                # Written before bulk entries recorded their new values
+                replayable = False
+            else:
+                state.update(values)
+        elif entry.action == "create" and entry_new is not None:
+            # Creation snapshot: restart from it
+            state, complete = dict(entry_new), True
+        elif entry_new:
+            state.update(entry_new)
+    before = {**state, **(old or {})}
+    after = {**before, **(new or {})}
+    return {"before": before, "after": after, "complete": complete and replayable}
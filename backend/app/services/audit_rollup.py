@@ -0,0 +1,201 @@
+"""Audit activity rollups for dashboards.
+
+Writers never touch the rollups: audit entries are only inserted. A day is
+folded into `audit_rollups` by the job worker once it is closed, i.e.
+AUDIT_ROLLUP_DELAY_SECONDS after midnight UTC, so that entries of
+transactions still open at midnight are in, and the watermark
+(audit_rollup_watermark) moves past it. Later days are counted live from
+audit_logs through its (company_id, timestamp) index. Rows that reach
+audit_logs another way (COPY, restores) are recounted by
+`rebuild_audit_rollups`.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, cast, delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup, AuditRollupWatermark
+
+BUCKETS = ("day", "week", "month")
+# group_by -> rollup column
+GROUPS = {
+    "module": "module",
+    "action": "action",
+    "user": "user_id",
+    "company": "company_id",
+}
+_KEY_COLUMNS = ["day", "company_id", "module", "action", "user_id"]
+# pg_advisory_xact_lock key: one rollup writer at a time
+_ROLLUP_LOCK = 0x617564697430
+_WATERMARK_ID = 1
+
+
+def _utc_day(moment):
+    return cast(func.timezone("UTC", moment), Date)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def last_closed_day() -> date:
+    closing = datetime.now(timezone.utc) - timedelta(seconds=settings.AUDIT_ROLLUP_DELAY_SECONDS)
+    return closing.date() - timedelta(days=1)
+
+
+async def _rolled_up_through(db: AsyncSession) -> date | None:
+    """The watermark: last day folded into the rollups; later days are
+    counted live."""
+    return (
+        await db.execute(
+            select(AuditRollupWatermark.rolled_up_through).where(
+                AuditRollupWatermark.id == _WATERMARK_ID
+            )
+        )
+    ).scalar()
+
+
+def _live_counts():
+    """Audit entries grouped like the rollups (filters are added by callers)."""
+    keys = [
+        _utc_day(AuditLog.timestamp).label("day"),
+        func.coalesce(AuditLog.company_id, 0).label("company_id"),
+        AuditLog.module.label("module"),
+        AuditLog.action.label("action"),
+        func.coalesce(AuditLog.user_id, 0).label("user_id"),
+    ]
+    return select(
+        *keys,
+        func.count().label("event_count"),
+        func.count().filter(AuditLog.pin_verified.is_(False)).label("pin_failed_count"),
+    ).group_by(*keys)
+
+
+async def _fold(db: AsyncSession, date_from: date | None, through: date) -> int:
+    """Recount the days from `date_from` (or ever) up to `through` and move
+    the watermark to `through`. Rows of later days are dropped."""
+    clear = delete(AuditRollup)
+    # Bound on the raw column so the timestamp index is usable
+    source = _live_counts().where(AuditLog.timestamp < _day_start(through + timedelta(days=1)))
+    if date_from is not None:
+        clear = clear.where(AuditRollup.day >= date_from)
+        source = source.where(AuditLog.timestamp >= _day_start(date_from))
+    await db.execute(clear)
+    result = await db.execute(
+        insert(AuditRollup).from_select(
+            [*_KEY_COLUMNS, "event_count", "pin_failed_count"], source
+        )
+    )
+    watermark = insert(AuditRollupWatermark).values(id=_WATERMARK_ID, rolled_up_through=through)
+    await db.execute(
+        watermark.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"rolled_up_through": through, "updated_at": func.now()},
+        )
+    )
+    return result.rowcount
+
+
+async def rebuild_audit_rollups(db: AsyncSession, date_from: date | None = None) -> int:
+    """Recount the rolled-up days from audit_logs, from `date_from` (UTC) or ever.
+
+    Before the first fold, every closed day is counted.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(_ROLLUP_LOCK)))
+    through = await _rolled_up_through(db)
+    if through is None:
+        return await _fold(db, None, last_closed_day())
+    return await _fold(db, date_from, through)
+
+
+async def roll_up_closed_days() -> int:
+    """Fold the days closed since the watermark; called by the job workers.
+
+    One worker does it, the others skip the round; nothing is counted until
+    another day closes.
+    """
+    async with AsyncSessionLocal() as db:
+        locked = (
+            await db.execute(select(func.pg_try_advisory_xact_lock(_ROLLUP_LOCK)))
+        ).scalar()
+        if not locked:
+            return 0
+        through = await _rolled_up_through(db)
+        closed = last_closed_day()
+        if through is not None and through >= closed:
+            return 0
+        rows = await _fold(db, None if through is None else through + timedelta(days=1), closed)
+        await db.commit()
+        return rows
+
+
+async def audit_activity(
+    db: AsyncSession,
+    *,
+    company_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    bucket: str = "day",
+    group_by: str | None = None,
+    module: str | None = None,
+    action: str | None = None,
+    user_id: int | None = None,
+) -> list[dict]:
+    """Event and failed-PIN counts per time bucket, optionally per group.
+
+    Closed days come from the rollups, the following ones from audit_logs.
+    """
+    through = await _rolled_up_through(db)
+    rolled = select(
+        *(AuditRollup.__table__.c[name] for name in _KEY_COLUMNS),
+        AuditRollup.event_count,
+        AuditRollup.pin_failed_count,
+    )
+    live = _live_counts()
+    if through is not None:
+        rolled = rolled.where(AuditRollup.day <= through)
+        live = live.where(AuditLog.timestamp >= _day_start(through + timedelta(days=1)))
+    if company_id is not None:
+        rolled = rolled.where(AuditRollup.company_id == company_id)
+        live = live.where(AuditLog.company_id == company_id)
+    if date_from is not None:
+        rolled = rolled.where(AuditRollup.day >= date_from)
+        live = live.where(AuditLog.timestamp >= _day_start(date_from))
+    if date_to is not None:
+        rolled = rolled.where(AuditRollup.day <= date_to)
+        live = live.where(AuditLog.timestamp < _day_start(date_to + timedelta(days=1)))
+    if module is not None:
+        rolled = rolled.where(AuditRollup.module == module)
+        live = live.where(AuditLog.module == module)
+    if action is not None:
+        rolled = rolled.where(AuditRollup.action == action)
+        live = live.where(AuditLog.action == action)
+    if user_id is not None:
+        rolled = rolled.where(AuditRollup.user_id == user_id)
+        live = live.where(
+            AuditLog.user_id.is_(None) if user_id == 0 else AuditLog.user_id == user_id
+        )
+    activity = (union_all(rolled, live) if through is not None else live).subquery("activity")
+
+    period = cast(func.date_trunc(bucket, activity.c.day), Date).label("bucket")
+    columns = [period]
+    if group_by:
+        columns.append(activity.c[GROUPS[group_by]].label("key"))
+    query = (
+        select(
+            *columns,
+            func.sum(activity.c.event_count).label("events"),
+            func.sum(activity.c.pin_failed_count).label("pin_failures"),
+        )
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    return [
+        {**row._asdict(), "events": int(row.events), "pin_failures": int(row.pin_failures)}
+        for row in await db.execute(query)
+    ]
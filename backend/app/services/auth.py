@@ -1,18 +1,24 @@
+import logging
+
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.permissions import has_permission
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    pin_lookup_digest,
     verify_password,
     verify_pin,
 )
 from app.models.user import User
 from app.services.audit import log_action
 
+logger = logging.getLogger(__name__)
+
 
 async def authenticate_user(
     db: AsyncSession, email: str, password: str
@@ -97,6 +103,9 @@ async def verify_user_pin(
         )
 
     verified = verify_pin(pin, user.hashed_pin)
+    if verified and user.pin_lookup is None:
+        # Backfill the lookup digest for PINs set before it existed
+        user.pin_lookup = pin_lookup_digest(pin)
 
     await log_action(
         db,
@@ -116,3 +125,75 @@ async def verify_user_pin(
             detail="Invalid PIN",
         )
     return True
+
+
+def _can_authorize(user: User, action: str) -> bool:
+    if not user.role:
+        return False
+    if user.role.is_superadmin:
+        return True
+    return has_permission(user.role.permissions or [], action)
+
+
+async def authorize_pin_override(
+    db: AsyncSession,
+    user: User,
+    pin: str,
+    action: str,
+    entity_type: str | None = None,
+    entity_id: int | None = None,
+) -> User:
+    """Identify the supervisor owning `pin` and record them as authorizer.
+
+    Candidates are found through the keyed PIN digest (one index probe), so
+    only colleagues sharing the same PIN are bcrypt-checked. If several of
+    them may authorize the action, the owner is ambiguous: the attempt
+    fails like a wrong PIN, without telling the caller the PIN is shared.
+    Failed attempts are committed before the error response.
+    """
+    stmt = (
+        select(User)
+        .options(selectinload(User.role))
+        .where(
+            User.company_id == user.company_id,
+            User.pin_lookup == pin_lookup_digest(pin),
+            User.is_active.is_(True),
+            # Nobody approves their own override
+            User.id != user.id,
+        )
+    )
+    result = await db.execute(stmt)
+    candidates = [
+        u
+        for u in result.scalars().all()
+        if u.hashed_pin and verify_pin(pin, u.hashed_pin) and _can_authorize(u, action)
+    ]
+    if len(candidates) > 1:
+        logger.warning(
+            "PIN override refused: the PIN is shared by users %s, it must be changed",
+            ", ".join(str(u.id) for u in candidates),
+        )
+    supervisor = candidates[0] if len(candidates) == 1 else None
+    await log_action(
+        db,
+        user=user,
+        action=action,
+        module=action.split(".")[0] if "." in action else "system",
+        entity_type=entity_type,
+        entity_id=entity_id,
+        description=(
+            f"Supervisor override for {action}: "
+            f"{f'authorized by {supervisor.email}' if supervisor else 'failed'}"
+        ),
+        authorized_by=supervisor,
+        pin_verified=supervisor is not None,
+    )
+
+    if supervisor is None:
+        # The request's transaction is rolled back on error: keep the trace
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid PIN",
+        )
+    return supervisor
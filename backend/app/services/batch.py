@@ -0,0 +1,196 @@
+"""Run API sub-requests in-process on behalf of /batch.
+
+Sub-requests go through the whole ASGI app (routing, validation,
+permissions, error handlers) exactly like a real call, minus the network
+round trip and the authentication: the batch's principal is handed to
+`get_current_user` through the ASGI scope. Consecutive GETs run together;
+any other method is a barrier, run alone in its own transaction, so writes
+keep their order relative to the reads around them. A successful write may
+have changed the principal itself (role, permissions, deactivation), so it
+is reloaded before the next item.
+"""
+
+import asyncio
+import json
+import logging
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+from fastapi import Request
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import BATCH_SESSION_KEY, AsyncSessionLocal
+from app.core.dependencies import BATCH_USER_KEY
+from app.models.user import User
+from app.schemas.batch import BatchItem, BatchItemResult
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+# Never ending or recursive
+NOT_BATCHABLE = ("/batch", "/events")
+# Response headers worth relaying to the caller
+RELAYED_HEADERS = {"etag", "location", "x-sync-cursor", "x-snapshot-version"}
+
+
+def _set_read_only(session, transaction, connection) -> None:
+    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+def _normalize(path: str) -> str:
+    """The path as routing will see it: decoded, dot segments and repeated
+    or trailing slashes removed."""
+    return posixpath.normpath("/" + unquote(path).lstrip("/"))
+
+
+def _batchable(path: str) -> bool:
+    return not any(path == prefix or path.startswith(prefix + "/") for prefix in NOT_BATCHABLE)
+
+
+async def _reload(user: User) -> User | None:
+    """Fresh copy of the principal; None once deleted or deactivated, so the
+    next items authenticate themselves (and get 401)."""
+    async with AsyncSessionLocal() as session:
+        fresh = await session.scalar(
+            select(User).options(selectinload(User.role)).where(User.id == user.id)
+        )
+    return fresh if fresh is not None and fresh.is_active else None
+
+
+async def _dispatch(
+    request: Request, item: BatchItem, user: User | None, session: AsyncSession | None
+) -> BatchItemResult:
+    url = urlsplit(item.path)
+    path = _normalize(url.path)
+    if not _batchable(path):
+        return BatchItemResult(
+            id=item.id, status=400, body={"detail": f"{path} cannot be batched"}
+        )
+
+    body = b"" if item.body is None else json.dumps(item.body).encode()
+    headers = {k.lower(): v for k, v in item.headers.items()}
+    headers["authorization"] = request.headers.get("authorization", "")
+    headers["content-type"] = "application/json"
+    headers["content-length"] = str(len(body))
+    path = API_PREFIX + path
+    scope = {
+        "type": "http",
+        "asgi": request.scope["asgi"],
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+        "state": dict(request.scope.get("state") or {}),
+    }
+    if user is not None:
+        scope[BATCH_USER_KEY] = user
+    if session is not None:
+        scope[BATCH_SESSION_KEY] = session
+
+    sent_body = False
+
+    async def receive() -> dict:
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response: dict = {"status": 500, "headers": [], "body": []}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app already answered 500; a shared session must not stay in
+        # an aborted transaction for the next sub-requests
+        logger.exception("Batch sub-request %s %s failed", item.method, item.path)
+        if session is not None:
+            await session.rollback()
+
+    result_headers = {}
+    content_type = ""
+    for key, value in response["headers"]:
+        key = key.decode("latin-1").lower()
+        if key == "content-type":
+            content_type = value.decode("latin-1")
+        elif key in RELAYED_HEADERS:
+            result_headers[key] = value.decode("latin-1")
+    raw = b"".join(response["body"])
+    if not raw:
+        payload = None
+    elif content_type.startswith("application/json"):
+        payload = json.loads(raw)
+    elif content_type.startswith("text/"):
+        payload = raw.decode()
+    else:
+        payload = None  # binary downloads are not relayed
+    return BatchItemResult(
+        id=item.id, status=response["status"], headers=result_headers, body=payload
+    )
+
+
+async def run_batch(
+    request: Request,
+    items: list[BatchItem],
+    user: User,
+    db: AsyncSession,
+    shared_session: bool = False,
+) -> list[BatchItemResult]:
+    """Results in request order.
+
+    `db` is the session that authenticated `user`. Its transaction is ended
+    here, so the batch does not pin a connection while sub-requests run;
+    with `shared_session` it is reused, read-only, for every GET.
+    """
+    await db.commit()
+    if shared_session:
+        event.listen(db.sync_session, "after_begin", _set_read_only)
+    limiter = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def read(item: BatchItem) -> BatchItemResult:
+        async with limiter:
+            return await _dispatch(request, item, user, None)
+
+    results: list[BatchItemResult] = []
+    reads: list[BatchItem] = []
+
+    async def flush_reads() -> None:
+        if shared_session:
+            # One session cannot run statements concurrently
+            for item in reads:
+                results.append(await _dispatch(request, item, user, db))
+        else:
+            results.extend(await asyncio.gather(*(read(item) for item in reads)))
+        reads.clear()
+
+    try:
+        for item in items:
+            if item.method == "GET":
+                reads.append(item)
+                continue
+            await flush_reads()
+            result = await _dispatch(request, item, user, None)
+            results.append(result)
+            if user is not None and result.status < 400:
+                user = await _reload(user)
+        await flush_reads()
+    finally:
+        if shared_session:
+            event.remove(db.sync_session, "after_begin", _set_read_only)
+    return results
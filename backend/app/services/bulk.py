@@ -0,0 +1,134 @@
+"""Set-based bulk updates.
+
+Rows are selected by arbitrary conditions and updated BULK_CHUNK_SIZE at a
+time by a single statement per chunk:
+
+    WITH target AS (SELECT id, <old values> ... ORDER BY id LIMIT n FOR UPDATE)
+    UPDATE ... FROM target WHERE id = target.id RETURNING id, <old values>
+
+Each chunk is its own transaction, so a large update never holds thousands
+of row locks for long; chunks walk the id order, which also keeps rows the
+patch moves out of the filter from being visited twice. Rows that already
+have the patched values are skipped. Per chunk, one change event is
+emitted per company, and a single audit entry records the patch, the ids
+(as ranges) and their previous and new values, from which the audit images
+of each row are rebuilt.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.audit import log_action
+from app.services.notifications import notify_change
+from app.utils.audit_delta import encode_value
+
+
+def id_ranges(ids: Sequence[int]) -> list[list[int]]:
+    """[[first, last], ...] runs of consecutive ids, e.g. [1, 2, 3, 7] -> [[1, 3], [7, 7]]."""
+    ranges: list[list[int]] = []
+    for i in sorted(ids):
+        if ranges and ranges[-1][1] == i - 1:
+            ranges[-1][1] = i
+        else:
+            ranges.append([i, i])
+    return ranges
+
+
+def _values_by_ids(rows, fields: Sequence[str], suffix: str = "") -> dict[str, list]:
+    """{field: [[value, id ranges], ...]}: who had what (`field + suffix` of the rows)."""
+    by_ids = {}
+    for field in fields:
+        groups: dict = defaultdict(list)
+        for row in rows:
+            value = row[field + suffix]
+            groups[repr(encode_value(value))].append((value, row["id"]))
+        by_ids[field] = [
+            [encode_value(pairs[0][0]), id_ranges([i for _, i in pairs])]
+            for pairs in groups.values()
+        ]
+    return by_ids
+
+
+async def bulk_update(
+    db: AsyncSession,
+    model,
+    *,
+    conditions: list,
+    values: dict,
+    patch: dict,
+    entity_type: str,
+    module: str,
+    current_user: User,
+    on_chunk: Callable | None = None,
+) -> list[int]:
+    """Apply `values` to every row matching `conditions`; return the updated ids.
+
+    `values` maps column names to new values or SQL expressions of the row;
+    `patch` is the request as recorded in the audit trail. `on_chunk(rows)`
+    runs in each chunk's transaction with the RETURNING rows (id,
+    company_id, the old value of each patched column and its new value as
+    `<column>__new`).
+    """
+    fields = list(values)
+    columns = [getattr(model, field) for field in fields]
+    changed = or_(*(column.is_distinct_from(values[field]) for field, column in zip(fields, columns)))
+    updated: list[int] = []
+    last_id = 0
+
+    while True:
+        target = (
+            select(model.id, model.company_id, *columns)
+            .where(*conditions, changed, model.id > last_id)
+            .order_by(model.id)
+            .limit(settings.BULK_CHUNK_SIZE)
+            .with_for_update()
+            .cte("target")
+        )
+        result = await db.execute(
+            update(model)
+            .where(model.id == target.c.id)
+            .values(values)
+            .returning(
+                target.c.id,
+                target.c.company_id,
+                *(target.c[field] for field in fields),
+                *(column.label(f"{field}__new") for field, column in zip(fields, columns)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = [row._mapping for row in result]
+        if not rows:
+            break
+        ids = [row["id"] for row in rows]
+        last_id = max(ids)
+        updated.extend(ids)
+
+        if on_chunk is not None:
+            await on_chunk(rows)
+        for company_id in sorted({row["company_id"] for row in rows}, key=lambda c: c or 0):
+            await notify_change(db, entity_type, None, "bulk_update", company_id)
+        await log_action(
+            db,
+            user=current_user,
+            action="bulk_update",
+            module=module,
+            entity_type=entity_type,
+            description=f"Bulk updated {len(rows)} {model.__tablename__.replace('_', ' ')}",
+            new_values={
+                "patch": patch,
+                "count": len(rows),
+                "ids": id_ranges(ids),
+                "previous": _values_by_ids(rows, fields),
+                "values": _values_by_ids(rows, fields, "__new"),
+            },
+        )
+        await db.commit()
+        if len(rows) < settings.BULK_CHUNK_SIZE:
+            break
+
+    return sorted(updated)
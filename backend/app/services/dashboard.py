@@ -0,0 +1,122 @@
+"""Dashboard KPIs in one SQL round trip, cached per tenant.
+
+Each section the caller may see is one aggregate subquery using FILTER;
+the subqueries are cross-joined into a single row. Results are cached per
+(company scope, sections) for DASHBOARD_CACHE_SECONDS and dropped as soon
+as the change hub reports a write in that company.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.dependencies import user_has_permission
+from app.models.audit_log import AuditLog
+from app.models.company import Company
+from app.models.third_party import ThirdParty
+from app.models.user import User
+from app.services.notifications import hub
+
+# (company scope, sections) -> (expiry, summary)
+_cache: dict[tuple[int | None, frozenset[str]], tuple[float, dict]] = {}
+
+
+def _invalidate(message: dict) -> None:
+    company_id = message.get("company_id")
+    if message["type"] == "reset" or company_id is None:
+        _cache.clear()
+        return
+    for key in [k for k in _cache if k[0] in (company_id, None)]:
+        _cache.pop(key, None)
+
+
+hub.on_message(_invalidate)
+
+
+def visible_sections(user: User) -> frozenset[str]:
+    sections = set()
+    if user_has_permission(user, "third_party.view"):
+        sections.add("third_parties")
+    if user_has_permission(user, "admin.view"):
+        sections |= {"users", "activity"}
+    if user.role and user.role.is_superadmin:
+        sections.add("companies")
+    return frozenset(sections)
+
+
+def _scoped(query, column, company_id: int | None):
+    return query if company_id is None else query.where(column == company_id)
+
+
+def _section_queries(company_id: int | None) -> dict:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "third_parties": _scoped(
+            select(
+                func.count().label("total"),
+                func.count().filter(ThirdParty.is_customer.is_(True)).label("customers"),
+                func.count().filter(ThirdParty.is_supplier.is_(True)).label("suppliers"),
+                func.count().filter(ThirdParty.is_employee.is_(True)).label("employees"),
+            ).where(ThirdParty.is_active.is_(True)),
+            ThirdParty.company_id,
+            company_id,
+        ),
+        "users": _scoped(
+            select(
+                func.count().label("total"),
+                func.count().filter(User.is_active.is_(True)).label("active"),
+            ),
+            User.company_id,
+            company_id,
+        ),
+        # Today is never rolled up yet: read it from the timestamp indexes
+        "activity": _scoped(
+            select(
+                func.count().label("events_today"),
+                func.count().filter(AuditLog.pin_verified.is_(False)).label(
+                    "pin_failures_today"
+                ),
+            ).where(AuditLog.timestamp >= today),
+            AuditLog.company_id,
+            company_id,
+        ),
+        "companies": _scoped(
+            select(
+                func.count().label("total"),
+                func.count().filter(Company.is_active.is_(True)).label("active"),
+            ),
+            Company.id,
+            company_id,
+        ),
+    }
+
+
+async def get_dashboard_summary(
+    db: AsyncSession, user: User, company_id: int | None
+) -> dict:
+    sections = visible_sections(user)
+    key = (company_id, sections)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    summary: dict = {"company_id": company_id}
+    if sections:
+        queries = _section_queries(company_id)
+        names = sorted(sections)
+        subqueries = [queries[name].subquery(name) for name in names]
+        joined = subqueries[0]
+        for subquery in subqueries[1:]:
+            joined = joined.join(subquery, true())
+        row = (
+            await db.execute(select(*(c for sq in subqueries for c in sq.c)).select_from(joined))
+        ).one()
+        values = iter(row)
+        for name, subquery in zip(names, subqueries):
+            summary[name] = {column.name: int(next(values)) for column in subquery.c}
+
+    _cache[key] = (time.monotonic() + settings.DASHBOARD_CACHE_SECONDS, summary)
+    return summary
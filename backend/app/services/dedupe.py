@@ -0,0 +1,275 @@
+"""Duplicate partners: detection runs and merges.
+
+Detection (`find_duplicate_partners`) runs as a background job: it reads
+the company's active partners once, clusters them in a thread with
+app.utils.dedupe and replaces the company's open clusters.
+
+A merge re-points every foreign key to third_parties (found in the
+metadata, so references added later are covered too) from the sources to
+their target with one UPDATE per referencing column, fills the target's
+empty fields from the sources, and deletes the sources, all in the
+caller's transaction.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, column, delete, exists, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.base import Base
+from app.models.duplicate_cluster import DuplicateCluster
+from app.models.third_party import ThirdParty
+from app.models.user import User
+from app.schemas.third_party import MergeRequest
+from app.services.audit import log_action
+from app.services.notifications import notify_change
+from app.services.sync import record_tombstone
+from app.utils.dedupe import find_clusters, prepare
+from app.utils.pagination import paginate
+
+READ_BATCH = 10000
+# Target fields taken from the first source having a value
+FILL_FIELDS = (
+    "legal_name", "tax_id", "vat_number", "customer_code", "supplier_code",
+    "customer_payment_term_id", "supplier_payment_term_id", "customer_credit_limit",
+    "email", "phone", "mobile", "website", "notes",
+)
+ROLE_FLAGS = ("is_customer", "is_supplier", "is_employee")
+
+Progress = Callable[[int, str], Awaitable[None]]
+
+
+async def find_duplicate_partners(
+    company_id: int, job_id: int | None = None, progress: Progress | None = None
+) -> dict:
+    async with AsyncSessionLocal() as db:
+        rows = []
+        result = await db.stream(
+            select(
+                ThirdParty.id,
+                ThirdParty.name,
+                ThirdParty.vat_number,
+                ThirdParty.tax_id,
+                ThirdParty.email,
+                ThirdParty.phone,
+                ThirdParty.mobile,
+            )
+            .where(ThirdParty.company_id == company_id, ThirdParty.is_active.is_(True))
+            .execution_options(yield_per=READ_BATCH)
+        )
+        async for partition in result.partitions():
+            rows.extend(tuple(row) for row in partition)
+            if progress:
+                await progress(5, f"{len(rows)} partners read")
+
+        if progress:
+            await progress(10, "Scoring candidate pairs")
+        # CPU bound: keep the event loop (heartbeats) responsive
+        partners = await asyncio.to_thread(prepare, rows)
+        clusters = await asyncio.to_thread(
+            find_clusters, partners, settings.DEDUPE_THRESHOLD, settings.DEDUPE_MAX_BLOCK
+        )
+        if progress:
+            await progress(90, f"{len(clusters)} clusters found")
+
+        await db.execute(
+            delete(DuplicateCluster).where(
+                DuplicateCluster.company_id == company_id, DuplicateCluster.status == "open"
+            )
+        )
+        for start in range(0, len(clusters), 1000):
+            await db.execute(
+                insert(DuplicateCluster),
+                [
+                    {"company_id": company_id, "job_id": job_id, "status": "open", **cluster}
+                    for cluster in clusters[start : start + 1000]
+                ],
+            )
+        await db.commit()
+
+    return {
+        "partners": len(rows),
+        "clusters": len(clusters),
+        "duplicates": sum(len(c["member_ids"]) - 1 for c in clusters),
+    }
+
+
+async def list_duplicate_clusters(
+    db: AsyncSession,
+    company_id: int,
+    status_filter: str | None = "open",
+    page: int = 1,
+    page_size: int = 20,
+) -> dict:
+    query = (
+        select(DuplicateCluster)
+        .where(DuplicateCluster.company_id == company_id)
+        .order_by(DuplicateCluster.score.desc(), DuplicateCluster.id)
+    )
+    if status_filter is not None:
+        query = query.where(DuplicateCluster.status == status_filter)
+    return await paginate(db, query, page, page_size)
+
+
+async def get_duplicate_cluster(db: AsyncSession, cluster_id: int) -> DuplicateCluster:
+    cluster = await db.get(DuplicateCluster, cluster_id)
+    if cluster is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cluster not found")
+    return cluster
+
+
+async def dismiss_duplicate_cluster(
+    db: AsyncSession, cluster_id: int, current_user: User | None = None
+) -> DuplicateCluster:
+    cluster = await get_duplicate_cluster(db, cluster_id)
+    cluster.status = "dismissed"
+    await db.flush()
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="dismiss_duplicates",
+            module="third_party",
+            entity_type="duplicate_cluster",
+            entity_id=cluster.id,
+            description=f"Dismissed duplicate cluster of {len(cluster.member_ids)} partners",
+        )
+    return cluster
+
+
+def _third_party_references():
+    """Every column holding a foreign key to third_parties.id."""
+    for table in Base.metadata.sorted_tables:
+        for fk in table.foreign_keys:
+            if fk.column.table.name == ThirdParty.__tablename__:
+                yield table, fk.parent
+
+
+async def merge_third_parties(
+    db: AsyncSession, data: MergeRequest, current_user: User
+) -> list[int]:
+    """Merge each item's sources into its target; return the targets."""
+    target_of: dict[int, int] = {}
+    for item in data.merges:
+        for source_id in item.source_ids:
+            if source_id in target_of or source_id == item.target_id:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Partner {source_id} is merged twice or into itself",
+                )
+            target_of[source_id] = item.target_id
+    target_ids = {item.target_id for item in data.merges}
+    if target_ids & target_of.keys():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="A merge target cannot also be a source",
+        )
+
+    # Locked in id order, so concurrent merges cannot deadlock
+    partners = {
+        tp.id: tp
+        for tp in (
+            await db.execute(
+                select(ThirdParty)
+                .where(
+                    ThirdParty.id.in_(target_ids | target_of.keys()),
+                    ThirdParty.company_id == data.company_id,
+                )
+                .order_by(ThirdParty.id)
+                .with_for_update()
+            )
+        ).scalars()
+    }
+    missing = (target_ids | target_of.keys()) - partners.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown partners: {', '.join(map(str, sorted(missing)))}",
+        )
+
+    # Source values are read before the sources go away
+    sources_of: dict[int, list[dict]] = {}
+    for source_id in sorted(target_of):
+        source = partners[source_id]
+        sources_of.setdefault(target_of[source_id], []).append(
+            {
+                "id": source_id,
+                "code": source.code,
+                "name": source.name,
+                "tags": list(source.tags or []),
+                **{field: getattr(source, field) for field in (*FILL_FIELDS, *ROLE_FLAGS)},
+            }
+        )
+        db.expunge(source)
+
+    merge_map = values(
+        column("source_id", Integer), column("target_id", Integer), name="merge_map"
+    ).data(sorted(target_of.items()))
+    for table, fk_column in _third_party_references():
+        await db.execute(
+            update(table)
+            .where(fk_column == merge_map.c.source_id)
+            .values({fk_column.name: merge_map.c.target_id})
+        )
+    # Frees the sources' codes before targets take them over
+    await db.execute(delete(ThirdParty).where(ThirdParty.id.in_(target_of.keys())))
+    for source_id in sorted(target_of):
+        await record_tombstone(db, "third_party", source_id, data.company_id)
+        await notify_change(db, "third_party", source_id, "delete", data.company_id)
+
+    for target_id, sources in sorted(sources_of.items()):
+        target = partners[target_id]
+        # Audited as an update of the filled fields: {field: [old, new]}
+        previous, filled = {}, {}
+        for field in FILL_FIELDS:
+            if getattr(target, field) in (None, ""):
+                value = next((s[field] for s in sources if s[field] not in (None, "")), None)
+                if value is not None:
+                    previous[field] = getattr(target, field)
+                    setattr(target, field, value)
+                    filled[field] = value
+        for flag in ROLE_FLAGS:
+            if not getattr(target, flag) and any(s[flag] for s in sources):
+                previous[flag] = getattr(target, flag)
+                setattr(target, flag, True)
+                filled[flag] = True
+        tags = list(dict.fromkeys([*(target.tags or []), *(t for s in sources for t in s["tags"])]))
+        if tags != (target.tags or []):
+            previous["tags"] = target.tags
+            target.tags = tags
+            filled["tags"] = tags
+        # Children moved in: the target changed even without a field filled
+        target.updated_at = func.now()
+        merged = ", ".join(
+            f"#{s['id']} '{s['name']}'" + (f" ({s['code']})" if s["code"] else "") for s in sources
+        )
+        await log_action(
+            db,
+            user=current_user,
+            action="merge",
+            module="third_party",
+            entity_type="third_party",
+            entity_id=target_id,
+            description=f"Merged {len(sources)} partner(s) into '{target.name}': {merged}",
+            old_values=previous,
+            new_values=filled,
+        )
+
+    merged_ids = [str(i) for i in (target_ids | target_of.keys())]
+    member = func.jsonb_array_elements_text(DuplicateCluster.member_ids).table_valued("value")
+    await db.execute(
+        update(DuplicateCluster)
+        .where(
+            DuplicateCluster.company_id == data.company_id,
+            DuplicateCluster.status == "open",
+            exists(select(1).select_from(member).where(member.c.value.in_(merged_ids))),
+        )
+        .values(status="merged")
+    )
+    await db.flush()
+    return sorted(target_ids)
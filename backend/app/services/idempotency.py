@@ -0,0 +1,355 @@
+"""Idempotency-Key support for POST requests.
+
+A POST carrying an `Idempotency-Key` header is executed at most once per
+user, path and key within IDEMPOTENCY_TTL_SECONDS: the first execution
+claims the key, its response is stored, and retries get that response
+back (with `Idempotent-Replayed: true`) without reaching the endpoint.
+Duplicates arriving while the first execution runs wait for its result.
+Reusing a key for a different request is rejected with 422.
+
+Keys live in Redis; while Redis is unreachable the idempotency_keys table
+takes over. A key is completed or released in the store that granted the
+claim; if Redis fails in between, the response is stored in the table,
+which duplicates consult during the outage, and the pending Redis key
+expires with its lease. Server errors (5xx) release the key so the request
+can be retried for real. Bodies are stored as bytes (base64 in Redis).
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from jose import JWTError
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.core.security import decode_token
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+REDIS_PREFIX = "idem:"
+MAX_KEY_LENGTH = 255
+POLL_SECONDS = 0.1
+
+_redis_down_until = 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Stores: a record is {"fingerprint", "status", "headers", "body"}, with a
+# null status while the first execution runs; the body is bytes
+# ---------------------------------------------------------------------------
+
+def _dumps(record: dict) -> str:
+    if record.get("body") is not None:
+        record = {**record, "body": base64.b64encode(record["body"]).decode("ascii")}
+    return json.dumps(record)
+
+
+def _loads(raw: str | bytes) -> dict:
+    record = json.loads(raw)
+    if record.get("body") is not None:
+        record["body"] = base64.b64decode(record["body"])
+    return record
+
+
+async def _redis_claim(key: str, fingerprint: str) -> dict | None:
+    pending = _dumps({"fingerprint": fingerprint, "status": None})
+    while True:
+        if await redis_client.set(
+            REDIS_PREFIX + key, pending, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS
+        ):
+            return None
+        raw = await redis_client.get(REDIS_PREFIX + key)
+        if raw is not None:
+            return _loads(raw)
+        # Expired between SET and GET: try again
+
+
+async def _redis_get(key: str) -> dict | None:
+    raw = await redis_client.get(REDIS_PREFIX + key)
+    return None if raw is None else _loads(raw)
+
+
+async def _redis_complete(key: str, record: dict) -> None:
+    await redis_client.set(
+        REDIS_PREFIX + key, _dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS
+    )
+
+
+async def _redis_release(key: str) -> None:
+    await redis_client.delete(REDIS_PREFIX + key)
+
+
+def _row_record(row: IdempotencyKey | None) -> dict | None:
+    if row is None or row.expires_at <= _now():
+        return None
+    return {
+        "fingerprint": row.fingerprint,
+        "status": row.status_code,
+        "headers": row.headers,
+        "body": row.body,
+    }
+
+
+async def _pg_claim(key: str, fingerprint: str) -> dict | None:
+    lease = _now() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+    stmt = insert(IdempotencyKey).values(key=key, fingerprint=fingerprint, expires_at=lease)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={
+            "fingerprint": stmt.excluded.fingerprint,
+            "status_code": None,
+            "headers": None,
+            "body": None,
+            "expires_at": stmt.excluded.expires_at,
+            "updated_at": func.now(),
+        },
+        # Only take over a key whose window (or lease) is over
+        where=IdempotencyKey.expires_at <= func.now(),
+    ).returning(IdempotencyKey.id)
+    async with AsyncSessionLocal() as db:
+        claimed = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+        if claimed is not None:
+            return None
+        row = (
+            await db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key))
+        ).scalar_one_or_none()
+    # Gone meanwhile: report it as still pending, the caller polls again
+    return _row_record(row) or {"fingerprint": fingerprint, "status": None}
+
+
+async def _pg_get(key: str) -> dict | None:
+    async with AsyncSessionLocal() as db:
+        row = (
+            await db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key))
+        ).scalar_one_or_none()
+        return _row_record(row)
+
+
+async def _pg_complete(key: str, record: dict) -> None:
+    # An upsert: the claim may have been granted by Redis
+    values = {
+        "fingerprint": record["fingerprint"],
+        "status_code": record["status"],
+        "headers": record["headers"],
+        "body": record["body"],
+        "expires_at": _now() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    }
+    stmt = insert(IdempotencyKey).values(key=key, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"], set_={**values, "updated_at": func.now()}
+    )
+    async with AsyncSessionLocal() as db:
+        await db.execute(stmt)
+        await db.commit()
+
+
+async def _pg_release(key: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+        await db.commit()
+
+
+def _redis_failed() -> None:
+    global _redis_down_until
+    logger.warning("Redis unavailable, idempotency keys fall back to Postgres")
+    _redis_down_until = time.monotonic() + settings.REDIS_RETRY_SECONDS
+
+
+async def _call(redis_op, pg_op, *args) -> tuple:
+    """Run a store operation on Redis, or on Postgres while Redis is down.
+
+    Returns the result and whether Redis ran it.
+    """
+    if time.monotonic() >= _redis_down_until:
+        try:
+            return await redis_op(*args), True
+        except RedisError:
+            _redis_failed()
+    return await pg_op(*args), False
+
+
+async def _finish(key: str, in_redis: bool, record: dict | None) -> None:
+    """Complete the key with `record`, or release it (None), in the store
+    that granted the claim."""
+    if in_redis:
+        try:
+            if record is None:
+                await _redis_release(key)
+            else:
+                await _redis_complete(key, record)
+            return
+        except RedisError:
+            _redis_failed()
+            if record is None:
+                # Nothing to release in Postgres; the Redis claim expires
+                return
+    if record is None:
+        await _pg_release(key)
+    else:
+        await _pg_complete(key, record)
+
+
+async def purge_expired_idempotency_keys() -> int:
+    """Drop fallback rows past their window (Redis expires its own keys)."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+        )
+        await db.commit()
+        return result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _principal(authorization: str | None) -> str | None:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return None
+    if payload.get("type") != "access":
+        return None
+    return payload.get("sub")
+
+
+async def _claim_or_wait(key: str, fingerprint: str) -> tuple[dict | None, bool]:
+    """(None, in_redis) once this request owns the key, in_redis telling
+    which store granted it; else (record to answer with, _)."""
+    record, in_redis = await _call(_redis_claim, _pg_claim, key, fingerprint)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while record is not None and record["status"] is None:
+        if record["fingerprint"] != fingerprint or time.monotonic() >= deadline:
+            return record, in_redis
+        await asyncio.sleep(POLL_SECONDS)
+        record, in_redis = await _call(_redis_get, _pg_get, key)
+        if record is None:
+            # First execution failed and released the key: take over
+            record, in_redis = await _call(_redis_claim, _pg_claim, key, fingerprint)
+    return record, in_redis
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware applying Idempotency-Key to authenticated POSTs."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        user_id = _principal(headers.get("authorization")) if idempotency_key else None
+        if user_id is None:
+            # No key, or anonymous (the endpoint will answer 401 anyway)
+            return await self.app(scope, receive, send)
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters"}, 400
+            )
+            return await response(scope, receive, send)
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        key = hashlib.sha256(
+            f"{user_id}\0{scope['path']}\0{idempotency_key}".encode()
+        ).hexdigest()
+        fingerprint = hashlib.sha256(scope.get("query_string", b"") + b"\0" + body).hexdigest()
+
+        record, in_redis = await _claim_or_wait(key, fingerprint)
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                response = JSONResponse(
+                    {"detail": "Idempotency-Key already used for a different request"}, 422
+                )
+            elif record["status"] is None:
+                response = JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"},
+                    409,
+                )
+            else:
+                replayed_headers = [
+                    (k.encode("latin-1"), v.encode("latin-1")) for k, v in record["headers"]
+                ]
+                replayed_headers.append((REPLAYED_HEADER.lower().encode(), b"true"))
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": record["status"],
+                        "headers": replayed_headers,
+                    }
+                )
+                await send({"type": "http.response.body", "body": record["body"]})
+                return
+            return await response(scope, receive, send)
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": 500, "headers": [], "body": []}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [k.decode("latin-1"), v.decode("latin-1")]
+                    for k, v in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await _finish(key, in_redis, None)
+            raise
+        if response["status"] >= 500:
+            await _finish(key, in_redis, None)
+            return
+        await _finish(
+            key,
+            in_redis,
+            {
+                "fingerprint": fingerprint,
+                "status": response["status"],
+                "headers": response["headers"],
+                "body": b"".join(response["body"]),
+            },
+        )
@@ -0,0 +1,375 @@
+"""Background jobs on a Postgres queue.
+
+Requests enqueue a job and return its id at once; `python -m app.worker`
+processes claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of workers share the queue without blocking each other. A job
+runs at most JOB_MAX_RUNNING_PER_COMPANY at a time per company, failed
+attempts are retried with exponential backoff, and running jobs report
+progress and a heartbeat through which they learn about cancellation.
+"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job
+from app.models.user import User
+from app.services.audit import log_action
+from app.services.audit_rollup import rebuild_audit_rollups
+from app.services.dedupe import find_duplicate_partners
+from app.services.role import recount_role_users
+from app.services.snapshot import build_customer_snapshot
+from app.utils.pagination import paginate
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "erp_jobs"
+# First key of the advisory lock serializing claims within a company
+CLAIM_LOCK_KEY = 0x4A4F42
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation was requested."""
+
+
+@dataclass
+class JobContext:
+    """What a handler sees of the job it runs."""
+
+    job_id: int
+    kind: str
+    company_id: int | None
+    payload: dict
+    attempt: int
+    max_attempts: int
+    worker_id: str
+    cancelled: bool = False
+
+    async def progress(self, percent: int, message: str | None = None) -> None:
+        """Persist progress; raises JobCancelled when the job was cancelled."""
+        await self._touch(progress=max(0, min(percent, 100)), progress_message=message)
+
+    async def _touch(self, **values) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == self.job_id, Job.worker_id == self.worker_id)
+                .values(heartbeat_at=func.now(), **values)
+                .returning(Job.cancel_requested)
+            )
+            cancel_requested = result.scalar()
+            await db.commit()
+        # No row: the job was taken away from this worker as stale
+        if cancel_requested is None or cancel_requested:
+            self.cancelled = True
+            raise JobCancelled
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict | None]]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+# --- Request side ---
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    company_id: int | None = None,
+    max_attempts: int = 3,
+    current_user: User | None = None,
+) -> Job:
+    """Queue a job in the caller's transaction; workers see it on commit."""
+    if kind not in JOB_HANDLERS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown job '{kind}'"
+        )
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        company_id=company_id,
+        max_attempts=max_attempts,
+        created_by_id=current_user.id if current_user else None,
+    )
+    db.add(job)
+    await db.flush()
+    # Delivered on commit: wakes idle workers without waiting for their poll
+    await db.execute(select(func.pg_notify(CHANNEL, kind)))
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="create",
+            module="admin",
+            entity_type="job",
+            entity_id=job.id,
+            description=f"Queued job '{kind}'",
+            new_values={"kind": kind, "payload": payload or {}},
+        )
+    return await get_job(db, job.id)
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Job:
+    result = await db.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+async def list_jobs(
+    db: AsyncSession,
+    *,
+    company_id: int | None = None,
+    created_by_id: int | None = None,
+    status_filter: str | None = None,
+    kind: str | None = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> dict:
+    query = select(Job).order_by(Job.id.desc())
+    if company_id is not None:
+        query = query.where(Job.company_id == company_id)
+    if created_by_id is not None:
+        query = query.where(Job.created_by_id == created_by_id)
+    if status_filter:
+        query = query.where(Job.status == status_filter)
+    if kind:
+        query = query.where(Job.kind == kind)
+    return await paginate(db, query, page, page_size)
+
+
+async def cancel_job(db: AsyncSession, job_id: int, current_user: User | None = None) -> Job:
+    """Cancel a queued job now; ask a running one to stop at its next heartbeat."""
+    job = await get_job(db, job_id)
+    if job.status == "queued":
+        values = {"status": "cancelled", "finished_at": func.now()}
+    elif job.status == "running":
+        values = {"cancel_requested": True}
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Job is already {job.status}"
+        )
+    result = await db.execute(
+        update(Job).where(Job.id == job_id, Job.status == job.status).values(**values)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job changed, retry")
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="update",
+            module="admin",
+            entity_type="job",
+            entity_id=job_id,
+            description=f"Cancelled job '{job.kind}'",
+        )
+    await db.refresh(job)
+    return job
+
+
+# --- Worker side ---
+async def claim_job(worker_id: str) -> JobContext | None:
+    """Take the next runnable job, honouring the per-company limit."""
+    saturated: set[int] = set()
+    async with AsyncSessionLocal() as db:
+        while True:
+            query = (
+                select(Job.id, Job.company_id)
+                .where(Job.status == "queued", Job.run_after <= func.now())
+                .order_by(Job.run_after, Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if saturated:
+                query = query.where(
+                    or_(Job.company_id.is_(None), Job.company_id.not_in(saturated))
+                )
+            candidate = (await db.execute(query)).one_or_none()
+            if candidate is None:
+                await db.rollback()
+                return None
+
+            if candidate.company_id is not None:
+                # Claims of one company are serialized until commit, so the
+                # count below cannot be outdated by a concurrent claim
+                await db.execute(
+                    select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY, candidate.company_id))
+                )
+                running = (
+                    await db.execute(
+                        select(func.count(Job.id)).where(
+                            Job.company_id == candidate.company_id, Job.status == "running"
+                        )
+                    )
+                ).scalar()
+                if running >= settings.JOB_MAX_RUNNING_PER_COMPANY:
+                    saturated.add(candidate.company_id)
+                    continue
+
+            row = (
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == candidate.id)
+                    .values(
+                        status="running",
+                        attempts=Job.attempts + 1,
+                        worker_id=worker_id,
+                        started_at=func.now(),
+                        heartbeat_at=func.now(),
+                    )
+                    .returning(
+                        Job.id, Job.kind, Job.company_id, Job.payload, Job.attempts, Job.max_attempts
+                    )
+                )
+            ).one()
+            await db.commit()
+            return JobContext(
+                job_id=row.id,
+                kind=row.kind,
+                company_id=row.company_id,
+                payload=row.payload or {},
+                attempt=row.attempts,
+                max_attempts=row.max_attempts,
+                worker_id=worker_id,
+            )
+
+
+async def _finish(ctx: JobContext, **values) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.id == ctx.job_id, Job.worker_id == ctx.worker_id, Job.status == "running")
+            .values(**values)
+        )
+        await db.commit()
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, capped at one hour."""
+    base = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1), 3600)
+    return base * random.uniform(0.75, 1.25)
+
+
+async def _heartbeat(ctx: JobContext, task: asyncio.Task) -> None:
+    """Keep the job alive and stop the handler once cancellation is asked."""
+    while not task.done():
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        try:
+            await ctx._touch()
+        except JobCancelled:
+            task.cancel()
+            return
+        except Exception:
+            logger.warning("Heartbeat of job %s failed", ctx.job_id, exc_info=True)
+
+
+async def run_job(ctx: JobContext) -> None:
+    handler = JOB_HANDLERS.get(ctx.kind)
+    if handler is None:
+        await _finish(
+            ctx, status="failed", error=f"No handler for '{ctx.kind}'", finished_at=func.now()
+        )
+        return
+
+    task = asyncio.create_task(handler(ctx))
+    heartbeat = asyncio.create_task(_heartbeat(ctx, task))
+    try:
+        result = await task
+    except (JobCancelled, asyncio.CancelledError):
+        if not ctx.cancelled:
+            raise  # the worker itself is shutting down
+        await _finish(ctx, status="cancelled", finished_at=func.now())
+        logger.info("Job %s (%s) cancelled", ctx.job_id, ctx.kind)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        if ctx.attempt < ctx.max_attempts:
+            delay = retry_delay(ctx.attempt)
+            await _finish(
+                ctx,
+                status="queued",
+                error=error,
+                worker_id=None,
+                run_after=func.now() + timedelta(seconds=delay),
+            )
+            logger.warning("Job %s (%s) failed, retry in %.0fs: %s", ctx.job_id, ctx.kind, delay, error)
+        else:
+            await _finish(ctx, status="failed", error=error, finished_at=func.now())
+            logger.exception("Job %s (%s) failed for good", ctx.job_id, ctx.kind)
+    else:
+        await _finish(
+            ctx, status="succeeded", result=result, progress=100, finished_at=func.now()
+        )
+    finally:
+        heartbeat.cancel()
+
+
+async def requeue_stale_jobs() -> int:
+    """Give back jobs of workers that died; those out of attempts fail."""
+    async with AsyncSessionLocal() as db:
+        out_of_attempts = Job.attempts >= Job.max_attempts
+        result = await db.execute(
+            update(Job)
+            .where(
+                Job.status == "running",
+                Job.heartbeat_at
+                < func.now() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS),
+            )
+            .values(
+                status=case((out_of_attempts, "failed"), else_="queued"),
+                finished_at=case((out_of_attempts, func.now()), else_=None),
+                error="Worker lost",
+                worker_id=None,
+            )
+            .returning(Job.id)
+        )
+        count = len(result.all())
+        await db.commit()
+    return count
+
+
+# --- Handlers ---
+@job_handler("role.recount_users")
+async def _recount_role_users(ctx: JobContext) -> dict:
+    async with AsyncSessionLocal() as db:
+        updated = await recount_role_users(db)
+        await db.commit()
+    return {"updated": updated}
+
+
+@job_handler("snapshot.customers")
+async def _build_customer_snapshot(ctx: JobContext) -> dict:
+    meta = await build_customer_snapshot(ctx.company_id)
+    return {"digest": meta.digest, "version": meta.version, "rows": meta.rows}
+
+
+@job_handler("audit.rebuild_rollups")
+async def _rebuild_audit_rollups(ctx: JobContext) -> dict:
+    date_from = ctx.payload.get("date_from")
+    async with AsyncSessionLocal() as db:
+        rows = await rebuild_audit_rollups(db, date.fromisoformat(date_from) if date_from else None)
+        await db.commit()
+    return {"rows": rows}
+
+
+@job_handler("third_party.dedupe")
+async def _find_duplicate_partners(ctx: JobContext) -> dict:
+    return await find_duplicate_partners(ctx.company_id, ctx.job_id, ctx.progress)
@@ -0,0 +1,224 @@
+"""Real-time change notifications over Postgres LISTEN/NOTIFY.
+
+A flush listener queues one `pg_notify` per written entity in the writing
+transaction: Postgres only delivers it on commit and drops it on rollback,
+so clients never hear about changes that did not happen. Writes that bypass
+the ORM unit of work call `notify_change` themselves.
+
+Audit entries come with nearly every write, so they are coalesced: one
+`audit_log` event (no id) per transaction and company tells audit pages
+and the dashboard's activity section to reload.
+
+Each worker holds a single LISTEN connection (`hub`) and fans events out
+to its stream subscribers, filtered by company scope and by the entity
+types the subscriber may view.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import connect_raw
+from app.models.audit_log import AuditLog
+from app.models.company import Company
+from app.models.payment_term import PaymentTerm
+from app.models.role import Role
+from app.models.third_party import ThirdParty
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "erp_changes"
+QUEUE_SIZE = 500
+
+NOTIFIED_MODELS: dict[type, str] = {
+    Company: "company",
+    Role: "role",
+    User: "user",
+    ThirdParty: "third_party",
+    PaymentTerm: "payment_term",
+}
+
+# Permission needed to receive events of each entity type
+EVENT_PERMISSIONS: dict[str, str] = {
+    "company": "admin.view",
+    "role": "admin.view",
+    "user": "admin.view",
+    "audit_log": "admin.view",
+    "third_party": "third_party.view",
+    "payment_term": "third_party.view",
+}
+
+
+def _payload(entity_type: str, entity_id: int | None, action: str, company_id: int | None) -> str:
+    return json.dumps(
+        {"entity_type": entity_type, "id": entity_id, "action": action, "company_id": company_id},
+        separators=(",", ":"),
+    )
+
+
+def _notify_statement(payload: str):
+    return select(func.pg_notify(CHANNEL, payload))
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changes(session: Session, flush_context, instances) -> None:
+    pending = session.info.setdefault("change_events", [])
+    for action, objects in (
+        ("create", session.new),
+        ("update", session.dirty),
+        ("delete", session.deleted),
+    ):
+        for obj in objects:
+            if type(obj) in NOTIFIED_MODELS and (action != "update" or session.is_modified(obj)):
+                pending.append((obj, action, obj.id))
+    audited = session.info.setdefault("audit_events", set())
+    audited.update(obj.company_id for obj in session.new if isinstance(obj, AuditLog))
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_notifications(session: Session, flush_context) -> None:
+    pending = session.info.pop("change_events", [])
+    notified = session.info.setdefault("audit_notified", set())
+    audited = session.info.pop("audit_events", set()) - notified
+    if not pending and not audited:
+        return
+    connection = session.connection()
+    for company_id in audited:
+        connection.execute(_notify_statement(_payload("audit_log", None, "create", company_id)))
+    notified |= audited
+    for obj, action, obj_id in pending:
+        # Ids of new rows are only known after the flush
+        entity_id = obj_id if obj_id is not None else obj.id
+        company_id = obj.id if isinstance(obj, Company) else obj.company_id
+        connection.execute(
+            _notify_statement(_payload(NOTIFIED_MODELS[type(obj)], entity_id, action, company_id))
+        )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_audit_events(session: Session, transaction) -> None:
+    # A rolled back savepoint may have dropped some: notify again (Postgres
+    # still delivers identical payloads once per transaction)
+    session.info.pop("audit_notified", None)
+
+
+async def notify_change(
+    db: AsyncSession,
+    entity_type: str,
+    entity_id: int | None,
+    action: str,
+    company_id: int | None,
+) -> None:
+    """Queue an event for a write made outside the ORM unit of work.
+
+    Bulk writes send a single event with no id: reload the collection.
+    """
+    await db.execute(_notify_statement(_payload(entity_type, entity_id, action, company_id)))
+
+
+@dataclass(eq=False)
+class Subscriber:
+    company_id: int | None  # None: every company
+    entity_types: set[str]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(QUEUE_SIZE))
+
+    def accepts(self, change: dict) -> bool:
+        if change["entity_type"] not in self.entity_types:
+            return False
+        return self.company_id is None or change["company_id"] in (self.company_id, None)
+
+    def push(self, message: dict) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog and ask for a full reload
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "reset"})
+
+
+class ChangeHub:
+    """One LISTEN connection per worker, fanned out to local subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscriber] = set()
+        self._callbacks: list[Callable[[dict], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def on_message(self, callback: Callable[[dict], None]) -> None:
+        """Call `callback` with every message of this worker (e.g. cache invalidation)."""
+        self._callbacks.append(callback)
+
+    def subscribe(self, company_id: int | None, entity_types: set[str]) -> Subscriber:
+        subscriber = Subscriber(company_id, entity_types)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        change = json.loads(payload)
+        message = {"type": "change", **change}
+        self._dispatch(message)
+        for subscriber in list(self._subscribers):
+            if subscriber.accepts(change):
+                subscriber.push(message)
+
+    def _dispatch(self, message: dict) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Change callback failed")
+
+    async def _listen(self) -> None:
+        delay, reconnecting = 1, False
+        while True:
+            try:
+                connection = await connect_raw()
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Change listener cannot connect: %s", exc)
+                await asyncio.sleep(delay)
+                delay, reconnecting = min(delay * 2, 30), True
+                continue
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(CHANNEL, self._on_notify)
+                if reconnecting:
+                    # Events may have been missed while disconnected
+                    self._dispatch({"type": "reset"})
+                    for subscriber in list(self._subscribers):
+                        subscriber.push({"type": "reset"})
+                delay = 1
+                await closed.wait()
+                logger.warning("Change listener connection lost, reconnecting")
+                reconnecting = True
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+
+hub = ChangeHub()
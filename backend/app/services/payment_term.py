@@ -0,0 +1,153 @@
+from fastapi import HTTPException, status
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payment_term import PaymentTerm
+from app.models.third_party import ThirdParty
+from app.models.user import User
+from app.schemas.payment_term import PaymentTermCreate, PaymentTermUpdate
+from app.services.audit import log_action
+from app.services.sync import record_tombstone
+from app.services.versioning import collection_version
+from app.utils.pagination import paginate
+from app.utils.payment_schedule import ParsedTerm, parse_term
+
+# company_id -> (payment_terms collection version, parsed terms by id)
+_parsed_terms: dict[int, tuple[str, dict[int, ParsedTerm]]] = {}
+
+
+async def get_parsed_terms(db: AsyncSession, company_id: int) -> dict[int, ParsedTerm]:
+    """Parsed terms of a company, reloaded only when the collection version moved."""
+    version = await collection_version(db, ["payment_terms"], company_id)
+    cached = _parsed_terms.get(company_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    result = await db.execute(
+        select(PaymentTerm.id, PaymentTerm.lines).where(PaymentTerm.company_id == company_id)
+    )
+    terms = {row.id: parse_term(row.id, row.lines) for row in result.all()}
+    _parsed_terms[company_id] = (version, terms)
+    return terms
+
+
+async def _check_code_free(
+    db: AsyncSession, company_id: int, code: str, exclude_id: int | None = None
+) -> None:
+    query = select(PaymentTerm.id).where(
+        PaymentTerm.company_id == company_id, PaymentTerm.code == code
+    )
+    if exclude_id is not None:
+        query = query.where(PaymentTerm.id != exclude_id)
+    if (await db.execute(query)).first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Payment term code '{code}' already exists",
+        )
+
+
+async def create_payment_term(
+    db: AsyncSession, data: PaymentTermCreate, current_user: User | None = None
+) -> PaymentTerm:
+    await _check_code_free(db, data.company_id, data.code)
+    term = PaymentTerm(**data.model_dump())
+    db.add(term)
+    await db.flush()
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="create",
+            module="third_party",
+            entity_type="payment_term",
+            entity_id=term.id,
+            description=f"Created payment term '{term.name}'",
+            new_values=data.model_dump(),
+        )
+    return await get_payment_term(db, term.id)
+
+
+async def get_payment_term(db: AsyncSession, term_id: int) -> PaymentTerm:
+    result = await db.execute(select(PaymentTerm).where(PaymentTerm.id == term_id))
+    term = result.scalar_one_or_none()
+    if not term:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment term not found")
+    return term
+
+
+async def list_payment_terms(
+    db: AsyncSession,
+    company_id: int | None = None,
+    search: str | None = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> dict:
+    query = select(PaymentTerm).order_by(PaymentTerm.name)
+    if company_id is not None:
+        query = query.where(PaymentTerm.company_id == company_id)
+    if search:
+        pattern = f"%{search}%"
+        query = query.where(or_(PaymentTerm.name.ilike(pattern), PaymentTerm.code.ilike(pattern)))
+    return await paginate(db, query, page, page_size)
+
+
+async def update_payment_term(
+    db: AsyncSession,
+    term_id: int,
+    data: PaymentTermUpdate,
+    current_user: User | None = None,
+) -> PaymentTerm:
+    term = await get_payment_term(db, term_id)
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data.get("code") and update_data["code"] != term.code:
+        await _check_code_free(db, term.company_id, update_data["code"], exclude_id=term_id)
+    old_values = {k: getattr(term, k) for k in update_data}
+    for field, value in update_data.items():
+        setattr(term, field, value)
+    await db.flush()
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="update",
+            module="third_party",
+            entity_type="payment_term",
+            entity_id=term.id,
+            description=f"Updated payment term '{term.name}'",
+            old_values=old_values,
+            new_values=update_data,
+        )
+    return await get_payment_term(db, term_id)
+
+
+async def delete_payment_term(
+    db: AsyncSession, term_id: int, current_user: User | None = None
+) -> None:
+    term = await get_payment_term(db, term_id)
+    in_use = await db.execute(
+        select(ThirdParty.id)
+        .where(
+            or_(
+                ThirdParty.customer_payment_term_id == term_id,
+                ThirdParty.supplier_payment_term_id == term_id,
+            )
+        )
+        .limit(1)
+    )
+    if in_use.first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Payment term is used by third parties",
+        )
+    term_name, company_id = term.name, term.company_id
+    await db.delete(term)
+    await record_tombstone(db, "payment_term", term_id, company_id)
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="delete",
+            module="third_party",
+            entity_type="payment_term",
+            entity_id=term_id,
+            description=f"Deleted payment term '{term_name}'",
+        )
@@ -1,11 +1,13 @@
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import exists, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.role import Role
 from app.models.user import User
 from app.schemas.role import RoleCreate, RoleUpdate
 from app.services.audit import log_action
+from app.services.sync import record_tombstone
+from app.services.notifications import notify_change
 from app.utils.pagination import paginate
 
 
@@ -43,51 +45,48 @@ async def list_roles(
     page: int = 1,
     page_size: int = 50,
 ) -> dict:
-    # Subquery to count users per role
-    user_count_sq = (
-        select(User.role_id, func.count(User.id).label("user_count"))
-        .group_by(User.role_id)
-        .subquery()
-    )
-    query = (
-        select(Role, func.coalesce(user_count_sq.c.user_count, 0).label("user_count"))
-        .outerjoin(user_count_sq, Role.id == user_count_sq.c.role_id)
-        .order_by(Role.name)
-    )
+    query = select(Role).order_by(Role.name)
     if company_id is not None:
         query = query.where(
             (Role.company_id == company_id) | (Role.company_id.is_(None))
         )
+    return await paginate(db, query, page, page_size)
 
-    # Manual pagination since we have a tuple result
-    count_query = select(func.count()).select_from(
-        select(Role.id).where(
-            (Role.company_id == company_id) | (Role.company_id.is_(None))
-        ).subquery()
-        if company_id is not None
-        else select(Role.id).subquery()
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
 
-    offset = (page - 1) * page_size
-    result = await db.execute(query.offset(offset).limit(page_size))
-    rows = result.all()
+async def adjust_role_user_count(
+    db: AsyncSession, role_id: int | None, delta: int
+) -> None:
+    """Atomically shift a role's user_count, in the caller's transaction."""
+    if role_id is None or delta == 0:
+        return
+    result = await db.execute(
+        update(Role)
+        .where(Role.id == role_id)
+        .values(user_count=Role.user_count + delta)
+        .returning(Role.company_id)
+    )
+    for company_id in result.scalars().all():
+        await notify_change(db, "role", role_id, "update", company_id)
 
-    items = []
-    for row in rows:
-        role = row[0]
-        role._user_count = row[1]
-        items.append(role)
 
-    pages = (total + page_size - 1) // page_size if page_size > 0 else 0
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "pages": pages,
-    }
+async def recount_role_users(db: AsyncSession) -> int:
+    """Repair job: recompute user_count from users, return the roles fixed."""
+    actual = (
+        select(func.count(User.id))
+        .where(User.role_id == Role.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Role)
+        .where(Role.user_count != actual)
+        .values(user_count=actual)
+        .returning(Role.id, Role.company_id)
+        .execution_options(synchronize_session="fetch")
+    )
+    fixed = result.all()
+    for row in fixed:
+        await notify_change(db, "role", row.id, "update", row.company_id)
+    return len(fixed)
 
 
 async def update_role(
@@ -128,19 +127,19 @@ async def delete_role(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot delete system role",
         )
-    # Check if any users are assigned to this role
-    user_count_result = await db.execute(
-        select(func.count(User.id)).where(User.role_id == role_id)
-    )
-    user_count = user_count_result.scalar() or 0
-    if user_count > 0:
+    # Blocks concurrent assignments: their FK check takes a key-share lock
+    await db.execute(select(Role.id).where(Role.id == role.id).with_for_update())
+    # Asks users (ix_users_role_id), not user_count: a drifted counter would
+    # let ON DELETE SET NULL strip the users of their role
+    if await db.scalar(select(exists().where(User.role_id == role.id))):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Cannot delete role with {user_count} assigned user(s)",
+            detail="Cannot delete role with assigned users",
         )
     role_label = role.label
     role_id_val = role.id
     await db.delete(role)
+    await record_tombstone(db, "role", role_id_val, role.company_id)
     if current_user:
         await log_action(
             db,
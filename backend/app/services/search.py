@@ -0,0 +1,103 @@
+"""Global search over users, partners, contacts and companies.
+
+One indexed query over search_documents (kept current by triggers, see
+app.models.search_document): words are matched as prefixes through the
+full-text index, and the whole query as a substring through the trigram
+index (emails, codes, phone digits). Results are limited to the entity
+types the caller may view and to their company scope, and ranked by
+full-text rank plus word similarity.
+"""
+
+import re
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import user_has_permission
+from app.models.search_document import SearchDocument
+from app.models.user import User
+from app.utils.normalize import search_text
+
+# Permission needed to find each entity type
+SEARCH_PERMISSIONS: dict[str, str] = {
+    "user": "admin.view",
+    "company": "admin.view",
+    "third_party": "third_party.view",
+    "contact": "third_party.view",
+}
+# Shorter substrings have no trigram to probe the index with
+MIN_SUBSTRING_LENGTH = 3
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def searchable_types(user: User, types: set[str] | None = None) -> list[str]:
+    return sorted(
+        entity_type
+        for entity_type, permission in SEARCH_PERMISSIONS.items()
+        if (types is None or entity_type in types) and user_has_permission(user, permission)
+    )
+
+
+async def search(
+    db: AsyncSession,
+    current_user: User,
+    q: str,
+    company_id: int | None,
+    *,
+    types: set[str] | None = None,
+    include_inactive: bool = False,
+    limit: int = 10,
+) -> list[dict]:
+    """Best matches of `q`, best first; `company_id` is the resolved scope."""
+    allowed = searchable_types(current_user, types)
+    text = search_text(q).strip()
+    words = _WORD.findall(text)
+    if not allowed or not words:
+        return []
+
+    # Words are [0-9a-z]+, safe to splice into the tsquery syntax
+    query = func.to_tsquery(
+        literal_column("'simple'::regconfig"), " & ".join(f"{word}:*" for word in words)
+    )
+    matches = [SearchDocument.search_vector.bool_op("@@")(query)]
+    if len(text) >= MIN_SUBSTRING_LENGTH:
+        matches.append(SearchDocument.search_text.contains(text, autoescape=True))
+
+    rank = (
+        func.ts_rank_cd(SearchDocument.search_vector, query)
+        + func.word_similarity(text, SearchDocument.search_text)
+    ).label("rank")
+    stmt = (
+        select(
+            SearchDocument.entity_type,
+            SearchDocument.entity_id,
+            SearchDocument.title,
+            SearchDocument.subtitle,
+            SearchDocument.company_id,
+            SearchDocument.parent_id,
+            SearchDocument.is_active,
+            rank,
+        )
+        .where(SearchDocument.entity_type.in_(allowed), or_(*matches))
+        .order_by(rank.desc(), SearchDocument.title, SearchDocument.id)
+        .limit(limit)
+    )
+    if company_id is not None:
+        stmt = stmt.where(SearchDocument.company_id == company_id)
+    if not include_inactive:
+        stmt = stmt.where(SearchDocument.is_active.is_(True))
+
+    return [
+        {
+            "type": row.entity_type,
+            "id": row.entity_id,
+            "title": row.title,
+            "subtitle": row.subtitle,
+            "company_id": row.company_id,
+            "parent_id": row.parent_id,
+            "is_active": row.is_active,
+            "rank": round(float(row.rank), 4),
+        }
+        for row in await db.execute(stmt)
+    ]
@@ -0,0 +1,195 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from string import Formatter
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.number_sequence import NumberSequence
+from app.models.third_party import ThirdParty
+from app.models.user import User
+from app.services.audit import log_action
+from app.services.notifications import hub, notify_change
+
+DEFAULT_PATTERNS: dict[str, str] = {
+    "third_party.code": "TP-{seq:06}",
+    "third_party.customer_code": "CLI-{YYYY}-{seq:05}",
+    "third_party.supplier_code": "FRS-{YYYY}-{seq:05}",
+}
+# Column each sequence fills: a pattern's codes must fit it
+CODE_COLUMNS = {
+    "third_party.code": ThirdParty.__table__.c.code,
+    "third_party.customer_code": ThirdParty.__table__.c.customer_code,
+    "third_party.supplier_code": ThirdParty.__table__.c.supplier_code,
+}
+# Largest counter value a pattern is checked against
+LARGEST_SEQ = 10**9 - 1
+
+
+@dataclass
+class _Block:
+    """Range of counter values reserved by this worker: [next, end)."""
+
+    next: int
+    end: int
+    pattern: str
+    period: str
+
+
+_blocks: dict[tuple[int, str, str], _Block] = {}
+_locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+
+def _drop_blocks(message: dict) -> None:
+    """A pattern changed in some worker: stop handing out codes of the old one."""
+    if message["type"] == "reset":
+        _blocks.clear()
+    elif message.get("entity_type") == "number_sequence":
+        for cached in [k for k in _blocks if k[0] == message["company_id"]]:
+            _blocks.pop(cached, None)
+
+
+hub.on_message(_drop_blocks)
+
+
+def format_code(pattern: str, seq: int, period: str) -> str:
+    return (
+        pattern.replace("{YYYY}", period).replace("{YY}", period[-2:]).format(seq=seq)
+    )
+
+
+def _pattern_fields(pattern: str) -> list[str]:
+    """Replacement fields of a pattern, besides {YYYY} and {YY}."""
+    template = pattern.replace("{YYYY}", "").replace("{YY}", "")
+    return [name for _, name, _, _ in Formatter().parse(template) if name is not None]
+
+
+async def _reserve_block(company_id: int, key: str, period: str) -> _Block:
+    """Reserve the next block in its own short transaction.
+
+    The counter row is locked only for this single upsert, never for the
+    caller's whole request; values of a block lost on rollback leave gaps.
+    """
+    size = settings.SEQUENCE_BLOCK_SIZE
+    table = NumberSequence.__table__
+    stmt = insert(table).values(
+        company_id=company_id,
+        key=key,
+        pattern=DEFAULT_PATTERNS[key],
+        period=period,
+        next_value=size + 1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.company_id, table.c.key],
+        set_={
+            "next_value": case(
+                (
+                    (table.c.period == period) | ~table.c.pattern.contains("{YY"),
+                    table.c.next_value + size,
+                ),
+                else_=size + 1,
+            ),
+            "period": period,
+        },
+    ).returning(table.c.next_value, table.c.pattern)
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(stmt)).one()
+        await db.commit()
+    return _Block(next=row.next_value - size, end=row.next_value, pattern=row.pattern, period=period)
+
+
+async def next_code(company_id: int, key: str) -> str:
+    """Allocate the next code of `key` for a company."""
+    if key not in DEFAULT_PATTERNS:
+        raise ValueError(f"Unknown sequence '{key}'")
+    period = str(datetime.now(timezone.utc).year)
+    lock = _locks.setdefault((company_id, key), asyncio.Lock())
+    async with lock:
+        block = _blocks.get((company_id, key, period))
+        if block is None or block.next >= block.end:
+            block = await _reserve_block(company_id, key, period)
+            _blocks[(company_id, key, period)] = block
+        seq = block.next
+        block.next += 1
+    return format_code(block.pattern, seq, period)
+
+
+async def list_sequences(db: AsyncSession, company_id: int) -> list[dict]:
+    result = await db.execute(
+        select(NumberSequence).where(NumberSequence.company_id == company_id)
+    )
+    stored = {seq.key: seq for seq in result.scalars().all()}
+    return [
+        {
+            "key": key,
+            "pattern": stored[key].pattern if key in stored else default,
+            "period": stored[key].period if key in stored else "",
+            "next_value": stored[key].next_value if key in stored else 1,
+        }
+        for key, default in DEFAULT_PATTERNS.items()
+    ]
+
+
+async def set_sequence_pattern(
+    db: AsyncSession,
+    company_id: int,
+    key: str,
+    pattern: str,
+    current_user: User | None = None,
+) -> dict:
+    if key not in DEFAULT_PATTERNS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sequence not found")
+    try:
+        # Only a bare {seq}: attribute or index lookups ({seq.real}) are refused
+        fields = _pattern_fields(pattern)
+        if any(name != "seq" for name in fields):
+            raise ValueError(pattern)
+        format_code(pattern, 1, "2000")
+    except (KeyError, IndexError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pattern may only use {YYYY}, {YY} and {seq}",
+        )
+    if not fields:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pattern must contain {seq}",
+        )
+    max_length = CODE_COLUMNS[key].type.length
+    if len(format_code(pattern, LARGEST_SEQ, "9999")) > max_length:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Codes of this pattern may exceed {max_length} characters",
+        )
+
+    table = NumberSequence.__table__
+    stmt = insert(table).values(
+        company_id=company_id, key=key, pattern=pattern, period="", next_value=1
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.company_id, table.c.key], set_={"pattern": pattern}
+        )
+    )
+    # Blocks reserved under the old pattern are dropped here, and in the
+    # other workers once the change event is delivered on commit; their
+    # unused values leave a gap
+    for cached in [k for k in _blocks if k[:2] == (company_id, key)]:
+        del _blocks[cached]
+    await notify_change(db, "number_sequence", None, "update", company_id)
+    if current_user:
+        await log_action(
+            db,
+            user=current_user,
+            action="update",
+            module="admin",
+            entity_type="number_sequence",
+            description=f"Set pattern of '{key}' to '{pattern}' for company {company_id}",
+            new_values={"key": key, "pattern": pattern},
+        )
+    return next(s for s in await list_sequences(db, company_id) if s["key"] == key)
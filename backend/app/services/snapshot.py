@@ -0,0 +1,258 @@
+"""Compressed per-company customer snapshot for POS terminal boot.
+
+A snapshot holds every active customer of a company with its default
+billing address and primary contact, in a columnar JSON document that is
+gzipped and named after its SHA-256 (content-addressed). Each snapshot
+records the third_parties collection version it reflects and a
+delta-sync cursor. Terminals download it once, then follow /third-parties/changes.
+
+When the collection version moves on, the next request triggers one background
+rebuild per company and keeps serving the previous snapshot meanwhile. The
+rebuild is incremental: only partners changed since the snapshot cursor are
+read and patched into the previous rows.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.third_party import Address, Contact, ThirdParty
+from app.services.sync import current_cursor, list_changes
+from app.services.versioning import collection_version
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the document or its cursor change shape; older ones are rebuilt
+SNAPSHOT_FORMAT = 2
+# Files no longer referenced by the meta are deleted after this long
+PRUNE_AFTER_SECONDS = 600
+CUSTOMER_FIELDS = [
+    "id", "code", "customer_code", "name", "vat_number", "email", "phone", "mobile",
+    "tags", "customer_payment_term_id", "customer_credit_limit",
+]
+ADDRESS_FIELDS = ["address_line1", "address_line2", "zip_code", "city", "country"]
+CONTACT_FIELDS = ["first_name", "last_name", "email", "phone", "mobile"]
+FIELDS = (
+    CUSTOMER_FIELDS
+    + [f"billing_{f}" for f in ADDRESS_FIELDS]
+    + [f"contact_{f}" for f in CONTACT_FIELDS]
+)
+
+
+@dataclass
+class SnapshotMeta:
+    company_id: int
+    version: str
+    digest: str
+    cursor: str
+    rows: int
+    built_at: str
+    format: int = 1
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+_building: dict[int, asyncio.Task] = {}
+
+
+def _company_dir(company_id: int) -> Path:
+    return Path(settings.SNAPSHOT_DIR) / str(company_id)
+
+
+def snapshot_path(meta: SnapshotMeta) -> Path:
+    return _company_dir(meta.company_id) / f"{meta.digest}.json.gz"
+
+
+def load_meta(company_id: int) -> SnapshotMeta | None:
+    path = _company_dir(company_id) / "meta.json"
+    if not path.is_file():
+        return None
+    meta = SnapshotMeta(**json.loads(path.read_text(encoding="utf-8")))
+    if meta.format != SNAPSHOT_FORMAT:
+        return None
+    return meta if snapshot_path(meta).is_file() else None
+
+
+def _row(tp: ThirdParty, address: Address | None, contact: Contact | None) -> list:
+    return (
+        [getattr(tp, f) for f in CUSTOMER_FIELDS]
+        + [getattr(address, f) if address else None for f in ADDRESS_FIELDS]
+        + [getattr(contact, f) if contact else None for f in CONTACT_FIELDS]
+    )
+
+
+def _pick(children: list, flag: str):
+    """Flagged child, or the oldest one when none is flagged."""
+    flagged = [c for c in children if getattr(c, flag)]
+    candidates = flagged or children
+    return min(candidates, key=lambda c: c.id) if candidates else None
+
+
+async def _full_rows(db: AsyncSession, company_id: int) -> dict[int, list]:
+    """All customer rows in three queries, whatever the company size."""
+    customers = (
+        select(ThirdParty.id)
+        .where(
+            ThirdParty.company_id == company_id,
+            ThirdParty.is_active.is_(True),
+            ThirdParty.is_customer.is_(True),
+        )
+        .scalar_subquery()
+    )
+    tps = (
+        await db.execute(
+            select(ThirdParty).where(ThirdParty.id.in_(customers)).order_by(ThirdParty.id)
+        )
+    ).scalars().all()
+    addresses = (
+        await db.execute(
+            select(Address)
+            .distinct(Address.third_party_id)
+            .where(Address.third_party_id.in_(customers))
+            .order_by(Address.third_party_id, Address.is_default_billing.desc().nulls_last(), Address.id)
+        )
+    ).scalars().all()
+    contacts = (
+        await db.execute(
+            select(Contact)
+            .distinct(Contact.third_party_id)
+            .where(Contact.third_party_id.in_(customers))
+            .order_by(Contact.third_party_id, Contact.is_primary.desc().nulls_last(), Contact.id)
+        )
+    ).scalars().all()
+    address_of = {a.third_party_id: a for a in addresses}
+    contact_of = {c.third_party_id: c for c in contacts}
+    return {tp.id: _row(tp, address_of.get(tp.id), contact_of.get(tp.id)) for tp in tps}
+
+
+def _read_rows(meta: SnapshotMeta) -> dict[int, list]:
+    document = json.loads(gzip.decompress(snapshot_path(meta).read_bytes()))
+    return {row[0]: row for row in document["rows"]}
+
+
+async def _build(company_id: int) -> SnapshotMeta:
+    previous = load_meta(company_id)
+    async with AsyncSessionLocal() as db:
+        # Read the version first: a write racing the build triggers another one
+        version = await collection_version(db, ["third_parties"], company_id)
+        if previous is None:
+            cursor = await current_cursor(db)
+            rows = await _full_rows(db, company_id)
+        else:
+            rows = await asyncio.to_thread(_read_rows, previous)
+            cursor = previous.cursor
+            while True:
+                changes = await list_changes(db, "third_parties", company_id, cursor, 1000)
+                for tp in changes["items"]:
+                    if tp.is_active and tp.is_customer:
+                        rows[tp.id] = _row(
+                            tp,
+                            _pick(tp.addresses, "is_default_billing"),
+                            _pick(tp.contacts, "is_primary"),
+                        )
+                    else:
+                        rows.pop(tp.id, None)
+                for deleted in changes["deleted"]:
+                    # Child deletions touch the parent, which comes with the items
+                    if deleted["entity_type"] == "third_party":
+                        rows.pop(deleted["id"], None)
+                cursor = changes["next_cursor"]
+                if not changes["has_more"]:
+                    break
+
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "company_id": company_id,
+        "version": version,
+        "cursor": cursor,
+        "fields": FIELDS,
+        "rows": [rows[k] for k in sorted(rows)],
+    }
+    meta = await asyncio.to_thread(_write, company_id, version, cursor, document)
+    logger.info("Built customer snapshot %s for company %s (%s rows)", meta.digest[:12], company_id, meta.rows)
+    return meta
+
+
+def _write(company_id: int, version: str, cursor: str, document: dict) -> SnapshotMeta:
+    raw = json.dumps(document, separators=(",", ":"), default=str).encode("utf-8")
+    payload = gzip.compress(raw, compresslevel=6, mtime=0)
+    digest = hashlib.sha256(payload).hexdigest()
+    meta = SnapshotMeta(
+        company_id=company_id,
+        version=version,
+        digest=digest,
+        cursor=cursor,
+        rows=len(document["rows"]),
+        built_at=datetime.now(timezone.utc).isoformat(),
+        format=SNAPSHOT_FORMAT,
+    )
+    directory = _company_dir(company_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = snapshot_path(meta)
+    if not target.exists():
+        _replace(directory, target, payload)
+    _replace(directory, directory / "meta.json", json.dumps(asdict(meta)).encode("utf-8"))
+    _prune(company_id)
+    return meta
+
+
+def _replace(directory: Path, target: Path, data: bytes) -> None:
+    """Atomically (re)place `target`, through a temp file of this writer only."""
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    Path(tmp.name).replace(target)
+
+
+def _prune(company_id: int) -> None:
+    """Drop files the current meta does not point to, once they are old
+    enough not to be in a download or a concurrent build of another worker.
+    """
+    directory = _company_dir(company_id)
+    current = load_meta(company_id)
+    cutoff = time.time() - PRUNE_AFTER_SECONDS
+    for path in [*directory.glob("*.json.gz"), *directory.glob("*.tmp")]:
+        if current is not None and path == snapshot_path(current):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+
+
+async def build_customer_snapshot(company_id: int) -> SnapshotMeta:
+    """Build now, e.g. from a background job after a bulk import."""
+    return await asyncio.shield(_rebuild(company_id))
+
+
+def _rebuild(company_id: int) -> asyncio.Task:
+    """Single-flight build per company within this worker."""
+    task = _building.get(company_id)
+    if task is None or task.done():
+        task = asyncio.create_task(_build(company_id))
+        _building[company_id] = task
+    return task
+
+
+async def get_customer_snapshot(db: AsyncSession, company_id: int) -> SnapshotMeta:
+    meta = load_meta(company_id)
+    if meta is None:
+        # Concurrent first boots all wait on the same build
+        return await build_customer_snapshot(company_id)
+    if meta.version != await collection_version(db, ["third_parties"], company_id):
+        _rebuild(company_id)
+    return meta
@@ -0,0 +1,168 @@
+"""Incremental delta sync for POS terminals and integrations.
+
+Clients page through `changes?since=<cursor>` and keep the returned
+`next_cursor`. Changed rows come in (xact_id, id) order, xact_id being the
+id of the transaction that last wrote the row; hard deletes come from
+tombstones, in the same order.
+
+Transaction ids are assigned when a transaction first writes, not when it
+commits, so a row may become visible behind the position already served.
+A pass therefore also records the oldest transaction still running when
+it read (the snapshot xmin): every transaction below it had finished and
+was seen. The next pass starts again from there. Rows of transactions
+that were in flight are delivered again, which clients absorb as upserts,
+and a transaction that stays open for long keeps the pass start back
+until it ends.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, Text, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.company import Company
+from app.models.payment_term import PaymentTerm
+from app.models.role import Role
+from app.models.third_party import ThirdParty
+from app.models.tombstone import Tombstone
+from app.models.user import User
+
+SNAPSHOT_XMIN = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+@dataclass
+class SyncResource:
+    model: type
+    entity_types: tuple[str, ...]  # tombstone types reported with this resource
+    options: list = field(default_factory=list)
+    shared_rows: bool = False  # company_id NULL rows are visible to every company
+
+
+SYNC_RESOURCES: dict[str, SyncResource] = {
+    "third_parties": SyncResource(
+        ThirdParty,
+        ("third_party", "address", "contact"),
+        [selectinload(ThirdParty.addresses), selectinload(ThirdParty.contacts)],
+    ),
+    "users": SyncResource(User, ("user",), [selectinload(User.role)]),
+    "roles": SyncResource(Role, ("role",), shared_rows=True),
+    "companies": SyncResource(Company, ("company",)),
+    "payment_terms": SyncResource(PaymentTerm, ("payment_term",)),
+}
+
+
+@dataclass
+class Cursor:
+    """Position in a pass: where the pass started and how far it got."""
+
+    # Lowest snapshot xmin seen during this pass; None before the first page
+    floor: int | None = None
+    row_after: tuple[int, int] = (0, 0)  # (xact_id, id) of the last row served
+    tombstone_after: tuple[int, int] = (0, 0)
+
+    @classmethod
+    def starting_at(cls, xact_id: int) -> "Cursor":
+        return cls(None, (xact_id, 0), (xact_id, 0))
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = json.dumps([cursor.floor, *cursor.row_after, *cursor.tombstone_after])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str | None) -> Cursor:
+    if not cursor:
+        return Cursor()
+    try:
+        floor, row_xact, row_id, tombstone_xact, tombstone_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+        return Cursor(
+            None if floor is None else int(floor),
+            (int(row_xact), int(row_id)),
+            (int(tombstone_xact), int(tombstone_id)),
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+async def current_cursor(db: AsyncSession) -> str:
+    """Cursor of the changes after a full read that starts now."""
+    return encode_cursor(Cursor.starting_at((await db.execute(select(SNAPSHOT_XMIN))).scalar()))
+
+
+async def record_tombstone(
+    db: AsyncSession, entity_type: str, entity_id: int, company_id: int | None
+) -> None:
+    db.add(Tombstone(entity_type=entity_type, entity_id=entity_id, company_id=company_id))
+
+
+async def list_changes(
+    db: AsyncSession,
+    resource: str,
+    company_id: int | None,
+    since: str | None = None,
+    limit: int = 500,
+) -> dict:
+    """Rows changed and rows deleted after `since`, at most `limit` of each."""
+    spec = SYNC_RESOURCES[resource]
+    model = spec.model
+    cursor = decode_cursor(since)
+    # Read before the rows: transactions below it are visible to the queries
+    xmin = (await db.execute(select(SNAPSHOT_XMIN))).scalar()
+    floor = xmin if cursor.floor is None else min(cursor.floor, xmin)
+
+    query = (
+        select(model)
+        .options(*spec.options)
+        .where(tuple_(model.xact_id, model.id) > tuple_(*cursor.row_after))
+        .order_by(model.xact_id, model.id)
+        .limit(limit + 1)
+    )
+    tombstones = (
+        select(Tombstone)
+        .where(
+            Tombstone.entity_type.in_(spec.entity_types),
+            tuple_(Tombstone.xact_id, Tombstone.id) > tuple_(*cursor.tombstone_after),
+        )
+        .order_by(Tombstone.xact_id, Tombstone.id)
+        .limit(limit + 1)
+    )
+    if company_id is not None:
+        if model is Company:
+            query = query.where(Company.id == company_id)
+        elif spec.shared_rows:
+            query = query.where(
+                (model.company_id == company_id) | (model.company_id.is_(None))
+            )
+        else:
+            query = query.where(model.company_id == company_id)
+        tombstones = tombstones.where(
+            (Tombstone.company_id == company_id) | (Tombstone.company_id.is_(None))
+        )
+
+    items = list((await db.execute(query)).scalars().all())
+    deleted = list((await db.execute(tombstones)).scalars().all())
+    has_more = len(items) > limit or len(deleted) > limit
+    items, deleted = items[:limit], deleted[:limit]
+
+    if has_more:
+        next_cursor = Cursor(
+            floor,
+            (items[-1].xact_id, items[-1].id) if items else cursor.row_after,
+            (deleted[-1].xact_id, deleted[-1].id) if deleted else cursor.tombstone_after,
+        )
+    else:
+        # Pass complete: the next one starts where nothing can still appear
+        next_cursor = Cursor.starting_at(floor)
+
+    return {
+        "items": items,
+        "deleted": [{"entity_type": t.entity_type, "id": t.entity_id} for t in deleted],
+        "next_cursor": encode_cursor(next_cursor),
+        "has_more": has_more,
+    }
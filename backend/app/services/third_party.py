@@ -1,45 +1,137 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer,
+    Text,
+    cast,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by, array, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
+from app.core.config import settings
+from app.models.payment_term import PaymentTerm
 from app.models.third_party import Address, Contact, ThirdParty
+from app.models.user import User
 from app.schemas.third_party import (
     AddressCreate,
     AddressUpdate,
     ContactCreate,
     ContactUpdate,
+    ThirdPartyBulkUpdate,
     ThirdPartyCreate,
+    ThirdPartyLookup,
     ThirdPartyUpdate,
 )
+from app.services.bulk import bulk_update
+from app.services.sequence import next_code
+from app.services.sync import record_tombstone
+from app.services.notifications import notify_change
+from app.utils.normalize import normalize_email, normalize_tax_id, to_e164
 from app.utils.pagination import paginate
 
 
+# Code field -> (sequence key, unique constraint, label)
+CODE_FIELDS = {
+    "code": ("third_party.code", "third_parties_company_id_code_key", "Third party code"),
+    "customer_code": (
+        "third_party.customer_code",
+        "third_parties_company_id_customer_code_key",
+        "Customer code",
+    ),
+    "supplier_code": (
+        "third_party.supplier_code",
+        "third_parties_company_id_supplier_code_key",
+        "Supplier code",
+    ),
+}
+# Allocated codes tried before giving up, e.g. over a run of imported codes
+CODE_ATTEMPTS = 10
+
+
+def _conflicting_code_field(exc: IntegrityError) -> str | None:
+    constraint = getattr(exc.orig.__cause__, "constraint_name", None)
+    for field_name, (_, name, _) in CODE_FIELDS.items():
+        if constraint == name:
+            return field_name
+    return None
+
+
+async def _insert_third_party(db: AsyncSession, tp_data: dict, allocated: set[str]) -> int:
+    """Insert the partner row, drawing a new number for an allocated code
+    that is already taken (e.g. by an imported partner).
+
+    A clash on `code` is skipped by ON CONFLICT; the other codes raise,
+    so each attempt runs in a savepoint.
+    """
+    for _ in range(CODE_ATTEMPTS):
+        try:
+            async with db.begin_nested():
+                result = await db.execute(
+                    insert(ThirdParty)
+                    .values(**tp_data)
+                    .on_conflict_do_nothing(constraint=CODE_FIELDS["code"][1])
+                    .returning(ThirdParty.id)
+                )
+                tp_id = result.scalar_one_or_none()
+        except IntegrityError as exc:
+            field_name = _conflicting_code_field(exc)
+            if field_name is None:
+                raise
+        else:
+            if tp_id is not None:
+                return tp_id
+            field_name = "code"
+
+        sequence_key, _, label = CODE_FIELDS[field_name]
+        if field_name not in allocated:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{label} '{tp_data[field_name]}' already exists",
+            )
+        tp_data[field_name] = await next_code(tp_data["company_id"], sequence_key)
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Could not allocate a free third party code, check the numbering pattern",
+    )
+
+
 async def create_third_party(
     db: AsyncSession, data: ThirdPartyCreate
 ) -> ThirdParty:
-    # Check code uniqueness
-    existing = await db.execute(
-        select(ThirdParty).where(ThirdParty.code == data.code)
-    )
-    if existing.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Third party code '{data.code}' already exists",
-        )
-
     tp_data = data.model_dump(exclude={"addresses", "contacts"})
-    tp = ThirdParty(**tp_data)
+    wanted = {
+        "code": True,
+        "customer_code": data.is_customer,
+        "supplier_code": data.is_supplier,
+    }
+    allocated = set()
+    for field_name, (sequence_key, _, _) in CODE_FIELDS.items():
+        if wanted[field_name] and not tp_data[field_name]:
+            tp_data[field_name] = await next_code(data.company_id, sequence_key)
+            allocated.add(field_name)
+
+    # Per-company uniqueness is enforced by the table constraints
+    tp_id = await _insert_third_party(db, tp_data, allocated)
+    await notify_change(db, "third_party", tp_id, "create", data.company_id)
 
     for addr_data in data.addresses:
-        tp.addresses.append(Address(**addr_data.model_dump()))
+        db.add(Address(third_party_id=tp_id, **addr_data.model_dump()))
 
     for contact_data in data.contacts:
-        tp.contacts.append(Contact(**contact_data.model_dump()))
+        db.add(Contact(third_party_id=tp_id, **contact_data.model_dump()))
 
-    db.add(tp)
     await db.flush()
-    return tp
+    return await get_third_party(db, tp_id)
 
 
 async def get_third_party(db: AsyncSession, tp_id: int) -> ThirdParty:
@@ -55,31 +147,261 @@ async def get_third_party(db: AsyncSession, tp_id: int) -> ThirdParty:
     return tp
 
 
-async def list_third_parties(
-    db: AsyncSession,
+LIST_INCLUDES = {
+    "addresses": ThirdParty.addresses,
+    "contacts": ThirdParty.contacts,
+}
+
+
+def _third_party_conditions(
     company_id: int,
     *,
     is_customer: bool | None = None,
     is_supplier: bool | None = None,
+    is_employee: bool | None = None,
+    is_active: bool | None = None,
+    tags: list[str] | None = None,
+    tag_mode: str = "any",
+    customer_payment_term_id: int | None = None,
+    supplier_payment_term_id: int | None = None,
     search: str | None = None,
+) -> list:
+    conditions = [ThirdParty.company_id == company_id]
+    if is_customer is not None:
+        conditions.append(ThirdParty.is_customer == is_customer)
+    if is_supplier is not None:
+        conditions.append(ThirdParty.is_supplier == is_supplier)
+    if is_employee is not None:
+        conditions.append(ThirdParty.is_employee == is_employee)
+    if is_active is not None:
+        conditions.append(ThirdParty.is_active.is_(is_active))
+    if tags:
+        # Containment only, so the jsonb_path_ops index serves both modes
+        # ("any" is a bitmap OR of one probe per tag)
+        if tag_mode == "all":
+            conditions.append(ThirdParty.tags.contains(tags))
+        else:
+            conditions.append(or_(*(ThirdParty.tags.contains([tag]) for tag in tags)))
+    if customer_payment_term_id is not None:
+        conditions.append(ThirdParty.customer_payment_term_id == customer_payment_term_id)
+    if supplier_payment_term_id is not None:
+        conditions.append(ThirdParty.supplier_payment_term_id == supplier_payment_term_id)
+    if search:
+        conditions.append(
+            or_(ThirdParty.name.ilike(f"%{search}%"), ThirdParty.code.ilike(f"%{search}%"))
+        )
+    return conditions
+
+
+FACET_TAG_LIMIT = 50
+
+
+def _facet_json(counts, key: str):
+    """[{key: value, "count": n}, ...] of a (value, n) subquery, most frequent first."""
+    return select(
+        func.coalesce(
+            func.jsonb_agg(
+                aggregate_order_by(
+                    func.jsonb_build_object(key, counts.c.value, "count", counts.c.n),
+                    counts.c.n.desc(),
+                    counts.c.value,
+                )
+            ),
+            literal([], JSONB),
+        )
+    ).scalar_subquery()
+
+
+async def third_party_facets(db: AsyncSession, conditions: list) -> dict:
+    """Counts by tag, role flag and payment term of the matching partners.
+
+    One statement: the matching rows are read once into a CTE that every
+    facet aggregates.
+    """
+    base = (
+        select(
+            ThirdParty.tags,
+            ThirdParty.is_customer,
+            ThirdParty.is_supplier,
+            ThirdParty.is_employee,
+            ThirdParty.customer_payment_term_id,
+            ThirdParty.supplier_payment_term_id,
+        )
+        .where(*conditions)
+        .cte("base")
+    )
+    tag = (
+        func.jsonb_array_elements_text(func.coalesce(base.c.tags, literal([], JSONB)))
+        .table_valued("value")
+        .alias("tag")
+    )
+    tag_counts = (
+        select(tag.c.value, func.count().label("n"))
+        .select_from(base.join(tag, true()))
+        .group_by(tag.c.value)
+        .order_by(func.count().desc(), tag.c.value)
+        .limit(FACET_TAG_LIMIT)
+        .subquery()
+    )
+
+    def term_counts(column):
+        return (
+            select(column.label("value"), func.count().label("n"))
+            .where(column.is_not(None))
+            .group_by(column)
+            .subquery()
+        )
+
+    row = (
+        await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(base.c.is_customer.is_(True)).label("is_customer"),
+                func.count().filter(base.c.is_supplier.is_(True)).label("is_supplier"),
+                func.count().filter(base.c.is_employee.is_(True)).label("is_employee"),
+                _facet_json(tag_counts, "value").label("tags"),
+                _facet_json(term_counts(base.c.customer_payment_term_id), "id").label(
+                    "customer_payment_terms"
+                ),
+                _facet_json(term_counts(base.c.supplier_payment_term_id), "id").label(
+                    "supplier_payment_terms"
+                ),
+            ).select_from(base)
+        )
+    ).one()
+    return dict(row._mapping)
+
+
+async def list_third_parties(
+    db: AsyncSession,
+    company_id: int,
+    *,
+    include: set[str] | None = None,
+    facets: bool = False,
     page: int = 1,
     page_size: int = 20,
+    **filters,
 ) -> dict:
+    """List active partners with their child counts.
+
+    `filters` are those of `_third_party_conditions`. Relationships named in
+    `include` are loaded for the whole page with one batched query each;
+    with `facets`, the counts of `third_party_facets` come along.
+    """
+    conditions = _third_party_conditions(company_id, is_active=True, **filters)
     query = (
         select(ThirdParty)
-        .where(ThirdParty.company_id == company_id, ThirdParty.is_active.is_(True))
+        .options(undefer(ThirdParty.address_count), undefer(ThirdParty.contact_count))
+        .where(*conditions)
         .order_by(ThirdParty.name)
     )
-    if is_customer is not None:
-        query = query.where(ThirdParty.is_customer == is_customer)
-    if is_supplier is not None:
-        query = query.where(ThirdParty.is_supplier == is_supplier)
-    if search:
-        query = query.where(
-            ThirdParty.name.ilike(f"%{search}%")
-            | ThirdParty.code.ilike(f"%{search}%")
+    for name in include or ():
+        query = query.options(selectinload(LIST_INCLUDES[name]))
+    result = await paginate(db, query, page, page_size)
+    if facets:
+        result["facets"] = await third_party_facets(db, conditions)
+    return result
+
+
+def _lookup_branch(key_type: str, source, keys, condition, scope: list):
+    """(type, third_party_id, contact_id, keys) rows of one index probe."""
+    is_contact = source is Contact
+    query = select(
+        literal(key_type).label("type"),
+        (Contact.third_party_id if is_contact else ThirdParty.id).label("third_party_id"),
+        (Contact.id if is_contact else cast(null(), Integer)).label("contact_id"),
+        cast(keys, ARRAY(Text)).label("keys"),
+    ).where(condition, *scope)
+    if is_contact:
+        query = query.join(ThirdParty, ThirdParty.id == Contact.third_party_id)
+    return query
+
+
+async def lookup_third_parties(db: AsyncSession, data: ThirdPartyLookup) -> dict:
+    """Partners matching any of the keys, through their contacts too.
+
+    Keys are normalized like the generated lookup columns, and each key
+    type costs one probe of its index (GIN overlap for phones and tax
+    ids, btree for emails and customer codes), all in one statement.
+    """
+    wanted: dict[str, dict[str, list[str]]] = {}
+    for key_type, keys, normalize in (
+        ("phone", data.phones, lambda k: to_e164(k, settings.PHONE_COUNTRY_CODE)),
+        ("email", data.emails, normalize_email),
+        ("tax_id", data.tax_ids, normalize_tax_id),
+        ("customer_code", data.customer_codes, lambda k: k.strip() or None),
+    ):
+        for key in keys:
+            normalized = normalize(key)
+            if normalized:
+                wanted.setdefault(key_type, {}).setdefault(normalized, []).append(key)
+    if not wanted:
+        return {"matches": [], "third_parties": []}
+
+    scope = [ThirdParty.company_id == data.company_id]
+    if not data.include_inactive:
+        scope.append(ThirdParty.is_active.is_(True))
+    branches = []
+    if "phone" in wanted:
+        phones = cast(list(wanted["phone"]), ARRAY(Text))
+        for source in (ThirdParty, Contact):
+            branches.append(
+                _lookup_branch(
+                    "phone", source, source.phone_keys, source.phone_keys.overlap(phones), scope
+                )
+            )
+    if "email" in wanted:
+        emails = list(wanted["email"])
+        for source in (ThirdParty, Contact):
+            branches.append(
+                _lookup_branch(
+                    "email", source, array([source.email_key]), source.email_key.in_(emails), scope
+                )
+            )
+    if "tax_id" in wanted:
+        tax_ids = cast(list(wanted["tax_id"]), ARRAY(Text))
+        branches.append(
+            _lookup_branch(
+                "tax_id", ThirdParty, ThirdParty.tax_keys, ThirdParty.tax_keys.overlap(tax_ids), scope
+            )
+        )
+    if "customer_code" in wanted:
+        branches.append(
+            _lookup_branch(
+                "customer_code",
+                ThirdParty,
+                array([ThirdParty.customer_code]),
+                ThirdParty.customer_code.in_(list(wanted["customer_code"])),
+                scope,
+            )
         )
-    return await paginate(db, query, page, page_size)
+    rows = (await db.execute(union_all(*branches))).all()
+
+    matches = []
+    for row in rows:
+        for normalized in row.keys:
+            for key in wanted[row.type].get(normalized, ()):
+                matches.append(
+                    {
+                        "type": row.type,
+                        "key": key,
+                        "third_party_id": row.third_party_id,
+                        "contact_id": row.contact_id,
+                    }
+                )
+    matches.sort(key=lambda m: (m["type"], m["key"], m["third_party_id"], m["contact_id"] or 0))
+
+    third_parties = []
+    if matches:
+        third_parties = (
+            await db.execute(
+                select(ThirdParty)
+                .options(undefer(ThirdParty.address_count), undefer(ThirdParty.contact_count))
+                .where(ThirdParty.id.in_({m["third_party_id"] for m in matches}))
+                .order_by(ThirdParty.name, ThirdParty.id)
+            )
+        ).scalars().all()
+    return {"matches": matches, "third_parties": third_parties}
 
 
 async def update_third_party(
@@ -90,7 +412,81 @@ async def update_third_party(
     for field, value in update_data.items():
         setattr(tp, field, value)
     await db.flush()
-    return tp
+    return await get_third_party(db, tp_id)
+
+
+def _tags_expression(add: list[str] | None, remove: list[str] | None):
+    """New tags of a row: `remove` dropped, `add` appended once each."""
+    tags = func.coalesce(ThirdParty.tags, literal([], JSONB))
+    dropped = [*(remove or []), *(add or [])]
+    if dropped:
+        tags = tags.op("-", return_type=JSONB)(cast(dropped, ARRAY(Text)))
+    if add:
+        tags = tags.op("||", return_type=JSONB)(literal(list(dict.fromkeys(add)), JSONB))
+    return tags
+
+
+async def bulk_update_third_parties(
+    db: AsyncSession, data: ThirdPartyBulkUpdate, current_user: User
+) -> list[int]:
+    """Patch many partners of a company at once (see app.services.bulk)."""
+    patch = data.patch.model_dump(exclude_unset=True)
+    term_ids = {
+        patch[field]
+        for field in ("customer_payment_term_id", "supplier_payment_term_id")
+        if patch.get(field) is not None
+    }
+    if term_ids:
+        found = await db.scalar(
+            select(func.count(PaymentTerm.id)).where(
+                PaymentTerm.id.in_(term_ids), PaymentTerm.company_id == data.company_id
+            )
+        )
+        if found != len(term_ids):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Payment term not found"
+            )
+
+    values = {
+        field: value
+        for field, value in patch.items()
+        if field not in ("add_tags", "remove_tags")
+    }
+    if patch.get("add_tags") or patch.get("remove_tags"):
+        values["tags"] = _tags_expression(patch.get("add_tags"), patch.get("remove_tags"))
+    if not values:
+        return []
+
+    if data.ids is not None:
+        conditions = _third_party_conditions(data.company_id) + [ThirdParty.id.in_(data.ids)]
+    else:
+        conditions = _third_party_conditions(data.company_id, **data.filter.model_dump())
+
+    return await bulk_update(
+        db,
+        ThirdParty,
+        conditions=conditions,
+        values=values,
+        patch=patch,
+        entity_type="third_party",
+        module="third_party",
+        current_user=current_user,
+    )
+
+
+async def _touch_third_party(db: AsyncSession, tp_id: int) -> int | None:
+    """Child rows are part of the partner: move its version forward."""
+    result = await db.execute(
+        update(ThirdParty)
+        .where(ThirdParty.id == tp_id)
+        .values(updated_at=func.now())
+        .returning(ThirdParty.company_id)
+        .execution_options(synchronize_session="fetch")
+    )
+    company_id = result.scalar_one_or_none()
+    if company_id is not None:
+        await notify_change(db, "third_party", tp_id, "update", company_id)
+    return company_id
 
 
 # --- Address sub-resource ---
@@ -101,6 +497,7 @@ async def add_address(
     address = Address(third_party_id=tp_id, **data.model_dump())
     db.add(address)
     await db.flush()
+    await _touch_third_party(db, tp_id)
     return address
 
 
@@ -114,6 +511,7 @@ async def update_address(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(address, field, value)
     await db.flush()
+    await _touch_third_party(db, address.third_party_id)
     return address
 
 
@@ -123,6 +521,8 @@ async def delete_address(db: AsyncSession, address_id: int) -> None:
     if not address:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Address not found")
     await db.delete(address)
+    company_id = await _touch_third_party(db, address.third_party_id)
+    await record_tombstone(db, "address", address_id, company_id)
 
 
 # --- Contact sub-resource ---
@@ -133,6 +533,7 @@ async def add_contact(
     contact = Contact(third_party_id=tp_id, **data.model_dump())
     db.add(contact)
     await db.flush()
+    await _touch_third_party(db, tp_id)
     return contact
 
 
@@ -146,6 +547,7 @@ async def update_contact(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(contact, field, value)
     await db.flush()
+    await _touch_third_party(db, contact.third_party_id)
     return contact
 
 
@@ -155,3 +557,5 @@ async def delete_contact(db: AsyncSession, contact_id: int) -> None:
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
     await db.delete(contact)
+    company_id = await _touch_third_party(db, contact.third_party_id)
+    await record_tombstone(db, "contact", contact_id, company_id)
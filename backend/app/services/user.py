@@ -3,10 +3,13 @@ from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.security import hash_password, hash_pin, verify_password
+from app.core.security import hash_password, hash_pin, pin_lookup_digest, verify_password
+from app.models.role import Role
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserBulkUpdate, UserCreate, UserUpdate
 from app.services.audit import log_action
+from app.services.bulk import bulk_update
+from app.services.role import adjust_role_user_count
 from app.utils.pagination import paginate
 
 
@@ -32,8 +35,10 @@ async def create_user(
     )
     if data.pin:
         user.hashed_pin = hash_pin(data.pin)
+        user.pin_lookup = pin_lookup_digest(data.pin)
     db.add(user)
     await db.flush()
+    await adjust_role_user_count(db, user.role_id, 1)
     if current_user:
         await log_action(
             db,
@@ -61,31 +66,46 @@ async def get_user(db: AsyncSession, user_id: int) -> User:
     return user
 
 
-async def list_users(
-    db: AsyncSession,
+def _user_conditions(
     company_id: int | None = None,
     role_id: int | None = None,
     is_active: bool | None = None,
     search: str | None = None,
-    page: int = 1,
-    page_size: int = 20,
-) -> dict:
-    query = select(User).options(selectinload(User.role)).order_by(User.last_name)
+) -> list:
+    conditions = []
     if company_id is not None:
-        query = query.where(User.company_id == company_id)
+        conditions.append(User.company_id == company_id)
     if role_id is not None:
-        query = query.where(User.role_id == role_id)
+        conditions.append(User.role_id == role_id)
     if is_active is not None:
-        query = query.where(User.is_active.is_(is_active))
+        conditions.append(User.is_active.is_(is_active))
     if search:
         term = f"%{search}%"
-        query = query.where(
+        conditions.append(
             or_(
                 User.first_name.ilike(term),
                 User.last_name.ilike(term),
                 User.email.ilike(term),
             )
         )
+    return conditions
+
+
+async def list_users(
+    db: AsyncSession,
+    company_id: int | None = None,
+    role_id: int | None = None,
+    is_active: bool | None = None,
+    search: str | None = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> dict:
+    query = (
+        select(User)
+        .options(selectinload(User.role))
+        .where(*_user_conditions(company_id, role_id, is_active, search))
+        .order_by(User.last_name)
+    )
     return await paginate(db, query, page, page_size)
 
 
@@ -98,9 +118,13 @@ async def update_user(
     user = await get_user(db, user_id)
     update_data = data.model_dump(exclude_unset=True)
     old_values = {k: getattr(user, k) for k in update_data}
+    old_role_id = user.role_id
     for field, value in update_data.items():
         setattr(user, field, value)
     await db.flush()
+    if user.role_id != old_role_id:
+        await adjust_role_user_count(db, old_role_id, -1)
+        await adjust_role_user_count(db, user.role_id, 1)
     if current_user:
         await log_action(
             db,
@@ -116,11 +140,65 @@ async def update_user(
     return await get_user(db, user_id)
 
 
+async def bulk_update_users(
+    db: AsyncSession,
+    data: UserBulkUpdate,
+    company_id: int | None,
+    current_user: User,
+) -> list[int]:
+    """Patch many users at once (see app.services.bulk); the caller is never included."""
+    patch = data.patch.model_dump(exclude_unset=True)
+    if patch.get("role_id") is not None:
+        role = await db.get(Role, patch["role_id"])
+        if role is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
+        if role.is_superadmin and not (current_user.role and current_user.role.is_superadmin):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only a superadmin can grant the superadmin role",
+            )
+        if role.company_id is not None and company_id not in (None, role.company_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Role belongs to another company",
+            )
+
+    if data.ids is not None:
+        conditions = _user_conditions(company_id) + [User.id.in_(data.ids)]
+    else:
+        conditions = _user_conditions(company_id, **data.filter.model_dump())
+    conditions.append(User.id != current_user.id)
+
+    async def move_role_counts(rows) -> None:
+        if "role_id" not in patch:
+            return
+        moved: dict[int, int] = {}
+        for row in rows:
+            if row["role_id"] is not None:
+                moved[row["role_id"]] = moved.get(row["role_id"], 0) + 1
+        for role_id, count in sorted(moved.items()):
+            await adjust_role_user_count(db, role_id, -count)
+        await adjust_role_user_count(db, patch["role_id"], len(rows))
+
+    return await bulk_update(
+        db,
+        User,
+        conditions=conditions,
+        values=patch,
+        patch=patch,
+        entity_type="user",
+        module="admin",
+        current_user=current_user,
+        on_chunk=move_role_counts,
+    )
+
+
 async def set_user_pin(
     db: AsyncSession, user_id: int, pin: str, current_user: User | None = None
 ) -> User:
     user = await get_user(db, user_id)
     user.hashed_pin = hash_pin(pin)
+    user.pin_lookup = pin_lookup_digest(pin)
     await db.flush()
     if current_user:
         await log_action(
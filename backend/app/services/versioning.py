@@ -0,0 +1,146 @@
+"""Resource versions for ETags and optimistic concurrency.
+
+A collection version is read from the rows themselves, with no counter to
+bump on writes: the highest `xact_id` (id of the last writing transaction)
+and the row count in scope, from the (company_id, xact_id) indexes. A
+transaction with a lower id may commit after a higher one, so the ids of
+transactions still in progress below that maximum are part of the version
+too: their commit changes it even if it moves neither the maximum nor the
+count. Everything is read in one statement, hence from one snapshot.
+"""
+
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal_column, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.company import Company
+from app.models.payment_term import PaymentTerm
+from app.models.role import Role
+from app.models.third_party import ThirdParty
+from app.models.user import User
+from app.utils.etag import etag_matches, make_etag
+
+VERSIONED_MODELS = {
+    model.__tablename__: model for model in (Company, Role, User, ThirdParty, PaymentTerm)
+}
+
+# Resources with single-resource ETags
+ENTITY_MODELS = {
+    "company": Company,
+    "role": Role,
+    "user": User,
+    "third_party": ThirdParty,
+}
+
+IN_PROGRESS_XACT_IDS = literal_column(
+    "ARRAY(SELECT x::text::bigint FROM pg_snapshot_xip(pg_current_snapshot()) AS x)"
+)
+
+
+def _table_state(model, company_id: int | None):
+    """'max xact_id:count' of a table, scoped to a company and shared rows."""
+    stmt = select(
+        func.concat(func.coalesce(func.max(model.xact_id), 0), ":", func.count())
+    ).select_from(model)
+    if company_id is not None and model is not Company:
+        stmt = stmt.where(or_(model.company_id == company_id, model.company_id.is_(None)))
+    return stmt.scalar_subquery()
+
+
+async def collection_version(
+    db: AsyncSession, tables: list[str], company_id: int | None
+) -> str:
+    """Version of the rows of `tables` a company sees (every row for None).
+
+    A company scope also covers rows shared by all companies (e.g. global
+    roles); companies are never scoped.
+    """
+    row = (
+        await db.execute(
+            select(
+                *(_table_state(VERSIONED_MODELS[table], company_id) for table in tables),
+                IN_PROGRESS_XACT_IDS,
+            )
+        )
+    ).one()
+    *states, in_progress = row
+    highest = max(int(state.split(":")[0]) for state in states)
+    pending = sorted(x for x in in_progress if x <= highest)
+    return ";".join([*states, ",".join(map(str, pending))])
+
+
+async def collection_etag(
+    db: AsyncSession, tables: list[str], company_id: int | None, query: str
+) -> str:
+    """ETag of a list response: collection version plus the query string."""
+    version = await collection_version(db, tables, company_id)
+    return make_etag(*tables, company_id, version, query)
+
+
+def entity_etag(kind: str, entity_id: int, *versions: datetime | None) -> str:
+    return make_etag(kind, entity_id, *(v.isoformat() if v else "-" for v in versions))
+
+
+def etag_of(kind: str, obj) -> str:
+    """ETag of a loaded entity, matching `current_entity_etag`."""
+    if kind == "user":
+        return entity_etag(kind, obj.id, obj.updated_at, obj.role.updated_at if obj.role else None)
+    return entity_etag(kind, obj.id, obj.updated_at)
+
+
+async def _current_versions(db: AsyncSession, kind: str, entity_id: int) -> tuple:
+    model = ENTITY_MODELS[kind]
+    if kind == "user":
+        # The user representation embeds the role
+        stmt = (
+            select(User.updated_at, Role.updated_at)
+            .outerjoin(Role, User.role_id == Role.id)
+            .where(User.id == entity_id)
+        )
+    else:
+        stmt = select(model.updated_at).where(model.id == entity_id)
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{kind.replace('_', ' ').capitalize()} not found",
+        )
+    return tuple(row)
+
+
+async def current_entity_etag(db: AsyncSession, kind: str, entity_id: int) -> str:
+    """ETag of an entity read with one narrow query, before loading it."""
+    return entity_etag(kind, entity_id, *await _current_versions(db, kind, entity_id))
+
+
+async def check_if_match(
+    db: AsyncSession, kind: str, entity_id: int, if_match: str | None
+) -> None:
+    """Optimistic concurrency guard for updates.
+
+    The version is compared, then claimed with a conditional UPDATE on
+    updated_at, so a concurrent writer that got in between makes this one
+    fail with 412 instead of being silently overwritten.
+    """
+    if if_match is None:
+        return
+    versions = await _current_versions(db, kind, entity_id)
+    if not etag_matches(if_match, entity_etag(kind, entity_id, *versions), weak=False):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource was modified, reload it first",
+        )
+    model = ENTITY_MODELS[kind]
+    result = await db.execute(
+        update(model)
+        .where(model.id == entity_id, model.updated_at == versions[0])
+        .values(updated_at=func.now())
+        .execution_options(synchronize_session="fetch")
+    )
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource was modified, reload it first",
+        )
@@ -0,0 +1,100 @@
+"""Compact field-level deltas for the audit trail.
+
+Instead of two full snapshots, an update is stored as {field: [old, new]}
+for the fields that actually changed. Values are encoded the same way
+everywhere: JSON scalars as they are, other types tagged so they decode
+back to what was logged:
+
+    datetime -> {"$dt": "2026-01-31T10:00:00+00:00"}  (aware ones in UTC)
+    date     -> {"$d": "2026-01-31"}
+    Decimal  -> {"$dec": "12.5"}  (normalized: 12.50 == 12.5, and equal
+                to the float 12.5 when comparing)
+
+Untagged legacy values decode to themselves.
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+_DECODERS = {
+    "$dt": datetime.fromisoformat,
+    "$d": date.fromisoformat,
+    "$dec": Decimal,
+}
+
+
+def encode_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return encode_value(value.value)
+    if isinstance(value, datetime):
+        # One representation per instant, so equal values compare equal
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": format(value.normalize(), "f")}
+    if isinstance(value, dict):
+        return {str(k): encode_value(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((encode_value(v) for v in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    if hasattr(value, "model_dump"):
+        return encode_value(value.model_dump())
+    return str(value)
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1:
+            tag, raw = next(iter(value.items()))
+            if tag in _DECODERS and isinstance(raw, str):
+                return _DECODERS[tag](raw)
+        return {k: decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    return value
+
+
+def _number(encoded: Any) -> Decimal | None:
+    if isinstance(encoded, dict) and isinstance(encoded.get("$dec"), str) and len(encoded) == 1:
+        return Decimal(encoded["$dec"])
+    if isinstance(encoded, (int, float)) and not isinstance(encoded, bool):
+        return Decimal(str(encoded))
+    return None
+
+
+def _same(old: Any, new: Any) -> bool:
+    if old == new:
+        return True
+    # Numeric columns read back as Decimal, request values come as floats
+    old_number, new_number = _number(old), _number(new)
+    return old_number is not None and old_number == new_number
+
+
+def compute_delta(old_values: dict, new_values: dict) -> dict[str, list]:
+    """{field: [old, new]} of the fields whose encoded value differs."""
+    delta = {}
+    for field in dict.fromkeys([*old_values, *new_values]):
+        old = encode_value(old_values.get(field))
+        new = encode_value(new_values.get(field))
+        if not _same(old, new):
+            delta[str(field)] = [old, new]
+    return delta
+
+
+def expand(
+    changes: dict[str, list] | None, old_values: dict | None, new_values: dict | None
+) -> tuple[dict | None, dict | None]:
+    """Decoded (old_values, new_values) of a stored audit entry."""
+    if changes is None:
+        return decode_value(old_values), decode_value(new_values)
+    old = {field: decode_value(pair[0]) for field, pair in changes.items()}
+    new = {field: decode_value(pair[1]) for field, pair in changes.items()}
+    return old, new
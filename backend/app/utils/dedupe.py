@@ -0,0 +1,158 @@
+"""Duplicate detection without comparing every pair.
+
+1. Blocking: each partner gets a few keys (normalized VAT/tax id, phone,
+   company email domain, and the two rarest trigrams of its name); only
+   partners sharing a key are compared. Keys shared by more than
+   `max_block` partners (a switchboard number, a common word) say little
+   and are skipped. Because similar names share most trigrams, they share
+   at least one of their rarest ones in practice (prefix filtering).
+2. Scoring: evidence is combined as a noisy-OR, so one strong signal
+   (same VAT) or several weak ones (same phone, similar name) suffice:
+       1 - (1 - 0.9 vat)(1 - 0.6 phone)(1 - 0.3 domain)(1 - name jaccard)
+3. Clustering: pairs above the threshold are joined with union-find.
+"""
+
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import combinations
+
+from app.utils.normalize import (
+    email_domain,
+    name_trigrams,
+    normalize_name,
+    normalize_tax_id,
+    phone_digits,
+)
+
+WEIGHTS = {"vat": 0.9, "phone": 0.6, "domain": 0.3}
+
+# Shared by unrelated people: never evidence of a duplicate
+FREE_MAIL_DOMAINS = frozenset(
+    {
+        "gmail.com", "googlemail.com", "yahoo.com", "yahoo.fr", "hotmail.com", "hotmail.fr",
+        "outlook.com", "outlook.fr", "live.com", "live.fr", "msn.com", "icloud.com", "me.com",
+        "orange.fr", "wanadoo.fr", "free.fr", "sfr.fr", "laposte.net", "bbox.fr", "aol.com",
+        "gmx.fr", "gmx.com", "protonmail.com", "proton.me",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Partner:
+    id: int
+    vat: str | None
+    phones: frozenset[str]
+    domain: str | None
+    grams: tuple[int, ...]  # interned name trigrams, sorted
+
+
+def prepare(
+    rows: Iterable[tuple[int, str | None, str | None, str | None, str | None, str | None, str | None]],
+) -> list[Partner]:
+    """Partners from (id, name, vat_number, tax_id, email, phone, mobile) rows."""
+    gram_ids: dict[str, int] = {}
+    partners = []
+    for row_id, name, vat_number, tax_id, email, phone, mobile in rows:
+        domain = email_domain(email)
+        grams = name_trigrams(normalize_name(name))
+        partners.append(
+            Partner(
+                id=row_id,
+                vat=normalize_tax_id(vat_number) or normalize_tax_id(tax_id),
+                phones=frozenset(p for p in (phone_digits(phone), phone_digits(mobile)) if p),
+                domain=None if domain in FREE_MAIL_DOMAINS else domain,
+                grams=tuple(sorted(gram_ids.setdefault(g, len(gram_ids)) for g in grams)),
+            )
+        )
+    return partners
+
+
+def blocks(partners: list[Partner], grams_per_name: int = 2) -> dict[tuple, list[int]]:
+    """Blocking key -> positions in `partners` of those having it."""
+    frequency = Counter(g for p in partners for g in p.grams)
+    keyed: dict[tuple, list[int]] = defaultdict(list)
+    for i, p in enumerate(partners):
+        if p.vat:
+            keyed[("vat", p.vat)].append(i)
+        for phone in p.phones:
+            keyed[("phone", phone)].append(i)
+        if p.domain:
+            keyed[("domain", p.domain)].append(i)
+        for g in sorted(p.grams, key=lambda g: (frequency[g], g))[:grams_per_name]:
+            keyed[("gram", g)].append(i)
+    return keyed
+
+
+def score(a: Partner, b: Partner) -> tuple[float, list[str]]:
+    """Duplicate likelihood in [0, 1] and the signals behind it."""
+    reasons = []
+    remaining = 1.0
+    if a.vat and a.vat == b.vat:
+        reasons.append("vat")
+        remaining *= 1 - WEIGHTS["vat"]
+    if a.phones & b.phones:
+        reasons.append("phone")
+        remaining *= 1 - WEIGHTS["phone"]
+    if a.domain and a.domain == b.domain:
+        reasons.append("domain")
+        remaining *= 1 - WEIGHTS["domain"]
+    if a.grams and b.grams:
+        shared = len(set(a.grams).intersection(b.grams))
+        similarity = shared / (len(a.grams) + len(b.grams) - shared)
+        if similarity >= 0.3:
+            reasons.append(f"name:{similarity:.2f}")
+        remaining *= 1 - similarity
+    return round(1 - remaining, 4), reasons
+
+
+def find_clusters(
+    partners: list[Partner], threshold: float = 0.75, max_block: int = 50
+) -> list[dict]:
+    """Clusters of likely duplicates, best first.
+
+    Each cluster is {"member_ids": [...], "score": best pair score,
+    "pairs": [[id, id, score, reasons], ...]} for the pairs above threshold.
+    """
+    compared: set[tuple[int, int]] = set()
+    edges = []
+    for members in blocks(partners).values():
+        if len(members) < 2 or len(members) > max_block:
+            continue
+        for i, j in combinations(members, 2):
+            pair = (i, j) if i < j else (j, i)
+            if pair in compared:
+                continue
+            compared.add(pair)
+            value, reasons = score(partners[i], partners[j])
+            if value >= threshold:
+                edges.append((pair[0], pair[1], value, reasons))
+
+    parent = list(range(len(partners)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _, _ in edges:
+        parent[root(i)] = root(j)
+
+    grouped: dict[int, dict] = {}
+    for i, j, value, reasons in edges:
+        cluster = grouped.setdefault(root(i), {"members": set(), "score": 0.0, "pairs": []})
+        cluster["members"].update((i, j))
+        cluster["score"] = max(cluster["score"], value)
+        cluster["pairs"].append([partners[i].id, partners[j].id, value, reasons])
+
+    clusters = [
+        {
+            "member_ids": sorted(partners[i].id for i in cluster["members"]),
+            "score": cluster["score"],
+            "pairs": cluster["pairs"],
+        }
+        for cluster in grouped.values()
+    ]
+    clusters.sort(key=lambda c: (-c["score"], c["member_ids"][0]))
+    return clusters
@@ -0,0 +1,136 @@
+"""Canonical forms of identifiers typed in many ways.
+
+Used wherever two spellings of the same VAT number, phone or name must
+compare equal (duplicate detection, exact lookups). The `*_sql` helpers
+give the same forms as SQL expressions, for generated lookup columns;
+keep each pair in step.
+"""
+
+import re
+import unicodedata
+
+_NOT_ALNUM = re.compile(r"[^0-9A-Za-z]+")
+_NOT_DIGIT = re.compile(r"\D+")
+
+# Words that say nothing about which partner a name designates
+NAME_STOPWORDS = frozenset(
+    {
+        "sa", "sas", "sasu", "sarl", "eurl", "sci", "snc", "scop", "ste", "societe",
+        "ets", "etablissements", "cie", "co", "and", "et", "de", "du", "des", "la",
+        "le", "les", "l", "d", "ltd", "llc", "inc", "gmbh", "bv", "spa", "srl",
+    }
+)
+
+
+def normalize_tax_id(value: str | None) -> str | None:
+    """VAT / tax id without spaces, dots or dashes, upper-cased."""
+    if not value:
+        return None
+    return _NOT_ALNUM.sub("", value).upper() or None
+
+
+def normalize_email(value: str | None) -> str | None:
+    if not value:
+        return None
+    return value.strip(" ").lower() or None
+
+
+def to_e164(value: str | None, country_code: str) -> str | None:
+    """+<country><number>; numbers without "+" or "00" are national ones.
+
+    "06 12 34 56 78" -> "+33612345678" with `country_code` "33".
+    """
+    if not value:
+        return None
+    digits = _NOT_DIGIT.sub("", value)
+    if value.lstrip(" ").startswith("+"):
+        number = digits
+    elif digits.startswith("00"):
+        number = digits[2:]
+    elif digits.startswith("0"):
+        number = country_code + digits[1:]
+    else:
+        number = country_code + digits
+    return f"+{number}" if 8 <= len(number) <= 15 else None
+
+
+def phone_digits(value: str | None) -> str | None:
+    """Last 9 digits: the national number whatever the prefix (+33 6..., 06...)."""
+    if not value:
+        return None
+    digits = _NOT_DIGIT.sub("", value)
+    return digits[-9:] if len(digits) >= 9 else None
+
+
+def email_domain(value: str | None) -> str | None:
+    if not value or "@" not in value:
+        return None
+    return value.rsplit("@", 1)[1].strip().lower() or None
+
+
+def normalize_name(value: str | None) -> str:
+    """Lower-case, accent-free words of a name, legal forms left out."""
+    if not value:
+        return ""
+    ascii_name = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode()
+    words = _NOT_ALNUM.sub(" ", ascii_name.lower()).split()
+    return " ".join(word for word in words if word not in NAME_STOPWORDS)
+
+
+def name_trigrams(normalized: str) -> set[str]:
+    """Trigrams of each word padded like pg_trgm: "ab" -> {"  a", " ab", "ab "}."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# ---------------------------------------------------------------------------
+# SQL counterparts (immutable, so usable in generated columns and indexes)
+# ---------------------------------------------------------------------------
+
+def tax_id_sql(column: str) -> str:
+    return f"NULLIF(upper(regexp_replace({column}, '[^0-9A-Za-z]+', '', 'g')), '')"
+
+
+def email_sql(column: str) -> str:
+    return f"NULLIF(lower(btrim({column})), '')"
+
+
+def e164_sql(column: str, country_code: str) -> str:
+    if not country_code.isdigit():
+        raise ValueError(f"Invalid country calling code: {country_code!r}")
+    digits = f"regexp_replace({column}, '[^0-9]+', '', 'g')"
+    number = (
+        f"CASE WHEN ltrim({column}) LIKE '+%' THEN {digits}"
+        f" WHEN {digits} LIKE '00%' THEN substr({digits}, 3)"
+        f" WHEN {digits} LIKE '0%' THEN '{country_code}' || substr({digits}, 2)"
+        f" ELSE '{country_code}' || {digits} END"
+    )
+    return f"CASE WHEN length({number}) BETWEEN 8 AND 15 THEN '+' || {number} END"
+
+
+def keys_sql(*expressions: str) -> str:
+    """text[] of the non-null values, e.g. a partner's phone and mobile."""
+    return f"array_remove(ARRAY[{', '.join(expressions)}]::text[], NULL)"
+
+
+# Accent folding of search text, identical in Python and SQL (translate()
+# is immutable, unlike unaccent())
+_ACCENTED = "àáâãäåçèéêëìíîïñòóôõöøùúûüýÿ"
+_UNACCENTED = "aaaaaaceeeeiiiinoooooouuuuyy"
+_FOLD = str.maketrans(_ACCENTED, _UNACCENTED)
+
+
+def search_text(value: str | None) -> str:
+    """Lower-case, accent-free text as stored in search documents."""
+    return (value or "").lower().translate(_FOLD)
+
+
+def search_text_sql(expression: str) -> str:
+    return f"translate(lower({expression}), '{_ACCENTED}', '{_UNACCENTED}')"
+
+
+def digits_sql(expression: str) -> str:
+    return f"regexp_replace({expression}, '[^0-9]+', '', 'g')"
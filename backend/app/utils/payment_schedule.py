@@ -0,0 +1,110 @@
+"""Due-date schedules of payment terms.
+
+A term is parsed once into basis points and day offsets. Amounts are split
+in integer cents so installments always add up to the invoice amount, the
+last installment taking the rounding remainder.
+
+Line types:
+  - immediate:    due on the invoice date
+  - net:          invoice date + days
+  - end_of_month: invoice date + days, then the end of that month
+                  ("45 jours fin de mois")
+"""
+
+from calendar import monthrange
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+
+@dataclass(frozen=True)
+class ParsedLine:
+    basis_points: int  # 1/100 of a percent
+    days: int
+    type: str
+
+
+@dataclass(frozen=True)
+class ParsedTerm:
+    id: int
+    lines: tuple[ParsedLine, ...]
+
+
+# A term without lines is paid in full on the invoice date
+_IMMEDIATE = (ParsedLine(10000, 0, "immediate"),)
+
+
+def parse_term(term_id: int, lines: list[dict] | None) -> ParsedTerm:
+    parsed = tuple(
+        ParsedLine(
+            basis_points=round(float(line["percentage"]) * 100),
+            days=int(line.get("days") or 0),
+            type=line.get("type") or "net",
+        )
+        for line in lines or []
+    )
+    return ParsedTerm(term_id, parsed or _IMMEDIATE)
+
+
+def due_date(invoice_date: date, line: ParsedLine) -> date:
+    if line.type == "immediate":
+        return invoice_date
+    due = invoice_date + timedelta(days=line.days)
+    if line.type == "end_of_month":
+        due = due.replace(day=monthrange(due.year, due.month)[1])
+    return due
+
+
+def split_cents(cents: int, lines: Sequence[ParsedLine]) -> list[int]:
+    if len(lines) == 1:
+        return [cents]
+    total_bp = sum(line.basis_points for line in lines) or 1
+    parts = [cents * line.basis_points // total_bp for line in lines[:-1]]
+    parts.append(cents - sum(parts))
+    return parts
+
+
+def schedule(term: ParsedTerm, invoice_date: date, amount: float) -> list[dict]:
+    parts = split_cents(round(amount * 100), term.lines)
+    return [
+        {
+            "due_date": due_date(invoice_date, line),
+            "amount": part / 100,
+            "percentage": line.basis_points / 100,
+            "type": line.type,
+        }
+        for line, part in zip(term.lines, parts)
+    ]
+
+
+def schedule_batch(
+    terms: dict[int, ParsedTerm],
+    term_ids: Sequence[int],
+    invoice_dates: Sequence[date],
+    amounts: Sequence[float],
+) -> dict[str, list]:
+    """Installments of many invoices, as flat columns ordered by invoice.
+
+    Due dates only depend on (term, invoice date), which repeat heavily in
+    aging and dunning runs, so they are computed once per distinct pair.
+    Every term id must be present in `terms`.
+    """
+    invoice_index: list[int] = []
+    due_dates: list[date] = []
+    installment_amounts: list[float] = []
+    dues_of: dict[tuple[int, date], list[date]] = {}
+
+    for i, (term_id, invoice_date, amount) in enumerate(zip(term_ids, invoice_dates, amounts)):
+        term = terms[term_id]
+        dues = dues_of.get((term_id, invoice_date))
+        if dues is None:
+            dues = dues_of[(term_id, invoice_date)] = [
+                due_date(invoice_date, line) for line in term.lines
+            ]
+        invoice_index.extend([i] * len(dues))
+        due_dates.extend(dues)
+        installment_amounts.extend(
+            part / 100 for part in split_cents(round(amount * 100), term.lines)
+        )
+
+    return {"invoice_index": invoice_index, "due_dates": due_dates, "amounts": installment_amounts}
@@ -0,0 +1,110 @@
+"""Background job worker.
+
+    python -m app.worker --concurrency 4
+
+Run as many processes as needed, on any host reaching the database; they
+share the queue through SKIP LOCKED claims. SIGINT/SIGTERM stop claiming
+and let running jobs finish.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+
+import app.models  # noqa: F401 – registers every mapper
+from app.core.config import settings
+from app.core.database import connect_raw, engine
+from app.services import notifications  # noqa: F401 – flush listeners, as in the API
+from app.services.audit_rollup import roll_up_closed_days
+from app.services.idempotency import purge_expired_idempotency_keys
+from app.services.jobs import CHANNEL, claim_job, requeue_stale_jobs, run_job
+
+logger = logging.getLogger("app.worker")
+
+
+async def _listen(wake: asyncio.Event):
+    """Wake up on enqueue notifications; polling alone still works without."""
+    try:
+        connection = await connect_raw()
+        await connection.add_listener(CHANNEL, lambda *_: wake.set())
+        return connection
+    except Exception:
+        logger.warning("Cannot LISTEN for jobs, polling only", exc_info=True)
+        return None
+
+
+async def run(concurrency: int, worker_id: str) -> None:
+    stop, wake = asyncio.Event(), asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: (stop.set(), wake.set()))
+
+    listener = await _listen(wake)
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task] = set()
+    last_reap = 0.0
+    logger.info("Worker %s started with %s slots", worker_id, concurrency)
+
+    while not stop.is_set():
+        if time.monotonic() - last_reap > settings.JOB_STALE_AFTER_SECONDS / 2:
+            try:
+                requeued = await requeue_stale_jobs()
+                if requeued:
+                    logger.warning("Requeued %s stale job(s)", requeued)
+            except Exception:
+                logger.exception("Requeuing stale jobs failed")
+            try:
+                await purge_expired_idempotency_keys()
+            except Exception:
+                logger.exception("Purging idempotency keys failed")
+            try:
+                await roll_up_closed_days()
+            except Exception:
+                logger.exception("Rolling up audit activity failed")
+            last_reap = time.monotonic()
+
+        await slots.acquire()
+        try:
+            ctx = await claim_job(worker_id)
+        except Exception:
+            logger.exception("Claiming a job failed")
+            ctx = None
+        if ctx is None:
+            slots.release()
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        logger.info("Running job %s (%s), attempt %s", ctx.job_id, ctx.kind, ctx.attempt)
+        task = asyncio.create_task(run_job(ctx))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+    logger.info("Stopping, waiting for %s running job(s)", len(running))
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    if listener is not None:
+        await listener.close()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ERP background job worker")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    settings.check_secrets()
+    asyncio.run(run(args.concurrency, args.worker_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Generate a synthetic multi-tenant dataset and bulk-load it with COPY.
+
+    POSTGRES_HOST=localhost python -m benchmarks.dataset --truncate \
+        --companies 20 --users 2000 --third-parties 200000 --audit-rows 5000000
+
+Volumes are totals spread over companies with a Zipf skew (a few large
+tenants, a long tail of small ones). The same --seed on an empty database
+produces the same rows and ids.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.permissions import DEFAULT_ROLES
+from app.core.security import hash_password, hash_pin, pin_lookup_digest
+from app.main import ensure_database_exists, seed_defaults
+from app.models.base import Base
+from app.services.audit_rollup import rebuild_audit_rollups
+
+FIRST_NAMES = [
+    "Jean", "Marie", "Pierre", "Sophie", "Luc", "Julie", "Paul", "Claire", "Hugo",
+    "Emma", "Louis", "Lea", "Noah", "Chloe", "Adam", "Ines", "Lucas", "Sarah",
+]
+LAST_NAMES = [
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand",
+    "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David",
+    "Bertrand", "Roux", "Vincent", "Fournier", "Morel", "Girard", "Andre", "Mercier",
+]
+CITIES = [
+    ("Paris", "75001"), ("Lyon", "69001"), ("Marseille", "13001"), ("Lille", "59000"),
+    ("Toulouse", "31000"), ("Nantes", "44000"), ("Bordeaux", "33000"), ("Nice", "06000"),
+]
+COMPANY_WORDS = [
+    "Alpha", "Nord", "Atelier", "Boulangerie", "Garage", "Transports", "Conseil",
+    "Distribution", "Solutions", "Batiment", "Optique", "Pharmacie", "Bio", "Sud",
+]
+TAGS = [
+    "vip", "grossiste", "export", "b2b", "b2c", "fidele", "nouveau", "relance",
+    "litige", "premium", "local", "saisonnier", "public", "association", "franchise",
+]
+PAYMENT_TERMS = [
+    ("Comptant", "CASH", [{"percentage": 100, "days": 0, "type": "immediate"}]),
+    ("30 jours net", "NET30", [{"percentage": 100, "days": 30, "type": "net"}]),
+    ("45 jours fin de mois", "EOM45", [{"percentage": 100, "days": 45, "type": "end_of_month"}]),
+    ("60 jours net", "NET60", [{"percentage": 100, "days": 60, "type": "net"}]),
+    ("50/50", "HALF", [
+        {"percentage": 50, "days": 0, "type": "immediate"},
+        {"percentage": 50, "days": 30, "type": "net"},
+    ]),
+]
+# (module, action, entity_type, weight): reads of the audit trail are
+# dominated by a few hot actions
+AUDIT_EVENTS = [
+    ("pos", "pos.refund", "sale", 30),
+    ("pos", "pos.discount_above_threshold", "sale", 25),
+    ("pos", "pos.cancel_sale", "sale", 10),
+    ("admin", "update", "user", 8),
+    ("admin", "create", "user", 3),
+    ("admin", "toggle_status", "user", 2),
+    ("admin", "update", "company", 1),
+    ("admin", "update", "role", 1),
+    ("third_party", "create", "third_party", 12),
+    ("third_party", "update", "third_party", 8),
+]
+PINS = ["1234", "4321", "0000", "2580", "1111", "9876"]
+PASSWORD = "password"
+
+
+def zipf_split(total: int, buckets: int, rng: random.Random, s: float = 1.1) -> list[int]:
+    """Split `total` over `buckets` with Zipf weights, shuffled."""
+    weights = [1 / (rank**s) for rank in range(1, buckets + 1)]
+    norm = sum(weights)
+    counts = [int(total * w / norm) for w in weights]
+    counts[0] += total - sum(counts)
+    rng.shuffle(counts)
+    return counts
+
+
+class Generator:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.password_hash = hash_password(PASSWORD)
+        self.pin_hashes = {pin: (hash_pin(pin), pin_lookup_digest(pin)) for pin in PINS}
+
+    async def next_id(self, conn: asyncpg.Connection, table: str) -> int:
+        return (await conn.fetchval(f"SELECT coalesce(max(id), 0) FROM {table}")) + 1
+
+    async def copy(self, conn: asyncpg.Connection, table: str, columns: list[str], records) -> None:
+        start = time.perf_counter()
+        result = await conn.copy_records_to_table(table, columns=columns, records=records)
+        await conn.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT coalesce(max(id), 1) FROM {table}))"
+        )
+        print(f"{table:16} {result:>14} in {time.perf_counter() - start:.1f}s")
+
+    async def run(self, conn: asyncpg.Connection) -> None:
+        args, rng = self.args, self.rng
+
+        # Companies
+        company_start = await self.next_id(conn, "companies")
+        company_ids = list(range(company_start, company_start + args.companies))
+        await self.copy(conn, "companies", [
+            "id", "name", "currency", "country", "city", "is_active",
+            "pos_stock_deduction", "sale_stock_deduction",
+            "discount_pin_threshold", "sale_validation_threshold",
+        ], [
+            (cid, f"{rng.choice(COMPANY_WORDS)} {rng.choice(LAST_NAMES)} {cid}", "EUR",
+             "France", rng.choice(CITIES)[0], True, "on_payment", "on_delivery", 10.0, 2000.0)
+            for cid in company_ids
+        ])
+
+        # Roles: the default non-superadmin roles, per company
+        role_start = await self.next_id(conn, "roles")
+        role_rows, roles_by_company = [], {}
+        role_id = role_start
+        for cid in company_ids:
+            roles_by_company[cid] = []
+            for key, role_def in DEFAULT_ROLES.items():
+                if role_def.get("is_superadmin"):
+                    continue
+                role_rows.append([role_id, key, role_def["label"], cid, False,
+                                  role_def["multi_company"], False,
+                                  json.dumps(role_def["permissions"]), 0])
+                roles_by_company[cid].append(role_id)
+                role_id += 1
+
+        # Users (role counts are known before roles are loaded)
+        user_start = await self.next_id(conn, "users")
+        user_rows, users_by_company = [], {cid: [] for cid in company_ids}
+        role_index = {row[0]: row for row in role_rows}
+        uid = user_start
+        for cid, count in zip(company_ids, zipf_split(args.users, len(company_ids), rng)):
+            for _ in range(max(count, 1)):
+                rid = rng.choice(roles_by_company[cid])
+                role_index[rid][8] += 1
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                email = f"{first}.{last}.{uid}@c{cid}.example".lower()
+                pin = rng.choice(PINS) if rng.random() < 0.3 else None
+                hashed_pin, lookup = self.pin_hashes[pin] if pin else (None, None)
+                user_rows.append((uid, email, self.password_hash, first, last,
+                                  f"+3361{uid:07d}", hashed_pin, lookup,
+                                  rng.random() > 0.05, cid, rid))
+                users_by_company[cid].append((uid, email))
+                uid += 1
+
+        await self.copy(conn, "roles", [
+            "id", "name", "label", "company_id", "is_superadmin", "multi_company",
+            "is_system", "permissions", "user_count",
+        ], [tuple(row) for row in role_rows])
+        await self.copy(conn, "users", [
+            "id", "email", "hashed_password", "first_name", "last_name", "phone",
+            "hashed_pin", "pin_lookup", "is_active", "company_id", "role_id",
+        ], user_rows)
+
+        # Payment terms
+        term_start = await self.next_id(conn, "payment_terms")
+        term_rows, terms_by_company = [], {}
+        tid = term_start
+        for cid in company_ids:
+            terms_by_company[cid] = []
+            for name, code, lines in PAYMENT_TERMS[: args.payment_terms]:
+                term_rows.append((tid, name, code, None, json.dumps(lines), cid))
+                terms_by_company[cid].append(tid)
+                tid += 1
+        await self.copy(conn, "payment_terms", [
+            "id", "name", "code", "description", "lines", "company_id",
+        ], term_rows)
+
+        # Third parties, addresses, contacts
+        tp_start = await self.next_id(conn, "third_parties")
+        tp_split = zipf_split(args.third_parties, len(company_ids), rng)
+        tp_owner = []
+        for cid, count in zip(company_ids, tp_split):
+            tp_owner.extend([cid] * count)
+
+        def third_parties():
+            for offset, cid in enumerate(tp_owner):
+                tp_id = tp_start + offset
+                is_customer = rng.random() < 0.8
+                is_supplier = not is_customer or rng.random() < 0.1
+                name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(LAST_NAMES)} {tp_id}"
+                term = rng.choice(terms_by_company[cid]) if terms_by_company[cid] else None
+                tags = rng.sample(TAGS, k=min(len(TAGS), int(rng.expovariate(1.2))))
+                yield (
+                    tp_id, f"TP{tp_id:08d}", name, None,
+                    f"{rng.randrange(10**8, 10**9)}{rng.randrange(10**4, 10**5)}",
+                    f"FR{rng.randrange(10, 99)}{rng.randrange(10**8, 10**9)}",
+                    is_customer, is_supplier, rng.random() < 0.02,
+                    f"C{tp_id:08d}" if is_customer else None, term if is_customer else None,
+                    float(rng.choice([500, 1000, 5000, 10000])) if is_customer else None,
+                    f"F{tp_id:08d}" if is_supplier else None, term if is_supplier else None,
+                    f"contact@{name.split()[1].lower()}{tp_id}.example",
+                    f"+33 1 {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)} {rng.randrange(10, 99)}",
+                    None, None, None, json.dumps(tags), rng.random() > 0.03, cid,
+                )
+
+        await self.copy(conn, "third_parties", [
+            "id", "code", "name", "legal_name", "tax_id", "vat_number",
+            "is_customer", "is_supplier", "is_employee",
+            "customer_code", "customer_payment_term_id", "customer_credit_limit",
+            "supplier_code", "supplier_payment_term_id",
+            "email", "phone", "mobile", "website", "notes", "tags", "is_active", "company_id",
+        ], third_parties())
+
+        address_start = await self.next_id(conn, "addresses")
+        contact_start = await self.next_id(conn, "contacts")
+        tp_count = len(tp_owner)
+
+        def addresses():
+            aid = address_start
+            for offset in range(tp_count):
+                for n in range(1 + (rng.random() < 0.3)):
+                    city, zip_code = rng.choice(CITIES)
+                    yield (aid, tp_start + offset, "Principal" if n == 0 else "Livraison",
+                           f"{rng.randrange(1, 200)} rue {rng.choice(LAST_NAMES)}", None,
+                           city, zip_code, "France", n == 0, True)
+                    aid += 1
+
+        def contacts():
+            cid = contact_start
+            for offset in range(tp_count):
+                for n in range(int(rng.expovariate(0.8))):
+                    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                    yield (cid, tp_start + offset, first, last, None,
+                           f"{first}.{last}{cid}@example.org".lower(),
+                           None, f"+33 6 {rng.randrange(10**7, 10**8)}", n == 0, None)
+                    cid += 1
+
+        await self.copy(conn, "addresses", [
+            "id", "third_party_id", "label", "address_line1", "address_line2",
+            "city", "zip_code", "country", "is_default_billing", "is_default_shipping",
+        ], addresses())
+        await self.copy(conn, "contacts", [
+            "id", "third_party_id", "first_name", "last_name", "job_title",
+            "email", "phone", "mobile", "is_primary", "notes",
+        ], contacts())
+
+        # Audit logs: tenant and user activity follow Zipf, recent days are
+        # busier, events cluster in business hours
+        log_start = await self.next_id(conn, "audit_logs")
+        audit_split = zipf_split(args.audit_rows, len(company_ids), rng)
+        events = [e[:3] for e in AUDIT_EVENTS]
+        event_weights = [e[3] for e in AUDIT_EVENTS]
+        days = args.days
+
+        def audit_logs():
+            log_id = log_start
+            for cid, count in zip(company_ids, audit_split):
+                users = users_by_company[cid]
+                user_weights = [1 / (rank**1.2) for rank in range(1, len(users) + 1)]
+                picked_users = rng.choices(users, user_weights, k=count)
+                picked_events = rng.choices(events, event_weights, k=count)
+                for (uid, email), (module, action, entity_type) in zip(picked_users, picked_events):
+                    age = min(days - 1, int(rng.expovariate(3 / days)))
+                    moment = self.now - timedelta(
+                        days=age, hours=24 - rng.triangular(8, 20, 14), seconds=rng.randrange(3600)
+                    )
+                    pin_verified = rng.random() > 0.08 if module == "pos" else None
+                    authorized = uid if pin_verified else None
+                    yield (
+                        log_id, uid, email, action, module, entity_type,
+                        rng.randrange(1, 10**6), f"{action} {entity_type}", cid,
+                        f"10.{cid % 256}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                        authorized, email if authorized else None, pin_verified,
+                        None, None, moment,
+                    )
+                    log_id += 1
+
+        await self.copy(conn, "audit_logs", [
+            "id", "user_id", "user_email", "action", "module", "entity_type",
+            "entity_id", "description", "company_id", "ip_address",
+            "authorized_by_user_id", "authorized_by_email", "pin_verified",
+            "old_values", "new_values", "timestamp",
+        ], audit_logs())
+
+        await conn.execute("ANALYZE")
+
+
+async def prepare_schema(truncate: bool) -> None:
+    await ensure_database_exists()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if truncate:
+            tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+            await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    await seed_defaults()
+    await engine.dispose()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    await prepare_schema(args.truncate)
+    conn = await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        start = time.perf_counter()
+        async with conn.transaction():
+            await Generator(args).run(conn)
+        # The generated history lies mostly before the rollup watermark, which
+        # the worker never goes back over: recount the rolled-up days
+        async with AsyncSessionLocal() as db:
+            await rebuild_audit_rollups(db)
+            await db.commit()
+        await engine.dispose()
+        print(f"done in {time.perf_counter() - start:.1f}s")
+    finally:
+        await conn.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--users", type=int, default=500, help="total over all companies")
+    parser.add_argument("--third-parties", type=int, default=50000)
+    parser.add_argument("--payment-terms", type=int, default=len(PAYMENT_TERMS),
+                        help=f"per company, at most {len(PAYMENT_TERMS)}")
+    parser.add_argument("--audit-rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365, help="audit history depth")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty every table first (deterministic ids)")
+    return parser
+
+
+def main() -> None:
+    asyncio.run(main_async(build_parser().parse_args()))
+
+
+if __name__ == "__main__":
+    main()
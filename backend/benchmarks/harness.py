@@ -0,0 +1,113 @@
+"""In-process load harness: drives the ASGI app through httpx, like tests/conftest.py."""
+
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient, Response
+
+from app.main import app
+
+
+class Recorder:
+    """Collects latencies per route label (e.g. "GET /api/v1/users")."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.elapsed: dict[str, float] = defaultdict(float)
+
+    async def call(
+        self, label: str, request: Callable[[], Awaitable[Response]], expected: int = 200
+    ) -> Response:
+        start = time.perf_counter()
+        response = await request()
+        self.latencies[label].append(time.perf_counter() - start)
+        if response.status_code != expected:
+            self.errors[label] += 1
+        return response
+
+    def summary(self) -> dict:
+        routes = {}
+        for label, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            wall = self.elapsed.get(label) or sum(ordered)
+            routes[label] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(label, 0),
+                "throughput_rps": round(len(ordered) / wall, 2) if wall else 0.0,
+                "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            }
+        return routes
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sample."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def run_concurrently(
+    recorder: Recorder,
+    label: str,
+    total: int,
+    concurrency: int,
+    task: Callable[[int], Awaitable[object]],
+) -> None:
+    """Run `task(i)` `total` times with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> None:
+        async with semaphore:
+            await task(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(total)))
+    recorder.elapsed[label] += time.perf_counter() - start
+
+
+@asynccontextmanager
+async def open_client():
+    """Start the app (DB creation, tables, seed) and yield a bound client."""
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List the routes whose p95 or throughput regressed beyond `tolerance`."""
+    regressions = []
+    for label, current in results["routes"].items():
+        reference = baseline.get("routes", {}).get(label)
+        if reference is None:
+            continue
+        if reference["p95_ms"] and current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{label}: p95 {current['p95_ms']}ms > baseline {reference['p95_ms']}ms"
+            )
+        if current["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: {current['throughput_rps']} req/s < baseline "
+                f"{reference['throughput_rps']} req/s"
+            )
+        if current["errors"] > reference["errors"]:
+            regressions.append(f"{label}: {current['errors']} errors")
+    return regressions
+
+
+def load_json(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_json(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
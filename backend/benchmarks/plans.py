@@ -0,0 +1,274 @@
+"""Query-plan regression check for the service list queries.
+
+    POSTGRES_HOST=localhost python -m benchmarks.plans --dataset \
+        --baseline benchmarks/plans_baseline.json
+
+Each service function is called for a matrix of filter combinations; every
+SQL statement it emits is captured and re-run under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). Plans are reduced to a fingerprint
+(node types and relations) and compared with a stored baseline. The run
+fails on a new Seq Scan over a large table or on a cost blow-up.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.base import Base
+from app.services.audit import list_audit_logs
+from app.services.company import list_companies
+from app.services.role import list_roles
+from app.services.search import search
+from app.schemas.third_party import ThirdPartyLookup
+from app.services.third_party import list_third_parties, lookup_third_parties
+from app.services.user import list_users
+from benchmarks import dataset
+from benchmarks.harness import load_json, save_json
+
+ServiceCall = Callable[[AsyncSession], Awaitable[object]]
+
+
+class StatementCapture:
+    """Records the statements sent by the async engine while enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.statements: list[tuple[str, object]] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.statements.append((statement, parameters))
+
+    async def run(self, db: AsyncSession, call: ServiceCall) -> list[tuple[str, object]]:
+        self.statements = []
+        self.enabled = True
+        try:
+            await call(db)
+        finally:
+            self.enabled = False
+        return self.statements
+
+
+async def pick_values(db: AsyncSession) -> dict:
+    """Choose filter values hitting the largest tenant, the worst case."""
+
+    async def scalar(sql: str):
+        return (await db.execute(text(sql))).scalar()
+
+    return {
+        "company_id": await scalar(
+            "SELECT company_id FROM third_parties GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"
+        ) or 1,
+        "user_id": await scalar(
+            "SELECT user_id FROM audit_logs WHERE user_id IS NOT NULL "
+            "GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"
+        ) or 1,
+        "role_id": await scalar(
+            "SELECT role_id FROM users WHERE role_id IS NOT NULL "
+            "GROUP BY 1 ORDER BY count(*) DESC LIMIT 1"
+        ) or 1,
+        "since": datetime.now(timezone.utc) - timedelta(days=30),
+    }
+
+
+def build_matrix(v: dict) -> dict[str, ServiceCall]:
+    """Every (service, filter combination) whose plans are checked."""
+    cid = v["company_id"]
+    superadmin = SimpleNamespace(role=SimpleNamespace(is_superadmin=True, permissions=[]))
+    return {
+        "list_users[]": lambda db: list_users(db),
+        "list_users[company]": lambda db: list_users(db, company_id=cid),
+        "list_users[search]": lambda db: list_users(db, search="mar"),
+        "list_users[company,search]": lambda db: list_users(db, company_id=cid, search="mar"),
+        "list_users[role,active]": lambda db: list_users(db, role_id=v["role_id"], is_active=True),
+        "list_third_parties[company]": lambda db: list_third_parties(db, cid),
+        "list_third_parties[customer]": lambda db: list_third_parties(db, cid, is_customer=True),
+        "list_third_parties[supplier]": lambda db: list_third_parties(db, cid, is_supplier=True),
+        "list_third_parties[search]": lambda db: list_third_parties(db, cid, search="dur"),
+        "list_third_parties[customer,search]": lambda db: list_third_parties(
+            db, cid, is_customer=True, search="dur"
+        ),
+        "list_third_parties[page=50]": lambda db: list_third_parties(db, cid, page=50),
+        "list_third_parties[tags=any]": lambda db: list_third_parties(
+            db, cid, tags=["vip", "export"]
+        ),
+        "list_third_parties[tags=all,facets]": lambda db: list_third_parties(
+            db, cid, tags=["vip", "export"], tag_mode="all", facets=True
+        ),
+        "lookup_third_parties[all keys]": lambda db: lookup_third_parties(
+            db,
+            ThirdPartyLookup(
+                company_id=cid,
+                phones=["06 12 34 56 78", "+33 1 45 45 45 45"],
+                emails=["Contact@Example.com"],
+                tax_ids=["FR 12 345678901"],
+                customer_codes=["CLI-00001"],
+            ),
+        ),
+        "list_audit_logs[]": lambda db: list_audit_logs(db),
+        "list_audit_logs[company]": lambda db: list_audit_logs(db, company_id=cid),
+        "list_audit_logs[company,module]": lambda db: list_audit_logs(
+            db, company_id=cid, module="pos"
+        ),
+        "list_audit_logs[user]": lambda db: list_audit_logs(db, user_id=v["user_id"]),
+        "list_audit_logs[module,action]": lambda db: list_audit_logs(
+            db, module="pos", action="pos.refund"
+        ),
+        "list_audit_logs[date]": lambda db: list_audit_logs(db, date_from=v["since"]),
+        "list_roles[]": lambda db: list_roles(db),
+        "list_roles[company]": lambda db: list_roles(db, company_id=cid),
+        "list_companies[search]": lambda db: list_companies(db, search="bio"),
+        "search[company,prefix]": lambda db: search(db, superadmin, "dur", cid),
+        "search[company,words]": lambda db: search(db, superadmin, "jean dup", cid),
+        "search[all companies,substring]": lambda db: search(db, superadmin, "@c1.example", None),
+    }
+
+
+def fingerprint(node: dict) -> str:
+    """Plan shape: node types and relations, without costs or row counts."""
+    label = node["Node Type"]
+    if "Relation Name" in node:
+        label += f"({node['Relation Name']})"
+    if "Index Name" in node:
+        label += f"[{node['Index Name']}]"
+    children = node.get("Plans", [])
+    if children:
+        label += "{" + ",".join(fingerprint(child) for child in children) + "}"
+    return label
+
+
+def seq_scans(node: dict) -> set[str]:
+    found = set()
+    if node["Node Type"] == "Seq Scan":
+        found.add(node["Relation Name"])
+    for child in node.get("Plans", []):
+        found |= seq_scans(child)
+    return found
+
+
+async def explain(db: AsyncSession, statement: str, parameters) -> dict:
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+    )
+    raw = result.scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+
+async def collect(capture: StatementCapture) -> dict:
+    results = {}
+    async with AsyncSessionLocal() as db:
+        tables = [t.name for t in Base.metadata.sorted_tables]
+        rows = await db.execute(
+            text("SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(:names)"),
+            {"names": tables},
+        )
+        table_rows = dict(rows.all())
+        values = await pick_values(db)
+        for name, call in build_matrix(values).items():
+            statements = await capture.run(db, call)
+            for n, (statement, parameters) in enumerate(statements):
+                plan = await explain(db, statement, parameters)
+                root = plan["Plan"]
+                results[f"{name}#{n}"] = {
+                    "sql": statement,
+                    "fingerprint": fingerprint(root),
+                    "seq_scans": sorted(seq_scans(root)),
+                    "total_cost": root["Total Cost"],
+                    "execution_ms": plan["Execution Time"],
+                    "shared_buffers": root.get("Shared Hit Blocks", 0)
+                    + root.get("Shared Read Blocks", 0),
+                }
+        await db.rollback()
+    return {"table_rows": table_rows, "queries": results}
+
+
+def compare(current: dict, baseline: dict, large_table: int, cost_factor: float) -> tuple[list, list]:
+    """Return (regressions, notes) of the current run against the baseline."""
+    regressions, notes = [], []
+    table_rows = current["table_rows"]
+    for name, plan in current["queries"].items():
+        reference = baseline.get("queries", {}).get(name)
+        if reference is None:
+            notes.append(f"{name}: new query, no baseline")
+            continue
+        for table in set(plan["seq_scans"]) - set(reference["seq_scans"]):
+            if table_rows.get(table, 0) >= large_table:
+                regressions.append(
+                    f"{name}: new Seq Scan on {table} ({table_rows[table]} rows)"
+                )
+        if plan["total_cost"] > max(reference["total_cost"], 1.0) * cost_factor:
+            regressions.append(
+                f"{name}: cost {plan['total_cost']:.0f} > {cost_factor}x baseline "
+                f"{reference['total_cost']:.0f}"
+            )
+        if plan["fingerprint"] != reference["fingerprint"]:
+            notes.append(f"{name}: plan changed\n  was {reference['fingerprint']}\n"
+                         f"  now {plan['fingerprint']}")
+    return regressions, notes
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    if args.dataset:
+        await dataset.main_async(dataset.build_parser().parse_args(
+            ["--truncate", "--seed", str(args.seed),
+             "--companies", str(args.companies),
+             "--third-parties", str(args.third_parties),
+             "--audit-rows", str(args.audit_rows)]
+        ))
+    capture = StatementCapture()
+    try:
+        return await collect(capture)
+    finally:
+        await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", action="store_true",
+                        help="load a fresh synthetic dataset first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--third-parties", type=int, default=200000)
+    parser.add_argument("--audit-rows", type=int, default=2000000)
+    parser.add_argument("--output", type=Path, default=Path("plan_results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--large-table", type=int, default=10000,
+                        help="row count from which a new Seq Scan fails the run")
+    parser.add_argument("--cost-factor", type=float, default=2.0)
+    args = parser.parse_args()
+
+    current = asyncio.run(main_async(args))
+    save_json(args.output, current)
+    for name, plan in current["queries"].items():
+        print(f"{name:45} cost={plan['total_cost']:>12.1f} "
+              f"time={plan['execution_ms']:>9.3f}ms  {plan['fingerprint']}")
+
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        save_json(args.baseline, current)
+        return 0
+    regressions, notes = compare(
+        current, load_json(args.baseline), args.large_table, args.cost_factor
+    )
+    for line in notes:
+        print(f"NOTE {line}")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
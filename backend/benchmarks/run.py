@@ -0,0 +1,76 @@
+"""Benchmark the API in-process against the configured (local) Postgres.
+
+    POSTGRES_HOST=localhost DEBUG=true python -m benchmarks.run --output bench.json \
+        --baseline benchmarks/baseline.json
+
+The app's startup refuses the placeholder PIN_LOOKUP_KEY, so set DEBUG=true
+(as above) or a real PIN_LOOKUP_KEY. Exits with status 1 when a route
+regresses beyond --tolerance.
+"""
+
+import argparse
+import asyncio
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.harness import Recorder, compare, load_json, open_client, save_json
+from benchmarks.scenarios import SCENARIOS, setup
+
+
+async def run(args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    async with open_client() as client:
+        ctx = await setup(client)
+        for name in args.scenarios:
+            await SCENARIOS[name](client, ctx, recorder, args.requests, args.concurrency)
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "routes": recorder.summary(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, help="results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="also write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before failing")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    save_json(args.output, results)
+
+    print(f"{'route':32} {'req':>6} {'err':>4} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for label, r in results["routes"].items():
+        print(
+            f"{label:32} {r['requests']:>6} {r['errors']:>4} {r['throughput_rps']:>9}"
+            f" {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}"
+        )
+
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        save_json(args.baseline, results)
+        return 0
+    regressions = compare(results, load_json(args.baseline), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Realistic request mixes replayed by the benchmark runner."""
+
+import uuid
+from dataclasses import dataclass, field
+
+from httpx import AsyncClient
+
+from app.core.config import settings
+from benchmarks.harness import run_concurrently
+
+API = "/api/v1"
+BENCH_PASSWORD = "bench-password"
+BENCH_PIN = "4821"
+
+
+@dataclass
+class Context:
+    """Fixture data shared by the scenarios of one run."""
+
+    admin_headers: dict
+    company_id: int
+    cashier_email: str
+    cashier_headers: dict
+    tag: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+
+
+async def _login(client: AsyncClient, email: str, password: str) -> dict:
+    response = await client.post(
+        f"{API}/auth/login", json={"email": email, "password": password}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def setup(client: AsyncClient) -> Context:
+    """Create a bench company, a cashier with a PIN and a few partners."""
+    admin_headers = await _login(
+        client, settings.FIRST_SUPERADMIN_EMAIL, settings.FIRST_SUPERADMIN_PASSWORD
+    )
+    tag = uuid.uuid4().hex[:8]
+    response = await client.post(
+        f"{API}/companies", json={"name": f"Bench {tag}"}, headers=admin_headers
+    )
+    response.raise_for_status()
+    company_id = response.json()["id"]
+
+    cashier_email = f"cashier-{tag}@bench.local"
+    response = await client.post(
+        f"{API}/users",
+        json={
+            "email": cashier_email,
+            "password": BENCH_PASSWORD,
+            "first_name": "Bench",
+            "last_name": "Cashier",
+            "pin": BENCH_PIN,
+            "company_id": company_id,
+        },
+        headers=admin_headers,
+    )
+    response.raise_for_status()
+    cashier_headers = await _login(client, cashier_email, BENCH_PASSWORD)
+    return Context(admin_headers, company_id, cashier_email, cashier_headers, tag)
+
+
+def _third_party_payload(ctx: Context, i: int) -> dict:
+    return {
+        "code": f"B{ctx.tag}-{i:06d}",
+        "name": f"Client {i:06d}",
+        "is_customer": True,
+        "email": f"client{i}@bench.local",
+        "company_id": ctx.company_id,
+        "addresses": [
+            {"label": "Facturation", "address_line1": f"{i} rue du Test", "city": "Paris",
+             "is_default_billing": True},
+            {"label": "Livraison", "address_line1": f"{i} quai du Port", "city": "Lyon",
+             "is_default_shipping": True},
+        ],
+        "contacts": [
+            {"first_name": "Alice", "last_name": f"Contact{i}", "is_primary": True},
+        ],
+    }
+
+
+async def create_third_parties(client, ctx, recorder, total, concurrency):
+    label = "POST /third-parties"
+
+    async def task(i):
+        await recorder.call(
+            label,
+            lambda: client.post(
+                f"{API}/third-parties",
+                json=_third_party_payload(ctx, i),
+                headers=ctx.admin_headers,
+            ),
+            expected=201,
+        )
+
+    await run_concurrently(recorder, label, total, concurrency, task)
+
+
+async def login_storm(client, ctx, recorder, total, concurrency):
+    label = "POST /auth/login"
+
+    async def task(i):
+        await recorder.call(
+            label,
+            lambda: client.post(
+                f"{API}/auth/login",
+                json={"email": ctx.cashier_email, "password": BENCH_PASSWORD},
+            ),
+        )
+
+    await run_concurrently(recorder, label, total, concurrency, task)
+
+
+async def me_polling(client, ctx, recorder, total, concurrency):
+    label = "GET /auth/me"
+
+    async def task(i):
+        await recorder.call(
+            label, lambda: client.get(f"{API}/auth/me", headers=ctx.cashier_headers)
+        )
+
+    await run_concurrently(recorder, label, total, concurrency, task)
+
+
+async def paginated_listings(client, ctx, recorder, total, concurrency):
+    routes = [
+        ("GET /users?search", f"{API}/users", {"search": "bench"}),
+        ("GET /third-parties?search", f"{API}/third-parties",
+         {"company_id": ctx.company_id, "search": "Client 0"}),
+        ("GET /audit-logs", f"{API}/audit-logs", {"module": "admin"}),
+    ]
+    for label, url, params in routes:
+
+        async def task(i, url=url, params=params, label=label):
+            await recorder.call(
+                label,
+                lambda: client.get(
+                    url, params={**params, "page": i % 5 + 1}, headers=ctx.admin_headers
+                ),
+            )
+
+        await run_concurrently(recorder, label, total, concurrency, task)
+
+
+async def pin_verifications(client, ctx, recorder, total, concurrency):
+    label = "POST /auth/verify-pin"
+
+    async def task(i):
+        await recorder.call(
+            label,
+            lambda: client.post(
+                f"{API}/auth/verify-pin",
+                json={"pin": BENCH_PIN, "action": "pos.refund"},
+                headers=ctx.cashier_headers,
+            ),
+        )
+
+    await run_concurrently(recorder, label, total, concurrency, task)
+
+
+# Order matters: partners are created before they are listed
+SCENARIOS = {
+    "create_third_parties": create_third_parties,
+    "login_storm": login_storm,
+    "me_polling": me_polling,
+    "paginated_listings": paginated_listings,
+    "pin_verifications": pin_verifications,
+}
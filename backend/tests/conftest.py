@@ -1,11 +1,87 @@
+import os
+import uuid
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
-from app.main import app
+# Placeholder secrets are fine here
+os.environ.setdefault("DEBUG", "true")
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.security import create_access_token, hash_password, hash_pin, pin_lookup_digest  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.company import Company  # noqa: E402
+from app.models.role import Role  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
 
 
 @pytest.fixture
-async def client():
+async def started():
+    """Run the app lifespan (schema, seed data) against the configured database."""
+    lifespan = app.router.lifespan_context(app)
+    try:
+        await lifespan.__aenter__()
+    except OSError as exc:
+        pytest.skip(f"Database not reachable: {exc}")
+    yield
+    await lifespan.__aexit__(None, None, None)
+
+
+@pytest.fixture
+async def client(started):
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture
+async def db(started):
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def company(db):
+    company = Company(name=f"Test {uuid.uuid4().hex[:8]}", currency="EUR", country="France")
+    db.add(company)
+    await db.commit()
+    return company
+
+
+@pytest.fixture
+def make_user(db, company):
+    """Create a user of `company` with a role of its own."""
+
+    async def make(permissions: list[str] | None = None, pin: str | None = None, **role) -> User:
+        suffix = uuid.uuid4().hex[:8]
+        user_role = Role(
+            name=f"role_{suffix}",
+            label=f"Role {suffix}",
+            company_id=company.id,
+            permissions=permissions or [],
+            **role,
+        )
+        user = User(
+            email=f"user_{suffix}@example.com",
+            hashed_password=hash_password("secret"),
+            first_name="Test",
+            last_name=suffix,
+            company_id=company.id,
+            role=user_role,
+            hashed_pin=hash_pin(pin) if pin else None,
+            pin_lookup=pin_lookup_digest(pin) if pin else None,
+        )
+        db.add(user)
+        await db.commit()
+        return user
+
+    return make
+
+
+def auth_headers(user: User) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
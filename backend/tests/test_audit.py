@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup
+from app.services.audit_rollup import last_closed_day, rebuild_audit_rollups, roll_up_closed_days
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+def _entry(company_id: int, timestamp: datetime, action: str = "update", **values) -> AuditLog:
+    return AuditLog(
+        user_email="someone@example.com",
+        action=action,
+        module="third_party",
+        company_id=company_id,
+        timestamp=timestamp,
+        **values,
+    )
+
+
+async def test_analytics_adds_live_days_to_the_rollups(client, db, company, make_user):
+    headers = auth_headers(await make_user(["admin.view"]))
+    now = datetime.now(timezone.utc)
+    closed = now - timedelta(days=3)
+    db.add_all([
+        _entry(company.id, closed),
+        _entry(company.id, closed, action="pin_override", pin_verified=False),
+        _entry(company.id, now),
+    ])
+    await db.commit()
+    await rebuild_audit_rollups(db)
+    await db.commit()
+
+    rolled = await db.scalar(
+        select(func.sum(AuditRollup.event_count)).where(AuditRollup.company_id == company.id)
+    )
+    assert rolled == 2
+
+    response = await client.get(
+        f"/api/v1/audit-logs/analytics?company_id={company.id}&group_by=action", headers=headers
+    )
+    assert response.status_code == 200
+    items = {(item["bucket"], item["key"]): item for item in response.json()["items"]}
+    assert items[(closed.date().isoformat(), "update")]["events"] == 1
+    assert items[(closed.date().isoformat(), "pin_override")]["pin_failures"] == 1
+    assert items[(now.date().isoformat(), "update")]["events"] == 1
+
+
+async def test_rolled_up_days_are_not_counted_again(db, company):
+    await roll_up_closed_days()
+    # Arrives after its day was folded: only a rebuild recounts it
+    db.add(_entry(company.id, datetime.combine(last_closed_day(), datetime.min.time(), timezone.utc)))
+    await db.commit()
+
+    assert await roll_up_closed_days() == 0
+    count = select(func.count()).select_from(AuditRollup).where(AuditRollup.company_id == company.id)
+    assert await db.scalar(count) == 0
+    await rebuild_audit_rollups(db, last_closed_day())
+    await db.commit()
+    assert await db.scalar(count) == 1
+
+
+@pytest.mark.parametrize("query", ["bucket=year", "group_by=email"])
+async def test_analytics_refuses_unknown_bucket_or_group(client, company, make_user, query):
+    headers = auth_headers(await make_user(["admin.view"]))
+    response = await client.get(f"/api/v1/audit-logs/analytics?{query}", headers=headers)
+    assert response.status_code == 422
+
+
+async def test_images_replay_create_and_updates(client, company, make_user):
+    headers = auth_headers(await make_user(["admin.view", "admin.create", "admin.edit"]))
+    role = (
+        await client.post(
+            "/api/v1/roles",
+            json={"name": f"clerk_{company.id}", "label": "Clerk", "permissions": ["admin.view"]},
+            headers=headers,
+        )
+    ).json()
+    await client.patch(f"/api/v1/roles/{role['id']}", json={"label": "Senior clerk"}, headers=headers)
+    await client.patch(f"/api/v1/roles/{role['id']}", json={"permissions": []}, headers=headers)
+
+    logs = await client.get(
+        f"/api/v1/audit-logs?company_id={company.id}&action=update", headers=headers
+    )
+    last = logs.json()["items"][0]
+    images = (await client.get(f"/api/v1/audit-logs/{last['id']}/images", headers=headers)).json()
+    assert images["complete"] is True
+    assert images["before"]["label"] == "Senior clerk"
+    assert images["before"]["permissions"] == ["admin.view"]
+    assert images["after"]["permissions"] == []
+    assert images["after"]["name"] == f"clerk_{company.id}"
@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.utils.audit_delta import compute_delta, decode_value, encode_value, expand
+
+PARIS = timezone(timedelta(hours=2))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        12,
+        "text",
+        Decimal("12.5"),
+        date(2026, 1, 31),
+        datetime(2026, 1, 31, 10, 0),
+        datetime(2026, 1, 31, 10, 0, tzinfo=timezone.utc),
+        {"nested": [date(2026, 1, 1), Decimal("1")]},
+    ],
+)
+def test_values_round_trip(value):
+    assert decode_value(encode_value(value)) == value
+
+
+def test_aware_datetime_is_stored_in_utc():
+    encoded = encode_value(datetime(2026, 1, 31, 12, 0, tzinfo=PARIS))
+    assert encoded == {"$dt": "2026-01-31T10:00:00+00:00"}
+    assert decode_value(encoded).tzinfo == timezone.utc
+
+
+def test_equal_values_give_no_delta():
+    assert compute_delta({"limit": Decimal("12.50")}, {"limit": Decimal("12.5")}) == {}
+    at = datetime(2026, 1, 31, 12, 0, tzinfo=PARIS)
+    assert compute_delta({"at": at}, {"at": at.astimezone(timezone.utc)}) == {}
+
+
+def test_decimal_and_float_of_the_same_amount_give_no_delta():
+    assert compute_delta({"limit": Decimal("12.50")}, {"limit": 12.5}) == {}
+
+
+def test_date_and_datetime_differ():
+    delta = compute_delta({"due": date(2026, 1, 31)}, {"due": datetime(2026, 1, 31)})
+    assert delta == {"due": [{"$d": "2026-01-31"}, {"$dt": "2026-01-31T00:00:00"}]}
+
+
+def test_delta_keeps_only_changed_fields():
+    delta = compute_delta({"name": "A", "city": "Paris"}, {"name": "B", "city": "Paris", "zip": "75001"})
+    assert delta == {"name": ["A", "B"], "zip": [None, "75001"]}
+    assert expand(delta, None, None) == ({"name": "A", "zip": None}, {"name": "B", "zip": "75001"})
+
+
+def test_legacy_untagged_rows_decode_to_themselves():
+    old = {"name": "A", "created": "2026-01-31T10:00:00", "amount": 12.5}
+    assert expand(None, old, {"name": "B"}) == (old, {"name": "B"})
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.audit_log import AuditLog
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pin_override_by_a_supervisor(client, make_user):
+    cashier = await make_user(["pos.view"])
+    supervisor = await make_user(["pos.view", "pos.refund"], pin="4821")
+
+    response = await client.post(
+        "/api/v1/auth/pin-override",
+        json={"pin": "4821", "action": "pos.refund"},
+        headers=auth_headers(cashier),
+    )
+    assert response.status_code == 200
+    assert response.json()["authorized_by_user_id"] == supervisor.id
+
+
+async def test_pin_override_of_oneself_is_refused(client, make_user):
+    supervisor = await make_user(["pos.view", "pos.refund"], pin="5930")
+
+    response = await client.post(
+        "/api/v1/auth/pin-override",
+        json={"pin": "5930", "action": "pos.refund"},
+        headers=auth_headers(supervisor),
+    )
+    assert response.status_code == 403
+
+
+async def test_shared_pin_fails_like_a_wrong_pin_and_is_audited(client, db, make_user):
+    cashier = await make_user(["pos.view"])
+    await make_user(["pos.refund"], pin="7391")
+    await make_user(["pos.refund"], pin="7391")
+
+    response = await client.post(
+        "/api/v1/auth/pin-override",
+        json={"pin": "7391", "action": "pos.refund"},
+        headers=auth_headers(cashier),
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Invalid PIN"
+
+    logged = await db.scalar(
+        select(AuditLog.pin_verified).where(
+            AuditLog.user_id == cashier.id, AuditLog.action == "pos.refund"
+        )
+    )
+    assert logged is False
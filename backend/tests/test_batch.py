@@ -0,0 +1,49 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "path", ["/batch", "/batch/", "/./batch", "/roles/../batch", "/%62atch", "/events/stream"]
+)
+async def test_batch_and_streams_cannot_be_batched(client, make_user, path):
+    headers = auth_headers(await make_user())
+    response = await client.post(
+        "/api/v1/batch", json={"requests": [{"path": path, "method": "POST"}]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == 400
+
+
+async def test_later_items_see_the_callers_new_permissions(client, make_user):
+    user = await make_user(["admin.view", "admin.edit"])
+    role = f"/roles/{user.role_id}"
+    response = await client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"path": role},
+                {"path": role, "method": "PATCH", "body": {"permissions": ["admin.edit"]}},
+                {"path": role},
+            ]
+        },
+        headers=auth_headers(user),
+    )
+    assert [item["status"] for item in response.json()] == [200, 200, 403]
+
+
+async def test_later_items_of_a_deactivated_caller_are_refused(client, make_user):
+    user = await make_user(["admin.view", "admin.edit"])
+    response = await client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"path": f"/users/{user.id}", "method": "PATCH", "body": {"is_active": False}},
+                {"path": f"/users/{user.id}"},
+            ]
+        },
+        headers=auth_headers(user),
+    )
+    assert [item["status"] for item in response.json()] == [200, 401]
@@ -0,0 +1,52 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["third_party.view", "third_party.create", "third_party.edit", "admin.view"]
+
+
+@pytest.mark.parametrize("patch", [{"is_active": None}, {"tags": None}])
+async def test_bulk_patch_refuses_null_for_required_fields(client, company, make_user, patch):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    response = await client.post(
+        "/api/v1/third-parties/bulk-update",
+        json={"company_id": company.id, "ids": [1], "patch": patch},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+async def test_audit_images_replay_bulk_updates(client, company, make_user):
+    headers = auth_headers(await make_user(["admin.view", "admin.create", "admin.edit"]))
+    user = (
+        await client.post(
+            "/api/v1/users",
+            json={
+                "email": f"bulk_{company.id}@example.com",
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+                "password": "secret-password",
+                "company_id": company.id,
+            },
+            headers=headers,
+        )
+    ).json()
+    response = await client.post(
+        "/api/v1/users/bulk-update",
+        json={"company_id": company.id, "ids": [user["id"]], "patch": {"is_active": False}},
+        headers=headers,
+    )
+    assert response.json()["updated"] == 1
+    await client.patch(f"/api/v1/users/{user['id']}", json={"first_name": "Augusta"}, headers=headers)
+
+    logs = await client.get(
+        f"/api/v1/audit-logs?company_id={company.id}&action=update", headers=headers
+    )
+    log = logs.json()["items"][0]
+    images = (await client.get(f"/api/v1/audit-logs/{log['id']}/images", headers=headers)).json()
+    assert images["complete"] is True
+    assert images["before"]["is_active"] is False
+    assert images["before"]["first_name"] == "Ada"
+    assert images["after"]["first_name"] == "Augusta"
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.database import connect_raw
+from app.core.dependencies import authenticate_token
+from app.core.security import create_access_token
+from app.models.audit_log import AuditLog
+from app.services.notifications import CHANNEL
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_stream_ticket_identifies_the_user(client, db, make_user):
+    user = await make_user(["admin.view"])
+    response = await client.post("/api/v1/events/ticket", headers=auth_headers(user))
+    assert response.status_code == 200
+    ticket = response.json()["ticket"]
+
+    assert (await authenticate_token(db, ticket, token_type="stream")).id == user.id
+
+
+async def test_stream_ticket_is_not_an_access_token(client, make_user):
+    user = await make_user(["admin.view"])
+    ticket = (await client.post("/api/v1/events/ticket", headers=auth_headers(user))).json()["ticket"]
+
+    response = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {ticket}"})
+    assert response.status_code == 401
+
+
+async def test_stream_refuses_access_tokens_in_the_url(client, make_user):
+    token = create_access_token({"sub": str((await make_user(["admin.view"])).id)})
+
+    response = await client.get(f"/api/v1/events/stream?access_token={token}")
+    assert response.status_code == 401
+    response = await client.get(f"/api/v1/events/stream?ticket={token}")
+    assert response.status_code == 401
+
+
+async def test_audit_entries_send_one_event_per_transaction(db, company):
+    received = []
+    listener = await connect_raw()
+    await listener.add_listener(CHANNEL, lambda *args: received.append(json.loads(args[-1])))
+    try:
+        for _ in range(2):
+            db.add(AuditLog(user_email="a@example.com", action="update", module="admin", company_id=company.id))
+            await db.flush()
+        await db.commit()
+        await asyncio.sleep(0.2)
+    finally:
+        await listener.close()
+
+    audit_events = [e for e in received if e["entity_type"] == "audit_log"]
+    assert audit_events == [
+        {"entity_type": "audit_log", "id": None, "action": "create", "company_id": company.id}
+    ]
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+
+from app.models.third_party import ThirdParty
+from app.services import idempotency
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_retry_replays_the_first_response(client, db, company, make_user):
+    headers = {
+        **auth_headers(await make_user(["third_party.create"])),
+        "Idempotency-Key": uuid.uuid4().hex,
+    }
+    body = {"name": "Once", "company_id": company.id}
+    first = await client.post("/api/v1/third-parties", json=body, headers=headers)
+    retry = await client.post("/api/v1/third-parties", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    count = await db.scalar(
+        select(func.count()).select_from(ThirdParty).where(ThirdParty.company_id == company.id)
+    )
+    assert count == 1
+
+
+async def test_key_reused_for_another_request_is_refused(client, company, make_user):
+    headers = {
+        **auth_headers(await make_user(["third_party.create"])),
+        "Idempotency-Key": uuid.uuid4().hex,
+    }
+    body = {"name": "Once", "company_id": company.id}
+    assert (await client.post("/api/v1/third-parties", json=body, headers=headers)).status_code == 201
+    response = await client.post(
+        "/api/v1/third-parties", json={**body, "name": "Twice"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+async def test_response_survives_redis_failing_after_the_claim(started, monkeypatch):
+    async def redis_down(*args):
+        raise RedisError("down")
+
+    monkeypatch.setattr(idempotency, "_redis_complete", redis_down)
+    key = uuid.uuid4().hex
+    record = {"fingerprint": "f", "status": 201, "headers": [], "body": b"\xff\x00binary"}
+
+    # Claimed in Redis, completed while it is down: kept in Postgres, bytes intact
+    await idempotency._finish(key, True, record)
+    assert await idempotency._pg_get(key) == record
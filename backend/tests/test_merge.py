@@ -0,0 +1,87 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["third_party.view", "third_party.create", "third_party.edit", "admin.view"]
+
+
+async def _create(client, headers, **body) -> dict:
+    response = await client.post("/api/v1/third-parties", json=body, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_merge_moves_children_and_fills_the_target(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    target = await _create(client, headers, name="Acme", company_id=company.id)
+    source = await _create(
+        client, headers, name="ACME SA", company_id=company.id,
+        email="info@acme.test", is_supplier=True, tags=["import"],
+    )
+    await client.post(
+        f"/api/v1/third-parties/{source['id']}/contacts",
+        json={"first_name": "Ada", "last_name": "Lovelace"},
+        headers=headers,
+    )
+    await client.post(
+        f"/api/v1/third-parties/{source['id']}/addresses",
+        json={"address_line1": "1 rue de la Paix", "city": "Paris"},
+        headers=headers,
+    )
+
+    response = await client.post(
+        "/api/v1/third-parties/merge",
+        json={
+            "company_id": company.id,
+            "merges": [{"target_id": target["id"], "source_ids": [source["id"]]}],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"merged": 1, "target_ids": [target["id"]]}
+
+    merged = (await client.get(f"/api/v1/third-parties/{target['id']}", headers=headers)).json()
+    assert merged["email"] == "info@acme.test"
+    assert merged["is_supplier"] is True
+    assert merged["tags"] == ["import"]
+    assert [c["last_name"] for c in merged["contacts"]] == ["Lovelace"]
+    assert [a["city"] for a in merged["addresses"]] == ["Paris"]
+    gone = await client.get(f"/api/v1/third-parties/{source['id']}", headers=headers)
+    assert gone.status_code == 404
+
+    logs = await client.get(
+        f"/api/v1/audit-logs?company_id={company.id}&action=merge", headers=headers
+    )
+    log = logs.json()["items"][0]
+    assert f"#{source['id']} 'ACME SA'" in log["description"]
+    images = (await client.get(f"/api/v1/audit-logs/{log['id']}/images", headers=headers)).json()
+    assert images["before"]["email"] is None
+    assert images["after"]["email"] == "info@acme.test"
+    assert "sources" not in images["after"]
+
+
+async def test_merge_refuses_a_partner_merged_into_itself(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    tp = await _create(client, headers, name="Acme", company_id=company.id)
+    response = await client.post(
+        "/api/v1/third-parties/merge",
+        json={"company_id": company.id, "merges": [{"target_id": tp["id"], "source_ids": [tp["id"]]}]},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+async def test_merge_ignores_partners_of_another_company(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    target = await _create(client, headers, name="Acme", company_id=company.id)
+    response = await client.post(
+        "/api/v1/third-parties/merge",
+        json={
+            "company_id": company.id,
+            "merges": [{"target_id": target["id"], "source_ids": [target["id"] + 100000]}],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 404
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import text
+
+from app.utils.normalize import (
+    e164_sql,
+    email_sql,
+    normalize_email,
+    normalize_tax_id,
+    tax_id_sql,
+    to_e164,
+)
+from tests.conftest import auth_headers
+
+PHONES = [
+    ("+33 6 12 34 56 78", "+33612345678"),
+    ("0033 6 12 34 56 78", "+33612345678"),
+    ("06.12.34.56.78", "+33612345678"),
+    ("6 12 34 56 78", "+33612345678"),
+    (" +44 20 7946 0958", "+442079460958"),
+    ("+1 234", None),  # under 8 digits
+    ("+1234567890123456", None),  # over 15 digits
+    ("0612", None),
+    ("", None),
+    (None, None),
+]
+TAX_IDS = [
+    ("FR 12 345.678-901", "FR12345678901"),
+    ("fr12345678901", "FR12345678901"),
+    (" -. ", None),
+    (None, None),
+]
+EMAILS = [
+    (" Info@Acme.TEST ", "info@acme.test"),
+    ("   ", None),
+    (None, None),
+]
+
+
+@pytest.mark.parametrize(("value", "expected"), PHONES)
+def test_to_e164(value, expected):
+    assert to_e164(value, "33") == expected
+
+
+@pytest.mark.parametrize(("value", "expected"), TAX_IDS)
+def test_normalize_tax_id(value, expected):
+    assert normalize_tax_id(value) == expected
+
+
+@pytest.mark.parametrize(("value", "expected"), EMAILS)
+def test_normalize_email(value, expected):
+    assert normalize_email(value) == expected
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("sql", "cases"),
+    [
+        (e164_sql(":value", "33"), PHONES),
+        (tax_id_sql(":value"), TAX_IDS),
+        (email_sql(":value"), EMAILS),
+    ],
+)
+async def test_sql_twins_agree(db, sql, cases):
+    statement = text(f"SELECT {sql.replace(':value', 'CAST(:value AS text)')}")
+    for value, expected in cases:
+        assert (await db.execute(statement, {"value": value})).scalar() == expected, value
+
+
+@pytest.mark.anyio
+async def test_lookup_finds_a_partner_by_its_contacts_phone(client, company, make_user):
+    headers = auth_headers(await make_user(["third_party.view", "third_party.create", "third_party.edit"]))
+    tp = (
+        await client.post(
+            "/api/v1/third-parties", json={"name": "Acme", "company_id": company.id}, headers=headers
+        )
+    ).json()
+    contact = (
+        await client.post(
+            f"/api/v1/third-parties/{tp['id']}/contacts",
+            json={"first_name": "Ada", "last_name": "Lovelace", "mobile": "06 12 34 56 78"},
+            headers=headers,
+        )
+    ).json()
+
+    response = await client.post(
+        "/api/v1/third-parties/lookup",
+        json={"company_id": company.id, "phones": ["+33 6 12 34 56 78"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [p["id"] for p in result["third_parties"]] == [tp["id"]]
+    assert result["matches"] == [
+        {
+            "type": "phone",
+            "key": "+33 6 12 34 56 78",
+            "third_party_id": tp["id"],
+            "contact_id": contact["id"],
+        }
+    ]
@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.payment_term import ScheduleBatchRequest
+from app.utils.payment_schedule import ParsedLine, parse_term, schedule, schedule_batch, split_cents
+
+THIRDS = parse_term(
+    1,
+    [
+        {"percentage": 33.33, "days": 30},
+        {"percentage": 33.33, "days": 60},
+        {"percentage": 33.34, "days": 90},
+    ],
+)
+HALVES_EOM = parse_term(2, [{"percentage": 50}, {"percentage": 50, "days": 45, "type": "end_of_month"}])
+
+
+@pytest.mark.parametrize("amount", [100.0, 0.01, 0.02, 1234.57, 999999.99])
+def test_installments_add_up_to_the_amount(amount):
+    parts = [line["amount"] for line in schedule(THIRDS, date(2026, 1, 15), amount)]
+    assert round(sum(parts) * 100) == round(amount * 100)
+
+
+def test_uneven_percentages_split_by_basis_points():
+    lines = [ParsedLine(1000, 0, "net"), ParsedLine(2500, 0, "net"), ParsedLine(6500, 0, "net")]
+    assert split_cents(10001, lines) == [1000, 2500, 6501]
+
+
+def test_term_without_lines_is_due_at_once():
+    assert schedule(parse_term(3, None), date(2026, 3, 1), 50.0) == [
+        {"due_date": date(2026, 3, 1), "amount": 50.0, "percentage": 100.0, "type": "immediate"}
+    ]
+
+
+@pytest.mark.parametrize(
+    ("invoice_date", "due"),
+    [
+        (date(2025, 12, 1), date(2026, 1, 31)),  # across the year
+        (date(2025, 11, 20), date(2026, 1, 31)),
+        (date(2026, 1, 10), date(2026, 2, 28)),  # short month
+        (date(2028, 1, 10), date(2028, 2, 29)),  # leap year
+    ],
+)
+def test_end_of_month(invoice_date, due):
+    assert schedule(HALVES_EOM, invoice_date, 10.0)[1]["due_date"] == due
+
+
+def test_batch_matches_schedule_of_each_invoice():
+    terms = {THIRDS.id: THIRDS, HALVES_EOM.id: HALVES_EOM}
+    invoices = [
+        (1, date(2026, 1, 15), 100.0),
+        (2, date(2025, 12, 1), 33.33),
+        (1, date(2026, 1, 15), 0.05),  # repeated (term, date)
+        (2, date(2025, 12, 1), 10.0),
+    ]
+    result = schedule_batch(terms, *zip(*invoices))
+
+    expected = [
+        (i, line["due_date"], line["amount"])
+        for i, (term_id, invoice_date, amount) in enumerate(invoices)
+        for line in schedule(terms[term_id], invoice_date, amount)
+    ]
+    assert list(zip(result["invoice_index"], result["due_dates"], result["amounts"])) == expected
+
+
+def test_batch_request_is_bounded():
+    n = settings.SCHEDULE_BATCH_MAX_INVOICES + 1
+    with pytest.raises(ValidationError):
+        ScheduleBatchRequest(
+            company_id=1, term_ids=[1] * n, invoice_dates=[date(2026, 1, 1)] * n, amounts=[1.0] * n
+        )
@@ -0,0 +1,16 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_role_with_users_is_kept_even_if_its_counter_drifted(client, make_user):
+    # make_user does not maintain user_count: the counter says 0
+    user = await make_user(["admin.delete", "admin.view"])
+    headers = auth_headers(user)
+    response = await client.delete(f"/api/v1/roles/{user.role_id}", headers=headers)
+    assert response.status_code == 409
+
+    response = await client.get(f"/api/v1/roles/{user.role_id}", headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,34 @@
+import pytest
+from jose import JWTError
+
+from app.core.security import JoseBackend, JWTBackend, TokenCache, create_access_token, decode_token
+
+
+def test_backend_must_implement_decode():
+    class EncodeOnly(JWTBackend):
+        def encode(self, claims: dict) -> str:
+            return ""
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+
+
+def test_access_token_round_trip():
+    payload = decode_token(create_access_token({"sub": "42"}))
+    assert payload["sub"] == "42"
+    assert payload["type"] == "access"
+
+
+def test_tampered_token_is_rejected():
+    token = create_access_token({"sub": "42"})
+    header, claims, signature = token.split(".")
+    with pytest.raises(JWTError):
+        JoseBackend().decode(f"{header}.{claims}.{signature[::-1]}")
+
+
+def test_token_cache_drops_expired_payloads():
+    cache = TokenCache(maxsize=2)
+    cache.put("expired", {"sub": "1", "exp": 1})
+    cache.put("valid", {"sub": "2", "exp": 4102444800})
+    assert cache.get("expired") is None
+    assert cache.get("valid") == {"sub": "2", "exp": 4102444800}
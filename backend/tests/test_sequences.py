@@ -0,0 +1,50 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["admin.view", "admin.edit"]
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["{seq.real}", "{seq.x}", "{seq[0]}", "{name}", "TP-{YYYY}", "X" * 45 + "{seq:06}", "{seq:051}"],
+)
+async def test_invalid_pattern_is_refused(client, company, make_user, pattern):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    response = await client.put(
+        f"/api/v1/companies/{company.id}/sequences/third_party.code",
+        json={"pattern": pattern},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+async def test_pattern_is_applied_to_the_next_code(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS + ["third_party.create"]))
+    response = await client.put(
+        f"/api/v1/companies/{company.id}/sequences/third_party.code",
+        json={"pattern": "P{YY}-{seq:04}"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/api/v1/third-parties", json={"name": "New", "company_id": company.id}, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["code"].endswith("-0001")
+
+
+async def test_sequences_of_another_company_are_refused(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    other = company.id + 100000
+    response = await client.get(f"/api/v1/companies/{other}/sequences", headers=headers)
+    assert response.status_code == 403
+    response = await client.put(
+        f"/api/v1/companies/{other}/sequences/third_party.code",
+        json={"pattern": "X-{seq}"},
+        headers=headers,
+    )
+    assert response.status_code == 403
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services.snapshot import _write, build_customer_snapshot, load_meta, snapshot_path
+from tests.conftest import auth_headers
+
+
+def test_write_keeps_the_current_file_and_prunes_old_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+    first = _write(1, "v1", "cursor", {"rows": [[1]]})
+    # Long unreferenced: pruned by the next write
+    os.utime(snapshot_path(first), (0, 0))
+    second = _write(1, "v2", "cursor", {"rows": [[1], [2]]})
+    # Recently unreferenced: kept for downloads in flight
+    third = _write(1, "v3", "cursor", {"rows": [[1], [2], [3]]})
+
+    assert load_meta(1) == third
+    assert not snapshot_path(first).exists()
+    assert snapshot_path(second).exists()
+    assert snapshot_path(third).exists()
+    assert not list((tmp_path / "1").glob("*.tmp"))
+
+
+def test_current_file_is_kept_however_old(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+    meta = _write(1, "v1", "cursor", {"rows": [[1]]})
+    os.utime(snapshot_path(meta), (0, 0))
+    # Same content again: the file is reused, and still referenced
+    assert _write(1, "v2", "cursor", {"rows": [[1]]}).digest == meta.digest
+    assert snapshot_path(meta).exists()
+
+
+@pytest.mark.anyio
+async def test_rebuild_patches_in_changed_customers(client, company, make_user, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path))
+    headers = auth_headers(await make_user(["third_party.view", "third_party.create"]))
+    body = {"name": "First", "company_id": company.id, "is_customer": True}
+    assert (await client.post("/api/v1/third-parties", json=body, headers=headers)).status_code == 201
+    first = await build_customer_snapshot(company.id)
+    assert first.rows == 1
+
+    body["name"] = "Second"
+    assert (await client.post("/api/v1/third-parties", json=body, headers=headers)).status_code == 201
+    second = await build_customer_snapshot(company.id)
+    assert second.rows == 2
+    assert second.version != first.version
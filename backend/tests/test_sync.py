@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.models.third_party import ThirdParty
+from app.services.sync import list_changes
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["third_party.view", "third_party.create", "third_party.edit"]
+
+
+async def _create(client, headers, company_id: int, name: str) -> int:
+    response = await client.post(
+        "/api/v1/third-parties", json={"name": name, "company_id": company_id}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def _changed_ids(db, company_id: int, cursor: str | None, limit: int = 500):
+    ids = []
+    while True:
+        changes = await list_changes(db, "third_parties", company_id, cursor, limit)
+        ids += [tp.id for tp in changes["items"]]
+        cursor = changes["next_cursor"]
+        if not changes["has_more"]:
+            return ids, cursor
+
+
+async def test_pages_cover_every_row_once_caught_up(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    created = [await _create(client, headers, company.id, f"P{i}") for i in range(5)]
+
+    async with AsyncSessionLocal() as db:
+        ids, cursor = await _changed_ids(db, company.id, None, limit=2)
+        assert sorted(set(ids)) == created
+        ids, _ = await _changed_ids(db, company.id, cursor)
+        assert ids == []
+
+
+async def test_cursor_keeps_a_transaction_that_commits_late(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    first = await _create(client, headers, company.id, "First")
+    second = await _create(client, headers, company.id, "Second")
+
+    async with AsyncSessionLocal() as reader:
+        _, cursor = await _changed_ids(reader, company.id, None)
+
+        async with AsyncSessionLocal() as slow, AsyncSessionLocal() as fast:
+            # Starts writing first, commits last
+            await slow.execute(
+                update(ThirdParty).where(ThirdParty.id == first).values(name="First 2")
+            )
+            await fast.execute(
+                update(ThirdParty).where(ThirdParty.id == second).values(name="Second 2")
+            )
+            await fast.commit()
+
+            ids, cursor = await _changed_ids(reader, company.id, cursor)
+            assert ids == [second]
+            await reader.rollback()
+
+            await slow.commit()
+
+        ids, _ = await _changed_ids(reader, company.id, cursor)
+        assert first in ids
@@ -0,0 +1,48 @@
+import pytest
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["third_party.view", "third_party.create", "third_party.edit"]
+
+
+async def test_auto_code_skips_a_code_already_taken(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    # An imported partner already holds the first number of the sequence
+    response = await client.post(
+        "/api/v1/third-parties",
+        json={"name": "Imported", "code": "TP-000001", "company_id": company.id},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    response = await client.post(
+        "/api/v1/third-parties",
+        json={"name": "New", "company_id": company.id},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert response.json()["code"] == "TP-000002"
+
+
+async def test_duplicate_supplied_code_names_the_field(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    body = {"name": "First", "company_id": company.id, "is_customer": True, "customer_code": "C1"}
+    assert (await client.post("/api/v1/third-parties", json=body, headers=headers)).status_code == 201
+
+    response = await client.post(
+        "/api/v1/third-parties", json={**body, "name": "Second"}, headers=headers
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Customer code 'C1' already exists"
+
+
+async def test_duplicate_supplied_partner_code(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    body = {"name": "First", "code": "P1", "company_id": company.id}
+    assert (await client.post("/api/v1/third-parties", json=body, headers=headers)).status_code == 201
+
+    response = await client.post("/api/v1/third-parties", json=body, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Third party code 'P1' already exists"
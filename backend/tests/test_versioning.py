@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.models.third_party import ThirdParty
+from app.services.versioning import collection_etag
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+PERMISSIONS = ["third_party.view", "third_party.create", "third_party.edit"]
+
+
+async def _create(client, headers, company_id: int, name: str) -> dict:
+    response = await client.post(
+        "/api/v1/third-parties", json={"name": name, "company_id": company_id}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_stale_if_match_is_refused(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    tp = await _create(client, headers, company.id, "Acme")
+    etag = (await client.get(f"/api/v1/third-parties/{tp['id']}", headers=headers)).headers["ETag"]
+
+    response = await client.patch(
+        f"/api/v1/third-parties/{tp['id']}",
+        json={"name": "Acme 2"},
+        headers={**headers, "If-Match": etag},
+    )
+    assert response.status_code == 200
+
+    response = await client.patch(
+        f"/api/v1/third-parties/{tp['id']}",
+        json={"name": "Acme 3"},
+        headers={**headers, "If-Match": etag},
+    )
+    assert response.status_code == 412
+
+
+async def test_list_etag_follows_writes(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    tp = await _create(client, headers, company.id, "Acme")
+    url = f"/api/v1/third-parties?company_id={company.id}"
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.patch(f"/api/v1/third-parties/{tp['id']}", json={"name": "Acme 2"}, headers=headers)
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_list_etag_moves_when_an_older_transaction_commits(client, company, make_user):
+    headers = auth_headers(await make_user(PERMISSIONS))
+    first = await _create(client, headers, company.id, "First")
+    second = await _create(client, headers, company.id, "Second")
+
+    async with AsyncSessionLocal() as slow, AsyncSessionLocal() as fast, AsyncSessionLocal() as reader:
+        # The slow transaction writes first, so it holds the lower id...
+        await slow.execute(
+            update(ThirdParty).where(ThirdParty.id == first["id"]).values(name="First 2")
+        )
+        # ...but commits after a later one
+        await fast.execute(
+            update(ThirdParty).where(ThirdParty.id == second["id"]).values(name="Second 2")
+        )
+        await fast.commit()
+        before = await collection_etag(reader, ["third_parties"], company.id, "")
+        await reader.rollback()
+
+        await slow.commit()
+        after = await collection_etag(reader, ["third_parties"], company.id, "")
+
+    assert before != after
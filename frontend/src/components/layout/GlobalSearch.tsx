@@ -0,0 +1,97 @@
+import { useEffect, useState } from "react";
+import { useNavigate } from "react-router-dom";
+import { Search } from "lucide-react";
+import { Input } from "@/components/ui/input";
+import { search } from "@/services/search";
+import type { SearchResult, SearchResultType } from "@/types/search";
+
+const TYPE_LABELS: Record<SearchResultType, string> = {
+  user: "Utilisateur",
+  company: "Societe",
+  third_party: "Tiers",
+  contact: "Contact",
+};
+
+// Pages listing each type, opened filtered on the result
+const TYPE_PAGES: Partial<Record<SearchResultType, string>> = {
+  user: "/users",
+  company: "/companies",
+};
+
+export function GlobalSearch() {
+  const navigate = useNavigate();
+  const [query, setQuery] = useState("");
+  const [results, setResults] = useState<SearchResult[]>([]);
+  const [open, setOpen] = useState(false);
+
+  useEffect(() => {
+    const q = query.trim();
+    if (!q) {
+      setResults([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      search(q, { limit: 10 })
+        .then((data) => !cancelled && setResults(data))
+        .catch(() => !cancelled && setResults([]));
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
+  const select = (result: SearchResult) => {
+    const page = TYPE_PAGES[result.type];
+    if (page) {
+      // Users are listed by name or email: the email is unique
+      const term = result.type === "user" ? (result.subtitle ?? result.title) : result.title;
+      navigate(`${page}?search=${encodeURIComponent(term)}`);
+    }
+    setOpen(false);
+  };
+
+  return (
+    <div className="relative w-full max-w-md">
+      <Search className="absolute left-3 top-1/2 h-4 w-4 -translate-y-1/2 text-muted-foreground" />
+      <Input
+        value={query}
+        onChange={(e) => {
+          setQuery(e.target.value);
+          setOpen(true);
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setTimeout(() => setOpen(false), 150)}
+        placeholder="Rechercher utilisateurs, tiers, contacts, societes..."
+        className="h-9 pl-9"
+      />
+      {open && results.length > 0 && (
+        <ul className="absolute z-40 mt-1 w-full overflow-hidden rounded-md border bg-background shadow-md">
+          {results.map((result) => (
+            <li key={`${result.type}-${result.id}`}>
+              <button
+                type="button"
+                className="flex w-full items-center justify-between gap-3 px-3 py-2 text-left text-sm hover:bg-muted"
+                onMouseDown={(e) => e.preventDefault()}
+                onClick={() => select(result)}
+              >
+                <span className="min-w-0">
+                  <span className="block truncate font-medium">{result.title}</span>
+                  {result.subtitle && (
+                    <span className="block truncate text-xs text-muted-foreground">
+                      {result.subtitle}
+                    </span>
+                  )}
+                </span>
+                <span className="shrink-0 text-xs text-muted-foreground">
+                  {TYPE_LABELS[result.type]}
+                </span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+}
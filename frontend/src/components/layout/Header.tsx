@@ -2,6 +2,7 @@ import { Menu, LogOut, User } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { useAuth } from "@/hooks/useAuth";
 import { useUiStore } from "@/stores/uiStore";
+import { GlobalSearch } from "./GlobalSearch";
 
 export function Header() {
   const { user, logout } = useAuth();
@@ -17,7 +18,9 @@ export function Header() {
         <Menu className="h-5 w-5" />
       </Button>
 
-      <div className="flex-1" />
+      <div className="flex flex-1 justify-center">
+        <GlobalSearch />
+      </div>
 
       {user && (
         <div className="flex items-center gap-3">
@@ -1,4 +1,5 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
+import { useSearchParams } from "react-router-dom";
 import { Plus, Pencil, Power } from "lucide-react";
 import { useDataFetch } from "@/hooks/useDataFetch";
 import { DataTable, type Column } from "@/components/shared/DataTable";
@@ -32,12 +33,19 @@ export default function CompaniesPage() {
   const [confirmOpen, setConfirmOpen] = useState(false);
   const [togglingCompany, setTogglingCompany] = useState<Company | null>(null);
 
+  const [searchParams] = useSearchParams();
+  const urlSearch = searchParams.get("search") ?? undefined;
   const { data, total, page, pages, loading, params, setParams, setPage, refresh } =
     useDataFetch<Company, CompanyListParams>({
       fetchFn: listCompanies,
-      initialParams: { page: 1, page_size: 20 },
+      initialParams: { page: 1, page_size: 20, search: urlSearch },
     });
 
+  // Opened from the header search
+  useEffect(() => {
+    if (urlSearch) setParams({ search: urlSearch });
+  }, [urlSearch, setParams]);
+
   const handleCreate = () => {
     setEditingCompany(null);
     setFormOpen(true);
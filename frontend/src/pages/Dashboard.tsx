@@ -1,3 +1,4 @@
+import { useEffect, useState } from "react";
 import { useAuth } from "@/hooks/useAuth";
 import { usePermissions } from "@/hooks/usePermissions";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -8,11 +9,23 @@ import {
   ShoppingCart,
   TrendingUp,
   Package,
+  Activity,
 } from "lucide-react";
+import { getDashboardSummary } from "@/services/dashboard";
+import type { DashboardSummary } from "@/types/dashboard";
 
 export default function DashboardPage() {
   const { user } = useAuth();
   const { hasModule, isSuperAdmin } = usePermissions();
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
+
+  useEffect(() => {
+    getDashboardSummary()
+      .then(setSummary)
+      .catch(() => {});
+  }, []);
+
+  const thirdParties = summary?.third_parties;
 
   const cards = [
     {
@@ -39,24 +52,35 @@ export default function DashboardPage() {
     {
       title: "Tiers",
       icon: Contact,
-      description: "Clients / Fournisseurs",
-      value: "-",
+      description: thirdParties
+        ? `${thirdParties.customers} clients / ${thirdParties.suppliers} fournisseurs`
+        : "Clients / Fournisseurs",
+      value: thirdParties?.total ?? "-",
       visible: hasModule("third_party"),
     },
     {
       title: "Utilisateurs",
       icon: Users,
       description: "Comptes actifs",
-      value: "-",
+      value: summary?.users?.active ?? "-",
       visible: isSuperAdmin || hasModule("admin"),
     },
     {
       title: "Societes",
       icon: Building2,
       description: "Societes actives",
-      value: "-",
+      value: summary?.companies?.active ?? "-",
       visible: isSuperAdmin,
     },
+    {
+      title: "Activite",
+      icon: Activity,
+      description: summary?.activity
+        ? `Actions du jour, dont ${summary.activity.pin_failures_today} echecs PIN`
+        : "Actions du jour",
+      value: summary?.activity?.events_today ?? "-",
+      visible: isSuperAdmin || hasModule("admin"),
+    },
   ];
 
   const visibleCards = cards.filter((c) => c.visible);
@@ -1,4 +1,5 @@
 import { useEffect, useState } from "react";
+import { useSearchParams } from "react-router-dom";
 import { useDataFetch } from "@/hooks/useDataFetch";
 import { DataTable, type Column } from "@/components/shared/DataTable";
 import { StatusBadge } from "@/components/shared/StatusBadge";
@@ -31,6 +32,8 @@ import { Badge } from "@/components/ui/badge";
 
 export default function UsersPage() {
   // ----- Data fetching -----
+  const [searchParams] = useSearchParams();
+  const urlSearch = searchParams.get("search") ?? undefined;
   const {
     data: users,
     total,
@@ -43,9 +46,14 @@ export default function UsersPage() {
     refresh,
   } = useDataFetch<User, UserListParams>({
     fetchFn: listUsers,
-    initialParams: { page: 1, page_size: 20 },
+    initialParams: { page: 1, page_size: 20, search: urlSearch },
   });
 
+  // Opened from the header search
+  useEffect(() => {
+    if (urlSearch) setParams({ search: urlSearch });
+  }, [urlSearch, setParams]);
+
   // ----- Roles for filter -----
   const [roles, setRoles] = useState<Role[]>([]);
 
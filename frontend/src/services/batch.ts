@@ -0,0 +1,13 @@
+import api from "./api";
+import type { BatchItem, BatchItemResult } from "@/types/batch";
+
+export async function batch(
+  requests: BatchItem[],
+  sharedSession = false,
+): Promise<BatchItemResult[]> {
+  const { data } = await api.post("/batch", {
+    requests,
+    shared_session: sharedSession,
+  });
+  return data;
+}
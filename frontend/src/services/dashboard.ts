@@ -0,0 +1,9 @@
+import api from "./api";
+import type { DashboardSummary } from "@/types/dashboard";
+
+export async function getDashboardSummary(companyId?: number): Promise<DashboardSummary> {
+  const { data } = await api.get("/dashboard/summary", {
+    params: { company_id: companyId },
+  });
+  return data;
+}
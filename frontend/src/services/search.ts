@@ -0,0 +1,17 @@
+import api from "./api";
+import type { SearchResult, SearchResultType } from "@/types/search";
+
+export async function search(
+  q: string,
+  options: { companyId?: number; types?: SearchResultType[]; limit?: number } = {},
+): Promise<SearchResult[]> {
+  const { data } = await api.get("/search", {
+    params: {
+      q,
+      company_id: options.companyId,
+      types: options.types?.join(","),
+      limit: options.limit,
+    },
+  });
+  return data;
+}
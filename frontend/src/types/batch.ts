@@ -0,0 +1,14 @@
+export interface BatchItem {
+  id?: string;
+  method?: "GET" | "POST" | "PUT" | "PATCH" | "DELETE";
+  path: string;
+  headers?: Record<string, string>;
+  body?: unknown;
+}
+
+export interface BatchItemResult<T = unknown> {
+  id: string | null;
+  status: number;
+  headers: Record<string, string>;
+  body: T;
+}
@@ -0,0 +1,12 @@
+export interface DashboardSummary {
+  company_id: number | null;
+  third_parties?: {
+    total: number;
+    customers: number;
+    suppliers: number;
+    employees: number;
+  };
+  users?: { total: number; active: number };
+  companies?: { total: number; active: number };
+  activity?: { events_today: number; pin_failures_today: number };
+}
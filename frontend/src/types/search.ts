@@ -0,0 +1,12 @@
+export type SearchResultType = "user" | "company" | "third_party" | "contact";
+
+export interface SearchResult {
+  type: SearchResultType;
+  id: number;
+  title: string;
+  subtitle: string | null;
+  company_id: number | null;
+  parent_id: number | null;
+  is_active: boolean;
+  rank: number;
+}